@@ -2,25 +2,17 @@ from rest_framework import serializers
 
 from apps.carts.models import Cart, CartItem
 from apps.shop.models import Product
+from apps.shop.recommendations import recommended_for_products
 
 # ========= Product Simple Serializer ========= #
 class ProductSimpleSerializer(serializers.ModelSerializer):
     """سریالایزر ساده برای نمایش اطلاعات محصول در سبد خرید"""
-    main_image = serializers.SerializerMethodField()
+    # تصویر اصلی از ستون main_image خود محصول خوانده می‌شود (بدون کوئری اضافه)
+    main_image = serializers.ImageField(read_only=True)
     
     class Meta:
         model = Product
         fields = ['id', 'name', 'brand', 'part_code', 'price', 'main_image', 'allow_individual_sale']
-    
-    def get_main_image(self, obj):
-        """برگرداندن تصویر اصلی محصول"""
-        main_image = obj.images.filter(is_main=True).first()
-        if main_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(main_image.image.url)
-            return main_image.image.url
-        return None
 
 # ========= Cart Item Serializer ========= #
 class CartItemSerializer(serializers.ModelSerializer):
@@ -31,11 +23,12 @@ class CartItemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = CartItem
-        fields = ['id', 'product', 'product_id', 'total_price']
+        fields = ['id', 'product', 'product_id', 'quantity', 'total_price']
+        read_only_fields = ['quantity']
     
     def get_total_price(self, obj):
-        """محاسبه قیمت کل آیتم"""
-        return obj.product.price
+        """محاسبه قیمت کل آیتم (قیمت واحد × تعداد)"""
+        return obj.product.price * obj.quantity
 
 
 # ========= Cart Serializer ========= #
@@ -43,15 +36,22 @@ class CartSerializer(serializers.ModelSerializer):
     """سریالایزر برای نمایش سبد خرید"""
     items = CartItemSerializer(many=True, read_only=True)
     total_price = serializers.SerializerMethodField()
+    frequently_bought_together = serializers.SerializerMethodField()
     
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'created_at', 'items', 'total_price']
-        read_only_fields = ['user', 'created_at']
+        fields = ['id', 'user', 'created_at', 'version', 'items', 'total_price', 'frequently_bought_together']
+        read_only_fields = ['user', 'created_at', 'version']
     
     def get_total_price(self, obj):
         """محاسبه قیمت کل سبد خرید"""
-        return sum(item.product.price for item in obj.items.all())
+        return sum(item.product.price * item.quantity for item in obj.items.all())
+    
+    def get_frequently_bought_together(self, obj):
+        """پیشنهاد محصولاتی که معمولا همراه اقلام این سبد خریداری می‌شوند"""
+        product_ids = [item.product_id for item in obj.items.all()]
+        products = recommended_for_products(product_ids)
+        return ProductSimpleSerializer(products, many=True, context=self.context).data
 
 
 # ========= Add To Cart Serializer ========= #
@@ -76,4 +76,43 @@ class UpdateCartItemSerializer(serializers.Serializer):
         cart_item = self.context['cart_item']
         product = cart_item.product
         
-        return data
\ No newline at end of file
+        return data
+
+# ========= Cart Batch Serializers ========= #
+class CartOperationSerializer(serializers.Serializer):
+    """
+    یک عملیات روی سبد خرید:
+    - add: افزودن quantity عدد (پیش‌فرض 1) به تعداد فعلی
+    - set: تنظیم تعداد به quantity (صفر یعنی حذف)
+    - remove: حذف محصول از سبد
+    """
+    OPS = ('add', 'set', 'remove')
+    # سقف تعداد هر محصول در سبد؛ مجموع addها هم به آن محدود می‌شود تا از ظرفیت ستون تعداد بیرون نزند
+    MAX_QUANTITY = 1000
+
+    op = serializers.ChoiceField(choices=OPS)
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(required=False, min_value=0, max_value=MAX_QUANTITY)
+
+    def validate(self, data):
+        if data['op'] == 'set' and 'quantity' not in data:
+            raise serializers.ValidationError({"quantity": "برای عملیات set تعداد الزامی است."})
+        if data['op'] == 'add' and data.setdefault('quantity', 1) < 1:
+            raise serializers.ValidationError({"quantity": "تعداد افزودنی باید حداقل 1 باشد."})
+        return data
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """ لیست عملیات‌هایی که به ترتیب و در یک تراکنش روی سبد اعمال می‌شوند """
+    MAX_OPERATIONS = 200
+
+    operations = serializers.ListField(child=CartOperationSerializer(), allow_empty=False, max_length=MAX_OPERATIONS)
+
+    def validate_operations(self, operations):
+        """ بررسی وجود و فعال بودن همه محصولات افزودنی با یک کوئری """
+        product_ids = {item['product_id'] for item in operations if item['op'] != 'remove'}
+        found = set(Product.objects.filter(id__in=product_ids, is_active=True).values_list('id', flat=True))
+        missing = sorted(product_ids - found)
+        if missing:
+            raise serializers.ValidationError(f"محصولات یافت نشدند یا غیرفعال هستند: {missing}")
+        return operations
@@ -3,7 +3,8 @@ from .views import (
     CartView,
     AddToCartView,
     UpdateCartItemView,
-    RemoveFromCartView
+    RemoveFromCartView,
+    CartBatchView
 )
 
 app_name = 'carts'
@@ -11,5 +12,6 @@ app_name = 'carts'
 urlpatterns = [
     path('', CartView.as_view(), name='cart'),
     path('add/', AddToCartView.as_view(), name='add-to-cart'),
+    path('batch/', CartBatchView.as_view(), name='cart-batch'),
     path('remove/<int:item_id>/', RemoveFromCartView.as_view(), name='remove-from-cart'),
 ]
\ No newline at end of file
@@ -3,14 +3,18 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.generics import GenericAPIView
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from drf_spectacular.utils import extend_schema
 
 from apps.carts.models import Cart, CartItem
 from apps.shop.models import Product
+from apps.api.v1.idempotency import idempotent
 from .serializers import (
     CartSerializer, CartItemSerializer, AddToCartSerializer, 
-    UpdateCartItemSerializer, ProductSimpleSerializer
+    UpdateCartItemSerializer, ProductSimpleSerializer, CartBatchSerializer, CartOperationSerializer
 )
 
 # =========== Cart View =========== #
@@ -21,7 +25,7 @@ class CartView(GenericAPIView):
     serializer_class = CartSerializer
     def get(self, request):
         """نمایش سبد خرید کاربر"""
-        cart, created = Cart.objects.get_or_create(user=request.user)
+        cart, created = Cart.objects.prefetch_related('items__product').get_or_create(user=request.user)
         serializer = self.get_serializer(cart, context={'request': request})
         return Response(serializer.data)
     
@@ -29,6 +33,7 @@ class CartView(GenericAPIView):
         """خالی کردن سبد خرید"""
         cart, created = Cart.objects.get_or_create(user=request.user)
         cart.items.all().delete()
+        cart.bump_version()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 # =========== Add To Cart =========== #
@@ -54,6 +59,7 @@ class AddToCartView(GenericAPIView):
             
             if not created:
                 cart_item.save()
+            cart.bump_version()
             
             response_data = {
                 "message": "محصول با موفقیت به سبد خرید اضافه شد.",
@@ -82,7 +88,7 @@ class UpdateCartItemView(GenericAPIView):
         
         if serializer.is_valid():
             cart_item.save()
-
+            cart.bump_version()
             
             response_data = {
                 "message": "تعداد محصول با موفقیت ویرایش شد.",
@@ -103,4 +109,65 @@ class RemoveFromCartView(GenericAPIView):
         cart = get_object_or_404(Cart, user=request.user)
         cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
         cart_item.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        cart.bump_version()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+# =========== Cart Batch View =========== #
+@extend_schema(tags=['Cart'])
+class CartBatchView(GenericAPIView):
+    """
+    اعمال چند عملیات add/set/remove روی سبد خرید در یک درخواست (همگام‌سازی پس از ویرایش آفلاین).
+    بدنه درخواست: {"operations": [{"op": "add", "product_id": 1, "quantity": 2}, {"op": "remove", "product_id": 5}]}
+    عملیات‌ها به ترتیب روی وضعیت فعلی سبد محاسبه و سپس با یک upsert گروهی و یک DELETE
+    در یک تراکنش ذخیره می‌شوند؛ پاسخ، سبد نهایی است.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CartBatchSerializer
+
+    @idempotent('cart-batch')
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            # قفل ردیف سبد تا عملیات add روی تعداد به‌روز محاسبه شود
+            cart, created = Cart.objects.select_for_update().get_or_create(user=request.user)
+            current = dict(cart.items.values_list('product_id', 'quantity'))
+
+            quantities = dict(current)
+            for operation in serializer.validated_data['operations']:
+                product_id = operation['product_id']
+                if operation['op'] == 'add':
+                    quantities[product_id] = quantities.get(product_id, 0) + operation['quantity']
+                elif operation['op'] == 'set':
+                    quantities[product_id] = operation['quantity']
+                else:
+                    quantities[product_id] = 0
+
+            # سقف تعداد روی نتیجه نهایی هم بررسی می‌شود؛ خطا تراکنش را برمی‌گرداند و DRF پاسخ 400 می‌دهد
+            max_quantity = CartOperationSerializer.MAX_QUANTITY
+            too_many = sorted(product_id for product_id, quantity in quantities.items() if quantity > max_quantity)
+            if too_many:
+                raise ValidationError({"operations": f"تعداد هر محصول در سبد حداکثر {max_quantity} است: {too_many}"})
+
+            changed = [
+                CartItem(cart=cart, product_id=product_id, quantity=quantity)
+                for product_id, quantity in quantities.items()
+                if quantity > 0 and current.get(product_id) != quantity
+            ]
+            removed = [product_id for product_id, quantity in quantities.items() if quantity == 0 and product_id in current]
+
+            if changed:
+                CartItem.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['cart', 'product'],
+                    update_fields=['quantity'],
+                )
+            if removed:
+                CartItem.objects.filter(cart=cart, product_id__in=removed).delete()
+            if changed or removed:
+                cart.bump_version()
+
+        prefetch_related_objects([cart], 'items__product')
+        return Response(CartSerializer(cart, context={'request': request}).data)
@@ -0,0 +1,124 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse, FileResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# پارامتر format توسط DRF برای انتخاب renderer رزرو شده است
+EXPORT_FORMAT_PARAM = 'export_format'
+EXPORT_FORMATS = ('csv', 'xlsx', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """ بافر ساختگی برای csv.writer که هر خط را به جای نوشتن برمی‌گرداند """
+
+    def write(self, value):
+        return value
+
+
+def _local(value):
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value)
+    return value
+
+
+# ===== Row Writers ===== #
+def stream_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    # BOM برای باز شدن درست متن فارسی در اکسل
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_local(value) for value in row])
+
+
+def stream_ndjson(keys, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(keys, (_local(value) for value in row)))) + '\n'
+
+
+def write_xlsx(headers, rows):
+    """
+    فایل XLSX در حالت write_only روی یک فایل موقت نوشته می‌شود؛
+    openpyxl ردیف‌ها را مستقیم روی دیسک می‌ریزد و حافظه ثابت می‌ماند.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for row in rows:
+        # اکسل datetime دارای منطقه زمانی را پشتیبانی نمی‌کند
+        sheet.append([timezone.make_naive(value) if isinstance(value, datetime) and timezone.is_aware(value) else value for value in row])
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+# ===== Export Mixin ===== #
+class ExportMixin:
+    """
+    اکشن export برای ویوست‌های مدیریت: خروجی CSV / XLSX / NDJSON از همان کوئری لیست
+    (با فیلترهای جستجو و مرتب‌سازی فعلی).
+    ردیف‌ها با values_list و iterator (کرسر سمت سرور در پستگرس) خوانده و به صورت جریانی ارسال می‌شوند.
+
+    export_columns: لیست (عنوان ستون، مسیر فیلد یا نام annotate)
+    """
+    export_columns = ()
+    export_filename = 'export'
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def get_export_queryset(self):
+        # prefetch و select_related مخصوص سریالایزر در values_list بی‌اثر و هزینه‌بر هستند
+        return self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+
+    def iter_export_rows(self):
+        lookups = [lookup for _, lookup in self.export_columns]
+        return self.get_export_queryset().values_list(*lookups).iterator(chunk_size=self.export_chunk_size)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        خروجی گرفتن از لیست با فیلترهای فعلی.
+        پارامتر export_format: یکی از csv (پیش‌فرض)، xlsx و ndjson
+        """
+        export_format = request.query_params.get(EXPORT_FORMAT_PARAM, 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"فرمت خروجی باید یکی از {', '.join(EXPORT_FORMATS)} باشد."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        headers = [header for header, _ in self.export_columns]
+        filename = f"{self.export_filename}-{timezone.localtime():%Y%m%d-%H%M}.{export_format}"
+        rows = self.iter_export_rows()
+
+        if export_format == 'xlsx':
+            try:
+                output = write_xlsx(headers, rows)
+            except ImportError:
+                return Response(
+                    {"error": "برای خروجی XLSX کتابخانه openpyxl باید نصب باشد."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=filename,
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+
+        if export_format == 'ndjson':
+            response = StreamingHttpResponse(stream_ndjson(headers, rows), content_type='application/x-ndjson; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(stream_csv(headers, rows), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from apps.home.models import Banner
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
+from apps.api.v1.image_fields import SrcsetField
 
 # ========= Banner Management Serializer ========= #
-class BannerManagementSerializer(serializers.ModelSerializer):
+class BannerManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت بنرها توسط ادمین.
     """
@@ -10,11 +12,12 @@ class BannerManagementSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     # نمایش URL کامل تصویر
     image_url = serializers.SerializerMethodField()
+    srcset = SrcsetField()
 
     class Meta:
         model = Banner
         fields = [
-            'id', 'user', 'username', 'image', 'image_url', 'order', 
+            'id', 'user', 'username', 'image', 'image_url', 'srcset', 'order', 
             'created_at', 'updated_at'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
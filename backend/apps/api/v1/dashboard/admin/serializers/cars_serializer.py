@@ -1,11 +1,12 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from apps.shop.models import Car
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
 # ======= Car Management Serializer ======= #
-class CarManagementSerializer(serializers.ModelSerializer):
+class CarManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت کامل خودروها توسط ادمین.
     """
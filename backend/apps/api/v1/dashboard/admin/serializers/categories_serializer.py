@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from apps.shop.models import Category
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 # ======= Category Management Serializers ======= # 
-class CategoryManagementSerializer(serializers.ModelSerializer):
+class CategoryManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت کامل دسته‌بندی‌ها توسط ادمین.
     """
@@ -32,6 +33,10 @@ class CategoryManagementSerializer(serializers.ModelSerializer):
         name = data.get('name')
         parent = data.get('parent')
 
+        # جلوگیری از ایجاد حلقه در درخت (انتقال به زیرشاخه خود)
+        if self.instance and parent and parent.is_descendant_of(self.instance):
+            raise serializers.ValidationError("یک دسته‌بندی نمی‌تواند زیرمجموعه خودش یا زیرشاخه‌هایش باشد.")
+
         # اگر در حالت ویرایش هستیم، دسته‌بندی فعلی را از بررسی مستثنی می‌کنیم
         if self.instance:
             if Category.objects.filter(name=name, parent=parent).exclude(pk=self.instance.pk).exists():
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from apps.home.models import Contact
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 # ======== Contact Management Serializer ======== #
-class ContactManagementSerializer(serializers.ModelSerializer):
+class ContactManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت پیام‌های تماس با ما توسط ادمین.
     """
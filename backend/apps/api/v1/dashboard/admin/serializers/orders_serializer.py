@@ -3,8 +3,10 @@ from django.db import transaction
 from django.contrib.auth import get_user_model
 
 from apps.orders.models import Order, OrderItem, OrderStatus
+from apps.orders.inventory import InsufficientStock, reserve_stock
 from apps.shop.models import Product
 from apps.payments.models import Payment
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
@@ -21,10 +23,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False) 
     product = SimpleProductSerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True)
+    quantity = serializers.IntegerField(min_value=1, default=1)
     
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'product_id', 'price_at_time_of_purchase']
+        fields = ['id', 'product', 'product_id', 'quantity', 'price_at_time_of_purchase']
         read_only_fields = ['price_at_time_of_purchase']
 
 # ========= Payment Serializer ========= #
@@ -39,7 +42,7 @@ class PaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['payment_type', 'status', 'transaction_id']
 
 # ========== Order Management Serializer ========== #
-class OrderManagementSerializer(serializers.ModelSerializer):
+class OrderManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر اصلی برای مدیریت کامل سفارش‌ها توسط ادمین.
     """
@@ -69,31 +72,42 @@ class OrderManagementSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        """سفارش و آیتم‌های آن را به صورت یکپارچه ایجاد می‌کند."""
+        """
+        سفارش و آیتم‌های آن را به صورت یکپارچه ایجاد می‌کند.
+        موجودی مثل ثبت سفارش از سبد خرید رزرو می‌شود؛ در صورت کمبود، کل سفارش برگردانده می‌شود.
+        """
         items_data = validated_data.pop('items')
         
         order = Order.objects.create(**validated_data)
         
         total_amount = 0
+        order_items = []
         
         for item_data in items_data:
             product = Product.objects.get(id=item_data['product_id'])
             price_at_time = product.price
             
-            OrderItem.objects.create(
+            order_items.append(OrderItem.objects.create(
                 order=order,
                 product=product,
+                quantity=item_data['quantity'],
                 price_at_time_of_purchase=price_at_time
-            )
-
-            product.save()
+            ))
             
-            total_amount += price_at_time
+            total_amount += price_at_time * item_data['quantity']
         
         # به‌روزرسانی مبلغ کل سفارش
         order.total_amount = total_amount
         order.save()
         
+        # کاهش موجودی با یک UPDATE شرطی؛ آخرین کار تراکنش
+        try:
+            reserve_stock(order, order_items)
+        except InsufficientStock as e:
+            raise serializers.ValidationError(
+                {"items_data": f"موجودی این محصولات کافی نیست: {e.product_ids}"}
+            )
+        
         return order
 
     @transaction.atomic
@@ -137,21 +151,23 @@ class OrderManagementSerializer(serializers.ModelSerializer):
                 if product_id:
                     order_item.product = product
                     order_item.price_at_time_of_purchase = current_price # قیمت جدید اعمال شود؟ (بستگی به بیزینس دارد)
+                order_item.quantity = item_data['quantity']
                 
                 order_item.save()
                 incoming_item_ids.add(item_id)
                 
                 # محاسبه مبلغ
-                total_amount += order_item.price_at_time_of_purchase
+                total_amount += order_item.price_at_time_of_purchase * order_item.quantity
 
             else:
                 # --- حالت ایجاد (آیتم ID ندارد یا ID اشتباه است) ---
                 new_item = OrderItem.objects.create(
                     order=instance,
                     product=product,
+                    quantity=item_data['quantity'],
                     price_at_time_of_purchase=current_price
                 )
-                total_amount += new_item.price_at_time_of_purchase
+                total_amount += new_item.price_at_time_of_purchase * new_item.quantity
 
         # 3. حالت حذف (آیتم در دیتابیس هست ولی در لیست ورودی نیست)
         # آیتم‌هایی که در دیتابیس بودند ولی ID آن‌ها در لیست ورودی جدید نیست
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.payments.models import Payment
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 # ========= Order Summary Serializer ========= #
 class OrderSummarySerializer(serializers.Serializer):
@@ -10,7 +11,7 @@ class OrderSummarySerializer(serializers.Serializer):
     status = serializers.CharField(read_only=True)
 
 # ========== Payment Management Serializer ========== #
-class PaymentManagementSerializer(serializers.ModelSerializer):
+class PaymentManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت کامل پرداخت‌ها توسط ادمین.
     """
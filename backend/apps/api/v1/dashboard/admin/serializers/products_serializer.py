@@ -1,14 +1,17 @@
 from rest_framework import serializers
 from apps.shop.models import Product, ProductImage, Category, Car
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
+from apps.api.v1.image_fields import SrcsetField
 
 # ======= Product Image Serializer ======= #
 class ProductImageSerializer(serializers.ModelSerializer):
     """سریالایزر برای تصاویر محصول"""
     image_url = serializers.SerializerMethodField()
+    srcset = SrcsetField()
 
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'image_url', 'is_main']
+        fields = ['id', 'image', 'image_url', 'is_main', 'srcset']
         read_only_fields = ['product']
 
     def get_image_url(self, obj):
@@ -32,7 +35,7 @@ class CarSerializer(serializers.ModelSerializer):
         fields = ['id', 'make', 'model', 'year']
 
 # ======= Product Management Serializer ======= #
-class ProductManagementSerializer(serializers.ModelSerializer):
+class ProductManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر اصلی برای مدیریت کامل محصولات.
     """
@@ -50,7 +53,7 @@ class ProductManagementSerializer(serializers.ModelSerializer):
         model = Product
         fields = [
             'id', 'name', 'slug', 'description', 'part_code', 'brand', 'country_of_origin',
-            'warranty', 'price', 'is_stock', 'allow_individual_sale',
+            'warranty', 'price', 'stock_quantity', 'is_stock', 'allow_individual_sale',
             'is_active', 'category', 'category_name', 'compatible_cars', 'compatible_cars_info',
             'images'
         ]
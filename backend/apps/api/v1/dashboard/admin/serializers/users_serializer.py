@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from apps.accounts.models import Profile, Address
 from apps.orders.models import Order
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
@@ -13,7 +14,7 @@ class AddressSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'province', 'city', 'street', 'postal_code', 'detail']
 
 # ======= User Management Serializer ======= #
-class UserManagementSerializer(serializers.ModelSerializer):
+class UserManagementSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدیریت کامل کاربران (ایجاد، ویرایش، نمایش)
     داده‌های مربوط به User و Profile را به صورت یکپارچه مدیریت می‌کند.
@@ -3,25 +3,30 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from drf_spectacular.utils import extend_schema
 
 from apps.home.models import Banner
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
 from ..serializers import BannerManagementSerializer
 from ..permissions import IsAdminOrSuperUser
 
 
 # ======= Banner Management ViewSet ======= #
 @extend_schema(tags=['Banner-Management'])
-class BannerManagementViewSet(viewsets.ModelViewSet):
+class BannerManagementViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل بنرها توسط ادمین.
     شامل عملیات CRUD بدون نیاز به اکشن‌های گروهی.
     """
-    queryset = Banner.objects.all().select_related('user')
+    queryset = Banner.objects.all()
     serializer_class = BannerManagementSerializer
+    sparse_select_related = {'username': 'user'}
     permission_classes = [IsAdminOrSuperUser]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['order', 'created_at']
     ordering = ['-order']
 
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
+
     def perform_create(self, serializer):
         """
         بنر ایجاد شده را به کاربر ادمین (لاگین کرده) اختصاص می‌دهد.
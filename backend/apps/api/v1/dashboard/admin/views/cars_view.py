@@ -5,6 +5,8 @@ from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema
 
 from apps.shop.models import Car
+from apps.api.v1.shop.filters import NormalizedSearchFilter
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
 from ..serializers import CarManagementSerializer
 from ..permissions import IsAdminOrSuperUser
 
@@ -12,19 +14,23 @@ User = get_user_model()
 
 # ========= Car Management ViewSet ========= #
 @extend_schema(tags=['Car-Management'])
-class CarManagementViewSet(viewsets.ModelViewSet):
+class CarManagementViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل خودروها توسط ادمین.
     شامل عملیات CRUD و حذف دسته‌جمعی.
     """
-    queryset = Car.objects.all().select_related('user')
+    queryset = Car.objects.all()
     serializer_class = CarManagementSerializer
+    sparse_select_related = {'username': 'user'}
     permission_classes = [IsAdminOrSuperUser]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['make', 'model', 'user__username']
+    filter_backends = [NormalizedSearchFilter, filters.OrderingFilter]
+    search_fields = ['make_normalized', 'model_normalized', 'user__username']
     ordering_fields = ['make', 'model', 'year', 'created_at']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
+
     def perform_create(self, serializer):
         """
         اگر کاربری در درخواست مشخص نشده بود، خودرو را به ادمین ایجاد‌کننده اختصاص می‌دهد.
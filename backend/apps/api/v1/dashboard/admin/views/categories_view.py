@@ -4,24 +4,30 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 
 from apps.shop.models import Category
+from apps.api.v1.shop.filters import NormalizedSearchFilter
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
 from ..serializers import CategoryManagementSerializer
 from ..permissions import IsAdminOrSuperUser
 
 # ======= Category Management ViewSet ======= #
 @extend_schema(tags=['Category-Management'])
-class CategoryManagementViewSet(viewsets.ModelViewSet):
+class CategoryManagementViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل دسته‌بندی‌ها توسط ادمین.
     شامل عملیات CRUD و حذف دسته‌جمعی.
     """
-    queryset = Category.objects.all().select_related('parent')
+    queryset = Category.objects.all()
     serializer_class = CategoryManagementSerializer
+    sparse_select_related = {'parent_name': 'parent'}
     permission_classes = [IsAdminOrSuperUser]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name']
+    filter_backends = [NormalizedSearchFilter, filters.OrderingFilter]
+    search_fields = ['name_normalized']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
 
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
+
     @action(detail=False, methods=['delete'], url_path='bulk-delete')
     def bulk_delete(self, request):
         """
@@ -3,28 +3,66 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from drf_spectacular.utils import extend_schema
 
 from apps.orders.models import Order, OrderItem, OrderStatus
+from apps.orders.inventory import sync_reservations
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
+from apps.api.v1.idempotency import idempotent
+from ..exports import ExportMixin
 from ..serializers import OrderManagementSerializer
 from ..permissions import IsAdminOrSuperUser
 
 # ========== Order Management ViewSet ========== #
 @extend_schema(tags=['Order-Management'])
-class OrderManagementViewSet(viewsets.ModelViewSet):
+class OrderManagementViewSet(ExportMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل سفارش‌ها توسط ادمین.
     شامل عملیات CRUD و اکشن‌های گروهی.
     """
     
-    queryset = Order.objects.all().prefetch_related('items__product', 'payment').select_related('user')
+    queryset = Order.objects.all()
     serializer_class = OrderManagementSerializer
+    sparse_select_related = {'username': 'user'}
+    sparse_prefetch_related = {'items': 'items__product', 'payment': 'payment'}
     permission_classes = [IsAdminOrSuperUser]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['user__username', 'shipping_address', 'items__product__name']
     ordering_fields = ['order_date', 'total_amount', 'status']
     ordering = ['-order_date']
+    export_filename = 'orders'
+    export_columns = [
+        ('id', 'id'),
+        ('username', 'user__username'),
+        ('status', 'status'),
+        ('payment_type', 'payment_type'),
+        ('order_date', 'order_date'),
+        ('total_amount', 'total_amount'),
+        ('items_count', 'items_count'),
+        ('shipping_address', 'shipping_address'),
+    ]
     
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
+
+    @idempotent('admin-order-create')
+    def create(self, request, *args, **kwargs):
+        """ ایجاد سفارش؛ با هدر Idempotency-Key تکرار درخواست سفارش دوم نمی‌سازد """
+        return super().create(request, *args, **kwargs)
+
+    def get_export_queryset(self):
+        # شمارش در زیرکوئری مستقل، چون JOIN فیلتر شده جستجو (items__product__name) روی Count دوباره استفاده می‌شود
+        items_count = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .order_by()
+            .values('order')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return super().get_export_queryset().annotate(items_count=Coalesce(Subquery(items_count), 0))
+
     # ======== اکشن‌های گروهی (Bulk Actions) ========
     @action(detail=False, methods=['patch'], url_path='bulk-update-status')
     def bulk_update_status(self, request):
@@ -42,7 +80,11 @@ class OrderManagementViewSet(viewsets.ModelViewSet):
             )
         
         # به‌روزرسانی وضعیت سفارش‌ها. سیگنال به طور خودکار پرداخت‌ها را آپدیت می‌کند.
-        count = self.get_queryset().filter(id__in=ids_to_update).update(status=new_status)
+        with transaction.atomic():
+            order_ids = list(self.get_queryset().filter(id__in=ids_to_update).values_list('id', flat=True))
+            count = Order.objects.filter(id__in=order_ids).update(status=new_status)
+            # update گروهی سیگنال ندارد؛ رزرو موجودی جداگانه هماهنگ می‌شود
+            sync_reservations(order_ids, new_status)
         
         return Response(
             {"message": f"تعداد {count} سفارش با موفقیت به‌روزرسانی شدند."},
@@ -99,7 +141,7 @@ class OrderManagementViewSet(viewsets.ModelViewSet):
 
             # محاسبه مجدد مبلغ کل سفارش
             new_total = sum(
-                item.price_at_time_of_purchase
+                item.price_at_time_of_purchase * item.quantity
                 for item in order.items.all()
             )
             order.total_amount = new_total
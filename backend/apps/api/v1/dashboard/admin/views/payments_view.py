@@ -4,24 +4,29 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 
 from apps.payments.models import Payment, PaymentStatus
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
 from ..serializers import PaymentManagementSerializer
 from ..permissions import IsAdminOrSuperUser
 
 # ====== Payment Management ViewSet ======= #
 @extend_schema(tags=['Payment-Management'])
-class PaymentManagementViewSet(viewsets.ModelViewSet):
+class PaymentManagementViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل پرداخت‌ها توسط ادمین.
     شامل عملیات CRUD و اکشن‌های گروهی.
     """
-    queryset = Payment.objects.all().select_related('order__user')
+    queryset = Payment.objects.all()
     serializer_class = PaymentManagementSerializer
+    sparse_select_related = {'order_summary': 'order__user'}
     permission_classes = [IsAdminOrSuperUser]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['id', 'order__user__username', 'transaction_id']
     ordering_fields = ['order__order_date', 'status']
     ordering = ['-order__order_date']
     
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
+
     # ======== اکشن‌های گروهی (Bulk Actions) ========
     @action(detail=False, methods=['patch'], url_path='bulk-update-status')
     def bulk_update_status(self, request):
@@ -9,24 +9,54 @@ from django.db import transaction
 from drf_spectacular.utils import extend_schema
 
 from apps.shop.models import Product, ProductImage
+from apps.shop.catalog_version import bump_catalog_version
+from apps.shop.product_cache import invalidate_product_detail
+from apps.shop.category_tree import invalidate_category_tree
+from apps.shop.autocomplete import autocomplete_index
+from apps.shop.importer import import_products, IMPORT_FORMATS, ImportFileError
+from apps.api.v1.shop.filters import NormalizedSearchFilter
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
+from ..exports import ExportMixin
 from ..serializers import ProductManagementSerializer, ProductImageSerializer
 from ..permissions import IsAdminOrSuperUser
 
 # ========= Product Management ViewSet ========= #
 @extend_schema(tags=['Product-Management'])
-class ProductManagementViewSet(viewsets.ModelViewSet):
+class ProductManagementViewSet(ExportMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل محصولات توسط ادمین.
     شامل عملیات CRUD و اکشن‌های گروهی (فعال/غیرفعال و حذف).
     """
-    queryset = Product.objects.all().prefetch_related('images', 'compatible_cars').select_related('category')
+    queryset = Product.objects.all()
     serializer_class = ProductManagementSerializer
+    sparse_select_related = {'category_name': 'category'}
+    sparse_prefetch_related = {'images': 'images', 'compatible_cars': 'compatible_cars', 'compatible_cars_info': 'compatible_cars'}
     permission_classes = [IsAdminOrSuperUser]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name', 'brand', 'part_code', 'category__name']
+    filter_backends = [NormalizedSearchFilter, filters.OrderingFilter]
+    search_fields = ['name_normalized', 'brand_normalized', 'part_code_normalized', 'category__name_normalized']
     ordering_fields = ['name', 'price', 'date_created']
     ordering = ['-id']
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    export_filename = 'products'
+    export_columns = [
+        ('id', 'id'),
+        ('part_code', 'part_code'),
+        ('name', 'name'),
+        ('slug', 'slug'),
+        ('brand', 'brand'),
+        ('country_of_origin', 'country_of_origin'),
+        ('warranty', 'warranty'),
+        ('price', 'price'),
+        ('category', 'category__name'),
+        ('is_stock', 'is_stock'),
+        ('allow_individual_sale', 'allow_individual_sale'),
+        ('is_active', 'is_active'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
+    def get_queryset(self):
+        return self.apply_sparse_related(super().get_queryset())
 
     # ======== اکشن‌های گروهی (Bulk Actions) ========
 
@@ -46,12 +76,43 @@ class ProductManagementViewSet(viewsets.ModelViewSet):
             )
         
         count = self.get_queryset().filter(id__in=ids_to_update).update(is_active=new_status)
+        # update() سیگنال ندارد؛ نسخه کاتالوگ، کش جزئیات، تعداد محصولات درخت دسته‌بندی
+        # و ایندکس تکمیل خودکار (که فقط محصولات فعال را دارد) دستی باطل می‌شوند
+        bump_catalog_version()
+        invalidate_product_detail(ids_to_update)
+        invalidate_category_tree()
+        autocomplete_index.invalidate()
         
         return Response(
             {"message": f"وضعیت {count} محصول با موفقیت بروزرسانی شد."},
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_file(self, request):
+        """
+        ورود دسته‌ای محصولات از فایل CSV/XLSX (ایجاد یا بروزرسانی بر اساس کد قطعه).
+        فرم: file=<فایل>، dry_run=true برای اعتبارسنجی بدون ذخیره
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "فایل ارسال نشده است."}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = upload.name.rsplit('.', 1)[-1].lower() if '.' in upload.name else ''
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"فرمت فایل باید یکی از {', '.join(IMPORT_FORMATS)} باشد."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        try:
+            result = import_products(upload.file, file_format, dry_run=dry_run)
+        except ImportFileError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result.as_dict(max_errors=500), status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['delete'], url_path='bulk-delete')
     def bulk_delete(self, request):
         """
@@ -83,11 +144,11 @@ class ProductManagementViewSet(viewsets.ModelViewSet):
         product = self.get_object()
         serializer = ProductImageSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            # اگر تصویر جدید به عنوان اصلی انتخاب شد، بقیه را غیرفعال کن
-            if serializer.validated_data.get('is_main', False):
-                ProductImage.objects.filter(product=product).update(is_main=False)
-            
-            serializer.save(product=product)
+            with transaction.atomic():
+                # اگر تصویر جدید به عنوان اصلی انتخاب شد، تصویر اصلی قبلی در همان تراکنش برداشته می‌شود
+                if serializer.validated_data.get('is_main', False):
+                    product.release_main_image()
+                serializer.save(product=product)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -7,18 +7,20 @@ from django.db import transaction
 from drf_spectacular.utils import extend_schema
 
 from apps.accounts.models import User, Address
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin
 from ..serializers import UserManagementSerializer, UserDetailSerializer
 from ..permissions import IsAdminOrSuperUser
 
 # ========= User Management ViewSet ========= #
 @extend_schema(tags=['User-Management'])
-class UserManagementViewSet(viewsets.ModelViewSet):
+class UserManagementViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ویوست برای مدیریت کامل کاربران توسط ادمین.
     شامل عملیات CRUD و اکشن‌های گروهی است.
     """
     queryset = User.objects.all().select_related('profile')
     serializer_class = UserManagementSerializer
+    sparse_prefetch_related = {'addresses': 'address_set', 'orders': 'order_set'}
     permission_classes = [IsAdminOrSuperUser]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['id', 'username', 'email', 'profile__first_name', 'profile__last_name']
@@ -31,9 +33,8 @@ class UserManagementViewSet(viewsets.ModelViewSet):
         بهینه‌سازی کوئری‌ها بر اساس اکشن.
         """
         queryset = User.objects.all().select_related('profile')
-        if self.action == 'retrieve':
-            queryset = queryset.prefetch_related('order_set', 'address_set')
-        return queryset
+        # سفارشات فقط در جزئیات (UserDetailSerializer) وجود دارند و آدرس‌ها با ?omit= حذف می‌شوند
+        return self.apply_sparse_related(queryset)
 
     def get_serializer_class(self):
         """
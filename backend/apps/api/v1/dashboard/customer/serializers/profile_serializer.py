@@ -39,7 +39,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = OrderItem
-        fields = ("product", "price_at_time_of_purchase")
+        fields = ("product", "quantity", "price_at_time_of_purchase")
         
     def get_product(self, obj):
         return {
@@ -0,0 +1,77 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_names(value):
+    """لیست جدا شده با کاما را به مجموعه‌ای از نام فیلدها تبدیل می‌کند"""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def filter_field_names(names, request):
+    """
+    نام فیلدهایی که با توجه به پارامترهای ?fields= و ?omit= باید در پاسخ بیایند.
+    فقط در درخواست‌های خواندنی اعمال می‌شود تا فیلدهای ورودی در ایجاد/ویرایش حذف نشوند.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return list(names)
+
+    requested = parse_field_names(request.query_params.get(FIELDS_PARAM))
+    omitted = parse_field_names(request.query_params.get(OMIT_PARAM))
+    return [
+        name for name in names
+        if (not requested or name in requested) and name not in omitted
+    ]
+
+
+# ===== Sparse Fieldset Serializer Mixin ===== #
+class SparseFieldsetSerializerMixin:
+    """
+    امکان انتخاب فیلدهای پاسخ با ?fields=id,name,price یا حذف آن‌ها با ?omit=images.
+    فقط روی سریالایزر سطح بالا اعمال می‌شود و سریالایزرهای تو در تو کامل می‌مانند.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root_serializer():
+            return fields
+
+        allowed = set(filter_field_names(fields.keys(), self.context.get('request')))
+        return {name: field for name, field in fields.items() if name in allowed}
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+# ===== Sparse Fieldset View Mixin ===== #
+class SparseFieldsetViewMixin:
+    """
+    select_related/prefetch_related را فقط برای فیلدهایی که واقعا در پاسخ می‌آیند اعمال می‌کند.
+    sparse_select_related و sparse_prefetch_related نام فیلد سریالایزر را به lookup رابطه نگاشت می‌کنند.
+    """
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def get_response_field_names(self):
+        names = getattr(self.get_serializer_class().Meta, 'fields', None)
+        if not isinstance(names, (list, tuple)):
+            # برای '__all__' همه روابط بارگذاری می‌شوند
+            names = list(self.sparse_select_related) + list(self.sparse_prefetch_related)
+        return set(filter_field_names(names, getattr(self, 'request', None)))
+
+    def apply_sparse_related(self, queryset):
+        names = self.get_response_field_names()
+        select = [lookup for name, lookup in self.sparse_select_related.items() if name in names]
+        prefetch = [lookup for name, lookup in self.sparse_prefetch_related.items() if name in names]
+        if select:
+            queryset = queryset.select_related(*dict.fromkeys(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+        return queryset
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.home.models import Contact, Banner
+from apps.api.v1.image_fields import SrcsetField
 
 # ======== Contact Serializer ======== #
 class ContactSerializer(serializers.ModelSerializer):
@@ -18,7 +19,8 @@ class BannerSerializer(serializers.ModelSerializer):
     """
     سریالایزر برای نمایش بنرها.
     """
+    srcset = SrcsetField()
 
     class Meta:
         model = Banner
-        fields = ['image', 'order']
+        fields = ['image', 'order', 'srcset']
@@ -2,8 +2,10 @@ from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework import status
 from apps.home.models import Contact, Banner
+from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema
 
+from apps.shop.catalog_version import catalog_conditional
 from .serializers import ContactSerializer, BannerSerializer
 
 # ====== Contact Create View ======= #
@@ -34,6 +36,7 @@ class ContactCreateView(generics.CreateAPIView):
         
 # ====== Banner List View ======= #
 @extend_schema(tags=["Banner"])
+@method_decorator(catalog_conditional, name='dispatch')
 class BannerListView(generics.ListAPIView):
     """
     ویو برای نمایش لیست بنرها.
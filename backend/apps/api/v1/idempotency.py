@@ -0,0 +1,89 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _cache_key(scope, request, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"idempotency:{scope}:{request.user.pk}:{digest}"
+
+
+def request_fingerprint(request):
+    """ اثر انگشت درخواست؛ کلید تکراری با بدنه متفاوت پذیرفته نمی‌شود """
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(f"{request.method}:{request.path}:{body}".encode()).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return Response(
+            {"error": "این کلید Idempotency-Key قبلا برای درخواست دیگری استفاده شده است."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(stored['data'], status=stored['status'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+# ===== Idempotent Decorator ===== #
+def idempotent(scope):
+    """
+    پشتیبانی از هدر Idempotency-Key برای متدهای POST ویو.
+    - پاسخ موفق به همراه اثر انگشت درخواست تا IDEMPOTENCY_KEY_TTL در کش ذخیره می‌شود
+      و تکرار درخواست همان پاسخ را بدون اجرای دوباره تراکنش و سیگنال‌ها برمی‌گرداند.
+    - درخواست‌های همزمان با یک کلید با قفل cache.add سریال می‌شوند؛ درخواست دوم 409 می‌گیرد.
+    - پاسخ‌های خطا ذخیره نمی‌شوند تا کلاینت بتواند با همان کلید دوباره تلاش کند.
+    بدون هدر، ویو مثل قبل اجرا می‌شود. کلیدها برای هر کاربر جدا هستند.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {"error": f"طول Idempotency-Key نباید بیشتر از {MAX_KEY_LENGTH} کاراکتر باشد."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            cache_key = _cache_key(scope, request, key)
+            fingerprint = request_fingerprint(request)
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            lock_key = f"{cache_key}:lock"
+            if not cache.add(lock_key, 1, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                return Response(
+                    {"error": "درخواست دیگری با همین Idempotency-Key در حال پردازش است."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            try:
+                # ممکن است درخواست قبلی درست پیش از گرفتن قفل تمام شده باشد
+                stored = cache.get(cache_key)
+                if stored is not None:
+                    return _replay(stored, fingerprint)
+
+                response = view_method(self, request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    cache.set(
+                        cache_key,
+                        {'fingerprint': fingerprint, 'status': response.status_code, 'data': response.data},
+                        settings.IDEMPOTENCY_KEY_TTL,
+                    )
+                return response
+            finally:
+                cache.delete(lock_key)
+        return wrapper
+    return decorator
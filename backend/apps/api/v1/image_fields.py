@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from apps.shop.image_variants import build_srcset
+
+
+def media_url_builder(storage, request):
+    """ تابع تبدیل مسیر فایل به آدرس، با همان منطق ImageField.to_representation در DRF """
+    def url(name):
+        if not api_settings.UPLOADED_FILES_USE_URL:
+            return name
+        value = storage.url(name)
+        return request.build_absolute_uri(value) if request is not None else value
+    return url
+
+
+class SrcsetField(serializers.Field):
+    """
+    srcset نسخه‌های کوچک‌شده تصویر به تفکیک فرمت:
+    {"webp": "... 160w, ... 480w", "jpeg": "..."}؛ تا ساخته نشدن نسخه‌های تصویر فعلی null است.
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        # کل رکورد لازم است تا نسخه‌ها با تصویر فعلی مقایسه شوند
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.storage = parent.Meta.model._meta.get_field(self.image_field).storage
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        url = media_url_builder(self.storage, self.context.get('request'))
+        return build_srcset(instance.variants, url, image.name if image else None)
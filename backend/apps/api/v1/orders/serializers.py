@@ -10,6 +10,8 @@ class CheckoutSerializer(serializers.Serializer):
     """سریالایزر برای فرآیند تسویه حساب"""
     address_id = serializers.IntegerField(write_only=True)
     payment_type = serializers.ChoiceField(choices=PaymentType.choices)
+    # نسخه سبدی که کاربر دیده (اختیاری)؛ اگر سبد در این فاصله تغییر کرده باشد سفارش ثبت نمی‌شود
+    cart_version = serializers.IntegerField(required=False, min_value=0)
     
     def validate_address_id(self, value):
         """بررسی می‌کند که آیا آدرس متعلق به کاربر فعلی است یا خیر"""
@@ -26,10 +28,11 @@ class OrderItemSerializer(serializers.ModelSerializer):
     """سریالایزر برای آیتم‌های سفارش"""
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_brand = serializers.CharField(source='product.brand', read_only=True)
+    product_image = serializers.ImageField(source='product.main_image', read_only=True)
     
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'product_name', 'product_brand', 'price_at_time_of_purchase']
+        fields = ['id', 'product', 'product_name', 'product_brand', 'product_image', 'quantity', 'price_at_time_of_purchase']
 
 # ========= Order Serializer ======== #
 class OrderSerializer(serializers.ModelSerializer):
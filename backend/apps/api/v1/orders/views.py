@@ -3,7 +3,10 @@ from rest_framework.response import Response
 from rest_framework.generics import GenericAPIView
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from apps.orders.models import Order, OrderItem
+from apps.orders.inventory import InsufficientStock, reserve_stock
+from apps.api.v1.idempotency import idempotent
 from apps.payments.models import Payment, PaymentStatus, PaymentType
 from drf_spectacular.utils import extend_schema
 
@@ -12,7 +15,7 @@ from .serializers import (
     PaymentSerializer,
     CheckoutSerializer,
 )
-from apps.carts.models import Cart, CartItem
+from apps.carts.models import Cart, CartItem, CartLocked, CartVersionMismatch
 from apps.accounts.models import Address, Profile
 from .serializers import AddressSerializer
 
@@ -38,7 +41,7 @@ class CheckoutView(GenericAPIView):
         address_serializer = AddressSerializer(addresses, many=True)
         
         # محاسبه مجموع قیمت
-        total_amount = sum(item.product.price for item in cart.items.all())
+        total_amount = sum(item.product.price * item.quantity for item in cart.items.all())
         
         # آماده‌سازی داده‌ها برای نمایش
         cart_data = {
@@ -51,92 +54,127 @@ class CheckoutView(GenericAPIView):
                         "brand": item.product.brand,
                         "price": item.product.price,
                     },
-                    "total_price": item.product.price
+                    "quantity": item.quantity,
+                    "total_price": item.product.price * item.quantity
                 }
                 for item in cart.items.all()
             ],
             "total_amount": total_amount,
+            "cart_version": cart.version,  # برای ارسال در ثبت سفارش
             "addresses": address_serializer.data  # اضافه کردن آدرس‌ها به پاسخ
         }
         
         return Response(cart_data)
     
+    @idempotent('checkout')
     def post(self, request):
-        """ایجاد سفارش نهایی از سبد خرید با استفاده از آدرس انتخاب شده"""
-        cart = get_object_or_404(Cart, user=request.user)
+        """
+        ایجاد سفارش نهایی از سبد خرید با استفاده از آدرس انتخاب شده.
+        تعداد کوئری‌ها به اندازه سبد بستگی ندارد: یک خواندن آیتم‌ها همراه محصول،
+        یک bulk_create آیتم‌های سفارش، یک INSERT پرداخت (در سیگنال) و یک DELETE سبد.
+        با هدر Idempotency-Key تکرار درخواست پاسخ سفارش قبلی را برمی‌گرداند.
+        ردیف سبد تا پایان تراکنش قفل می‌شود؛ ثبت همزمان از تب دیگر فورا 409 می‌گیرد.
+        """
+        serializer = self.get_serializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        if not cart.items.exists():
-            return Response(
-                {"error": "سبد خرید شما خالی است."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        address_id = serializer.validated_data['address_id']
+        payment_type = serializer.validated_data['payment_type']
         
-        serializer = self.get_serializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            address_id = serializer.validated_data['address_id']
-            payment_type = serializer.validated_data['payment_type']
-            
-            # دریافت آدرس انتخاب شده
-            address = get_object_or_404(Address, id=address_id, user=request.user)
-            
-            # ساخت رشته آدرس کامل برای ذخیره در مدل Order
-            shipping_address = (
-                f"{address.province}, {address.city}, {address.street}, "
-                f"کد پستی: {address.postal_code}\n{address.detail}"
-            )
-            
-            # محاسبه مجموع قیمت
-            total_amount = sum(item.product.price for item in cart.items.all())
-            
-            try:
-                with transaction.atomic():
-                    # ایجاد سفارش
-                    order = Order.objects.create(
-                        user=request.user,
-                        shipping_address=shipping_address,
-                        total_amount=total_amount,
-                        payment_type=payment_type
+        # دریافت آدرس انتخاب شده
+        address = get_object_or_404(Address, id=address_id, user=request.user)
+        
+        # ساخت رشته آدرس کامل برای ذخیره در مدل Order
+        shipping_address = (
+            f"{address.province}, {address.city}, {address.street}, "
+            f"کد پستی: {address.postal_code}\n{address.detail}"
+        )
+        
+        try:
+            with transaction.atomic():
+                cart = Cart.lock_for_checkout(request.user, serializer.validated_data.get('cart_version'))
+                cart_items = list(cart.items.select_related('product')) if cart else []
+                
+                if not cart_items:
+                    return Response(
+                        {"error": "سبد خرید شما خالی است."},
+                        status=status.HTTP_400_BAD_REQUEST
                     )
-                    
-                    # ایجاد آیتم‌های سفارش و کاهش موجودی
-                    for cart_item in cart.items.all():
-                        OrderItem.objects.create(
-                            order=order,
-                            product=cart_item.product,
-                            price_at_time_of_purchase=cart_item.product.price
-                        )
-                        product = cart_item.product
-                        product.save()
-                    
-                    # خالی کردن سبد خرید
-                    cart.items.all().delete()
-                    
-                    payment = Payment.objects.get(order=order)
-                    
-                    # آماده‌سازی پاسخ
-                    response_data = {
-                        "order": OrderSerializer(order).data,
-                        "payment": PaymentSerializer(payment).data,
-                        "message": "سفارش شما با موفقیت ثبت شد."
-                    }
-                    
-                    # اگر پرداخت نقدی است، اطلاعات کارت را اضافه کن
-                    if payment_type == PaymentType.CASH:
-                        response_data["card_info"] = {
-                            "card_number": "1234-5678-9012-3456",
-                            "card_holder": "نام صاحب کارت",
-                            "bank": "نام بانک"
-                        }
-                        response_data["next_step"] = "لطفاً تصویر تراکنش را آپلود کنید."
-                    else:
-                        response_data["next_step"] = "تیم ما به زودی با شما تماس خواهد گرفت."
-                    
-                    return Response(response_data, status=status.HTTP_201_CREATED)
-            
-            except Exception as e:
-                return Response(
-                    {"error": f"خطا در ایجاد سفارش: {str(e)}"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                
+                # محاسبه مجموع قیمت
+                total_amount = sum(item.product.price * item.quantity for item in cart_items)
+                
+                # ایجاد سفارش (سیگنال پرداخت را می‌سازد و روی order.payment کش می‌کند)
+                order = Order.objects.create(
+                    user=request.user,
+                    shipping_address=shipping_address,
+                    total_amount=total_amount,
+                    payment_type=payment_type
                 )
+                
+                # ایجاد آیتم‌های سفارش با یک INSERT
+                order_items = OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=cart_item.product,
+                        quantity=cart_item.quantity,
+                        price_at_time_of_purchase=cart_item.product.price
+                    )
+                    for cart_item in cart_items
+                ])
+                
+                # حذف فقط آیتم‌های سفارش داده شده؛ آیتمی که همزمان به سبد اضافه شده (ویوهای سبد قفل نمی‌گیرند)
+                # در سبد می‌ماند. با تغییر نسخه، درخواست‌هایی که سبد قبلی را دیده‌اند رد می‌شوند
+                CartItem.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+                cart.bump_version()
+                
+                payment = order.payment
+                
+                # کاهش موجودی با یک UPDATE شرطی؛ آخرین کار تراکنش تا قفل ردیف‌ها کوتاه بماند
+                reserve_stock(order, order_items)
+                
+                # آیتم‌های سفارش همراه محصول برای سریالایزر (یک کوئری)
+                prefetch_related_objects([order], Prefetch('items', queryset=OrderItem.objects.select_related('product')))
+                
+                # آماده‌سازی پاسخ
+                response_data = {
+                    "order": OrderSerializer(order).data,
+                    "payment": PaymentSerializer(payment).data,
+                    "message": "سفارش شما با موفقیت ثبت شد."
+                }
+                
+                # اگر پرداخت نقدی است، اطلاعات کارت را اضافه کن
+                if payment_type == PaymentType.CASH:
+                    response_data["card_info"] = {
+                        "card_number": "1234-5678-9012-3456",
+                        "card_holder": "نام صاحب کارت",
+                        "bank": "نام بانک"
+                    }
+                    response_data["next_step"] = "لطفاً تصویر تراکنش را آپلود کنید."
+                else:
+                    response_data["next_step"] = "تیم ما به زودی با شما تماس خواهد گرفت."
+                
+                return Response(response_data, status=status.HTTP_201_CREATED)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except CartLocked:
+            return Response(
+                {"error": "سفارش دیگری از همین سبد خرید در حال ثبت است."},
+                status=status.HTTP_409_CONFLICT
+            )
+        except CartVersionMismatch as e:
+            return Response(
+                {"error": "سبد خرید شما تغییر کرده است. لطفا دوباره بررسی کنید.", "cart_version": e.current_version},
+                status=status.HTTP_409_CONFLICT
+            )
+        except InsufficientStock as e:
+            return Response(
+                {"error": "موجودی برخی از محصولات سبد خرید کافی نیست.", "product_ids": e.product_ids},
+                status=status.HTTP_409_CONFLICT
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"خطا در ایجاد سفارش: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
@@ -0,0 +1,187 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+
+from apps.shop.models import Product, ProductImage
+from apps.api.v1.fieldsets import filter_field_names
+from apps.api.v1.image_fields import media_url_builder
+from apps.shop.image_variants import build_srcset
+from .serializers import ProductListSerializer, CarSerializer, CategorySerializer
+
+# مقدار جایگزین pk برای ساخت یک‌باره قالب آدرس‌ها به جای reverse() در هر ردیف
+PK_PLACEHOLDER = '__pk__'
+
+
+def url_template(view_name, request):
+    """آدرس جزئیات را یک بار می‌سازد و تابعی برمی‌گرداند که pk را در آن قرار می‌دهد"""
+    prefix, suffix = reverse(view_name, kwargs={'pk': PK_PLACEHOLDER}, request=request).split(PK_PLACEHOLDER, 1)
+    return lambda pk: f"{prefix}{pk}{suffix}"
+
+
+# ===== Base Fast Serializer ===== #
+class FastListSerializer(ABC):
+    """
+    ساخت خروجی لیست مستقیم از ردیف‌های values() بدون ساختن فیلدهای DRF برای هر شیء.
+    خروجی باید دقیقا با serializer_class یکسان باشد (ترتیب کلیدها و قالب مقادیر).
+    """
+    serializer_class = None
+    # ستون‌هایی که از values() خوانده می‌شوند
+    value_fields = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.request = self.context.get('request')
+        self.field_names = filter_field_names(self.serializer_class.Meta.fields, self.request)
+
+    def get_value_fields(self, ordering=()):
+        # ستون‌های ترتیب هم لازم‌اند تا صفحه‌بندی keyset بتواند cursor بسازد
+        names = list(self.value_fields) + [field.lstrip('-') for field in ordering if isinstance(field, str)]
+        return list(dict.fromkeys(names))
+
+    @abstractmethod
+    def to_representation(self, rows):
+        """ لیست دیکشنری‌های خروجی از روی ردیف‌های values() """
+
+    def products_url_template(self, param):
+        url = reverse('api:v1:product-list', request=self.request)
+        return lambda pk: f"{url}?{param}={pk}"
+
+
+# ===== Product List ===== #
+class FastProductListSerializer(FastListSerializer):
+    serializer_class = ProductListSerializer
+    value_fields = ('id', 'name', 'slug', 'brand', 'part_code', 'price', 'category__name', 'is_stock', 'main_image')
+    price_field = serializers.DecimalField(
+        max_digits=Product._meta.get_field('price').max_digits,
+        decimal_places=Product._meta.get_field('price').decimal_places,
+    )
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        names = self.field_names
+        detail_url = url_template('api:v1:product-detail', self.request) if 'url_detail' in names else None
+        images = self.get_images([row['id'] for row in rows]) if 'images' in names else None
+        price = self.price_field.to_representation
+        storage = Product._meta.get_field('main_image').storage
+
+        data = []
+        for row in rows:
+            values = {
+                'id': row['id'],
+                'name': row['name'],
+                'slug': row['slug'],
+                'brand': row['brand'],
+                'part_code': row['part_code'],
+                'price': price(row['price']),
+                'category_name': row['category__name'],
+                'is_stock': row['is_stock'],
+                'main_image': self.image_url(storage, row['main_image']),
+            }
+            if detail_url:
+                values['url_detail'] = detail_url(row['id'])
+            if images is not None:
+                values['images'] = images.get(row['id'], [])
+            data.append({name: values[name] for name in names})
+        return data
+
+    def get_images(self, product_ids):
+        """تصاویر همه محصولات صفحه با یک کوئری، با همان قالب و ترتیب (id) ProductImageSerializer در ProductViewSet"""
+        if not product_ids:
+            return {}
+        storage = ProductImage._meta.get_field('image').storage
+        rows = (
+            ProductImage.objects.filter(product_id__in=product_ids)
+            .order_by('product_id', 'id')
+            .values_list('product_id', 'id', 'image', 'is_main', 'variants')
+        )
+        variant_url = media_url_builder(storage, self.request)
+
+        images = defaultdict(list)
+        for product_id, image_id, name, is_main, variants in rows:
+            images[product_id].append({
+                'id': image_id,
+                'image': self.image_url(storage, name),
+                'is_main': is_main,
+                'srcset': build_srcset(variants, variant_url, name),
+            })
+        return images
+
+    def image_url(self, storage, name):
+        # همان منطق ImageField.to_representation در DRF
+        if not name:
+            return None
+        if not api_settings.UPLOADED_FILES_USE_URL:
+            return name
+        url = storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+
+# ===== Car List ===== #
+class FastCarSerializer(FastListSerializer):
+    serializer_class = CarSerializer
+    value_fields = ('id', 'make', 'model', 'year')
+
+    def to_representation(self, rows):
+        names = self.field_names
+        detail_url = url_template('api:v1:car-detail', self.request) if 'url' in names else None
+        products_url = self.products_url_template('compatible_cars') if 'products_url' in names else None
+
+        data = []
+        for row in rows:
+            values = dict(row)
+            if detail_url:
+                values['url'] = detail_url(row['id'])
+            if products_url:
+                values['products_url'] = products_url(row['id'])
+            data.append({name: values[name] for name in names})
+        return data
+
+
+# ===== Category List ===== #
+class FastCategorySerializer(FastListSerializer):
+    serializer_class = CategorySerializer
+    value_fields = ('id', 'name', 'parent')
+
+    def to_representation(self, rows):
+        names = self.field_names
+        detail_url = url_template('api:v1:category-detail', self.request) if 'url' in names else None
+        products_url = self.products_url_template('category') if 'products_url' in names else None
+
+        data = []
+        for row in rows:
+            values = dict(row)
+            if detail_url:
+                values['url'] = detail_url(row['id'])
+            if products_url:
+                values['products_url'] = products_url(row['id'])
+            data.append({name: values[name] for name in names})
+        return data
+
+
+# ===== Fast List View Mixin ===== #
+class FastListMixin:
+    """
+    اکشن list را با fast_serializer_class و values() اجرا می‌کند.
+    با fast_list = False به مسیر عادی ModelSerializer برمی‌گردد.
+    """
+    fast_serializer_class = None
+    fast_list = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_list or self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_serializer_class(context=self.get_serializer_context())
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        queryset = queryset.values(*serializer.get_value_fields(queryset.query.order_by))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
@@ -1,5 +1,35 @@
 import django_filters
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
 from apps.shop.models import Product, Category, Car
+from apps.shop.normalization import normalize_text, normalize_part_code
+from apps.shop.search import search_products
+from apps.shop.fitment import fitment_product_ids
+
+# ======== Normalized Filters ======== #
+class NormalizedCharFilter(django_filters.CharFilter):
+    """
+    فیلتر متنی روی ستون‌های نرمال شده.
+    مقدار ورودی هم با همان قواعد نرمال می‌شود تا تطبیق با یک مقایسه ساده انجام شود.
+    """
+    def filter(self, qs, value):
+        return super().filter(qs, normalize_text(value))
+
+
+class NormalizedSearchFilter(SearchFilter):
+    """
+    SearchFilter که عبارت جستجو را قبل از مقایسه با ستون‌های نرمال شده، نرمال می‌کند.
+    ستون‌های نرمال شده از قبل حروف کوچک دارند، پس به جای icontains (که UPPER(col) LIKE می‌سازد)
+    با contains مقایسه می‌شوند تا ایندکس تریگرام همان ستون استفاده شود.
+    """
+    def get_search_terms(self, request):
+        return [normalize_text(term) for term in super().get_search_terms(request) if normalize_text(term)]
+
+    def construct_search(self, field_name, queryset):
+        if field_name.endswith('_normalized'):
+            return f"{field_name}__contains"
+        return super().construct_search(field_name, queryset)
+
 
 # ======== Product Filter ======== #
 class ProductFilter(django_filters.FilterSet):
@@ -8,32 +38,83 @@ class ProductFilter(django_filters.FilterSet):
     این فیلترینگ براساس نام، برند، کد قطعه، قیمت، موجودی، دسته‌بندی، خودروهای سا‌زگار،
     برند، خودروهای سا‌زگار، سال ساخت خودرو، و قیمت با محدودیت‌هاهست.
     """
-    name = django_filters.CharFilter(lookup_expr='icontains')
-    brand = django_filters.CharFilter(lookup_expr='icontains')
-    part_code = django_filters.CharFilter(lookup_expr='icontains')
+    name = NormalizedCharFilter(field_name='name_normalized', lookup_expr='contains')
+    brand = NormalizedCharFilter(field_name='brand_normalized', lookup_expr='contains')
+    part_code = django_filters.CharFilter(method='filter_part_code')
     min_price = django_filters.NumberFilter(field_name="price", lookup_expr='gte')
     max_price = django_filters.NumberFilter(field_name="price", lookup_expr='lte')
     in_stock = django_filters.BooleanFilter(method='filter_in_stock')
     category = django_filters.ModelChoiceFilter(queryset=Category.objects.all())
+    category_subtree = django_filters.NumberFilter(method='filter_category_subtree')
     compatible_cars = django_filters.ModelChoiceFilter(queryset=Car.objects.all())
-    car_make = django_filters.CharFilter(method='filter_car_make')
-    car_model = django_filters.CharFilter(method='filter_car_model')
-    car_year = django_filters.NumberFilter(method='filter_car_year')
+    # سه فیلتر خودرو با هم در filter_queryset روی ایندکس سازگاری اعمال می‌شوند
+    car_make = django_filters.CharFilter(method='filter_fitment')
+    car_model = django_filters.CharFilter(method='filter_fitment')
+    car_year = django_filters.NumberFilter(method='filter_fitment')
     
     class Meta:
         model = Product
         fields = ['name', 'brand', 'part_code', 'category', 'in_stock']
     
+    def filter_part_code(self, queryset, name, value):
+        """ تطبیق پیشوندی روی کلید کد قطعه که از ایندکس btree استفاده می‌کند """
+        key = normalize_part_code(value)
+        if not key:
+            return queryset
+        return queryset.filter(part_code_key__startswith=key)
+    
+    def filter_category_subtree(self, queryset, name, value):
+        """ محصولات یک دسته‌بندی و همه زیرشاخه‌هایش با یک شرط پیشوندی روی مسیر درخت """
+        path = Category.objects.filter(pk=value).values_list('path', flat=True).first()
+        if not path:
+            return queryset.none()
+        return queryset.filter(category__path__startswith=path)
+    
     def filter_in_stock(self, queryset, name, value):
         if value:
             return queryset.filter(is_stock=True)
         return queryset
     
-    def filter_car_make(self, queryset, name, value):
-        return queryset.filter(compatible_cars__make__icontains=value).distinct()
-    
-    def filter_car_model(self, queryset, name, value):
-        return queryset.filter(compatible_cars__model__icontains=value).distinct()
+    def filter_fitment(self, queryset, name, value):
+        # اعمال واقعی در filter_queryset انجام می‌شود
+        return queryset
     
-    def filter_car_year(self, queryset, name, value):
-        return queryset.filter(compatible_cars__year=value).distinct()
\ No newline at end of file
+    def filter_queryset(self, queryset):
+        """
+        برند، مدل و سال خودرو به جای سه join جداگانه روی compatible_cars و DISTINCT،
+        با یک زیرکوئری روی ایندکس (make, model, year) جدول ProductFitment اعمال می‌شوند.
+        """
+        queryset = super().filter_queryset(queryset)
+        make = normalize_text(self.form.cleaned_data.get('car_make'))
+        model = normalize_text(self.form.cleaned_data.get('car_model'))
+        year = self.form.cleaned_data.get('car_year')
+        if make or model or year:
+            queryset = queryset.filter(id__in=fitment_product_ids(make=make, model=model, year=year))
+        return queryset
+
+# ======== Product Search Filter ======== #
+class ProductSearchFilter(BaseFilterBackend):
+    """
+    جستجوی متنی محصولات با پارامتر ?q=
+    به جای SearchFilter (که روی جدول خودروها join و ICONTAINS زنجیره‌ای می‌ساخت)
+    از ایندکس جستجوی محصول استفاده می‌کند. پارامتر قدیمی ?search= هم پشتیبانی می‌شود.
+    اگر ترتیب صریحی درخواست نشده باشد، نتایج بر اساس امتیاز مرتب می‌شوند.
+    """
+    search_params = ('q', 'search')
+
+    def get_search_term(self, request):
+        for param in self.search_params:
+            term = request.query_params.get(param, '').strip()
+            if term:
+                return term
+        return ''
+
+    def filter_queryset(self, request, queryset, view):
+        term = self.get_search_term(request)
+        if not term:
+            return queryset
+
+        queryset = search_products(queryset, term)
+        if not request.query_params.get(OrderingFilter.ordering_param):
+            queryset = queryset.order_by('-search_rank', 'id')
+        return queryset
@@ -0,0 +1,186 @@
+import json
+import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# ======== Keyset Pagination ======== #
+class KeysetPagination(BasePagination):
+    """
+    صفحه‌بندی keyset (مبتنی بر cursor) روی تاپل پایدار (فیلدهای ترتیب، id).
+    برخلاف صفحه‌بندی offset، کوئری هر صفحه فقط با یک شرط روی ایندکس ترتیب
+    اجرا می‌شود و هیچ COUNT(*) ای گرفته نمی‌شود؛ پس زمان پاسخ و مصرف حافظه
+    با بزرگ شدن کاتالوگ ثابت می‌ماند.
+    cursor یک رشته مات (base64) است که ترتیب و مقادیر آخرین ردیف را نگه می‌دارد.
+    """
+    page_size = 24
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    tiebreaker = 'id'
+    invalid_cursor_message = 'cursor نامعتبر است.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor['r'])
+
+        queryset = queryset.order_by(*self.get_order_by(reverse=self.reverse))
+        if cursor:
+            queryset = queryset.filter(self.get_position_filter(cursor['v'], reverse=self.reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        # در حرکت رو به جلو «بعدی» از has_more و «قبلی» از وجود cursor معلوم می‌شود و در حرکت معکوس برعکس
+        if self.reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'مقدار cursor صفحه‌بندی',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'تعداد نتایج در هر صفحه (حداکثر {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    # ======== Ordering ========
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        """
+        ترتیب فعلی کوئری (حاصل OrderingFilter یا جستجو) به همراه id برای یکتا شدن.
+        """
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not ordering:
+            ordering = list(queryset.model._meta.ordering or [])
+        ordering = [field.replace('pk', self.tiebreaker) if field.lstrip('-') == 'pk' else field for field in ordering]
+        if not any(field.lstrip('-') == self.tiebreaker for field in ordering):
+            ordering.append(self.tiebreaker)
+        # هر چیزی بعد از id برای یکتایی لازم نیست
+        index = next(i for i, field in enumerate(ordering) if field.lstrip('-') == self.tiebreaker)
+        return ordering[:index + 1]
+
+    def get_order_by(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def get_position_filter(self, values, reverse=False):
+        """
+        شرط «بعد از موقعیت cursor» برای تاپل ترتیب:
+        (a > va) OR (a = va AND b > vb) OR ... با رعایت جهت هر فیلد.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    # ======== Cursor ========
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if cursor['o'] != self.ordering or len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            cursor['r'] = bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, item, reverse):
+        values = [self.get_item_value(item, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps({'o': self.ordering, 'v': values, 'r': reverse}, default=self.encode_value)
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def encode_value(self, value):
+        """ تاریخ با دقت کامل میکروثانیه ذخیره می‌شود تا مقایسه تساوی در cursor درست بماند """
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f'{type(value).__name__} قابل ذخیره در cursor نیست')
+
+    def get_item_value(self, item, field):
+        """ ردیف‌ها می‌توانند نمونه مدل یا دیکشنری حاصل values() باشند """
+        if isinstance(item, dict):
+            return item[field]
+        return getattr(item, field)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+# ======== Product Pagination ======== #
+class ProductCursorPagination(KeysetPagination):
+    """ صفحه‌بندی لیست عمومی محصولات """
+    page_size = 24
+    max_page_size = 100
@@ -2,15 +2,20 @@ from rest_framework import serializers
 from rest_framework.reverse import reverse
 
 from apps.shop.models import Product, ProductImage, Category, Car
+from apps.shop.recommendations import recommended_products
+from apps.api.v1.fieldsets import SparseFieldsetSerializerMixin
+from apps.api.v1.image_fields import SrcsetField
 
 # ======= Product Image Serializers ======= #
 class ProductImageSerializer(serializers.ModelSerializer):
+    srcset = SrcsetField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'is_main']
+        fields = ['id', 'image', 'is_main', 'srcset']
 
 # ======= Car Serializers ======= #
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     url = serializers.HyperlinkedIdentityField(
         view_name='api:v1:car-detail',
         lookup_field='pk'
@@ -28,7 +33,7 @@ class CarSerializer(serializers.ModelSerializer):
         return f"{url}?compatible_cars={obj.id}"
 
 # ======= Category Serializers ======= #
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
         
     url = serializers.HyperlinkedIdentityField(
         view_name='api:v1:category-detail',
@@ -46,7 +51,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return f"{url}?category={obj.id}"
 
 # ======= Product Serializers ======= #
-class ProductListSerializer(serializers.HyperlinkedModelSerializer):
+class ProductListSerializer(SparseFieldsetSerializerMixin, serializers.HyperlinkedModelSerializer):
     """
     سریالایزر مربوط به محصولات به همراه لیست عکس ها
     """
@@ -57,21 +62,36 @@ class ProductListSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Product
         fields = [
-            'id', 'url_detail', 'name', 'brand', 'part_code', 
-            'price', 'category_name', "is_stock", 'images'
+            'id', 'url_detail', 'name', 'slug', 'brand', 'part_code', 
+            'price', 'category_name', "is_stock", 'main_image', 'images'
         ]
 
+# ======= Related Product Serializers ======= #
+class RelatedProductSerializer(serializers.ModelSerializer):
+    """
+    سریالایزر خلاصه محصول برای پیشنهادهای «معمولا با هم خریداری می‌شوند»
+    """
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'slug', 'brand', 'part_code', 'price', 'is_stock', 'main_image']
+
 # ======= Product Detail Serializers ======= #
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     compatible_cars = CarSerializer(many=True, read_only=True)
+    frequently_bought_together = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
         fields = [
-            'id', 'name', 'description', 'part_code', 'brand', 
+            'id', 'name', 'slug', 'description', 'part_code', 'brand', 
             'country_of_origin', 'warranty', 'price',
             'is_stock', 'allow_individual_sale',
-            'category', 'compatible_cars', 'images', 'is_active'
-        ]
\ No newline at end of file
+            'category', 'compatible_cars', 'images', 'is_active',
+            'frequently_bought_together'
+        ]
+    
+    def get_frequently_bought_together(self, obj):
+        products = recommended_products(obj.pk)
+        return RelatedProductSerializer(products, many=True, context=self.context).data
\ No newline at end of file
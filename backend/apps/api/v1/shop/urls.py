@@ -1,7 +1,7 @@
 # urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CarViewSet, CategoryViewSet
+from .views import ProductViewSet, CarViewSet, CategoryViewSet, AutocompleteView, CatalogManifestView
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
@@ -9,5 +9,7 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'cars', CarViewSet, basename='car')
 
 urlpatterns = [
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path('catalog/manifest/', CatalogManifestView.as_view(), name='catalog-manifest'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,59 +1,283 @@
-from rest_framework import viewsets, filters
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.reverse import reverse
+from django.db.models import Case, When, Value, IntegerField, Prefetch
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.utils.http import urlencode
+from django.utils.decorators import method_decorator
+import hashlib
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from apps.shop.models import Product, Car, Category
+from apps.shop.models import Product, ProductImage, ProductSlugRedirect, Car, Category
+from apps.shop.normalization import normalize_text, normalize_part_code
+from apps.shop.facets import compute_facets
+from apps.shop.category_tree import get_category_tree
+from apps.shop.autocomplete import autocomplete_index
+from apps.shop.catalog_version import catalog_conditional
+from apps.shop.snapshot import read_manifest
+from apps.shop.recommendations import recommended_products
+from apps.shop.product_cache import get_cached_product_detail, set_cached_product_detail, get_cached_product_id
+from apps.api.v1.fieldsets import SparseFieldsetViewMixin, FIELDS_PARAM, OMIT_PARAM
 from .serializers import (
     ProductListSerializer,
     ProductDetailSerializer,
+    RelatedProductSerializer,
     CategorySerializer,
     CarSerializer
 )
-from .filters import ProductFilter
+from .fast_serializers import FastListMixin, FastProductListSerializer, FastCarSerializer, FastCategorySerializer
+from .filters import ProductFilter, ProductSearchFilter
+from .pagination import ProductCursorPagination
+
+# فیلد پیشنهادهای جزئیات محصول که خارج از کش محاسبه می‌شود
+RECOMMENDATIONS_FIELD = 'frequently_bought_together'
 
 # ========= Product ViewSet ========= #
 @extend_schema(tags=["Products"])
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(catalog_conditional, name='dispatch')
+class ProductViewSet(FastListMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     ویوست برای نمایش لیست محصولات با فیلترینگ و جستجو
     و نمایش جزئیات هر محصول
     """
     queryset = Product.objects.filter(is_active=True)
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ProductSearchFilter بعد از OrderingFilter می‌آید تا در صورت نبود ترتیب صریح، براساس امتیاز مرتب کند
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
     filterset_class = ProductFilter
-    search_fields = ['name', 'brand', 'part_code', 'compatible_cars__make', 'compatible_cars__model']
+    pagination_class = ProductCursorPagination
+    # لیست از مسیر سریع values() ساخته می‌شود (خروجی یکسان با ProductListSerializer)
+    fast_serializer_class = FastProductListSerializer
     ordering_fields = ['name', 'price', 'created_at']
     ordering = ['name']
+    by_code_limit = 20
+    by_code_max_limit = 50
+    facets_cache_timeout = 60
+    # پارامترهایی که روی شمارش فیلترها اثری ندارند
+    facets_ignored_params = ('cursor', 'page_size', 'ordering', 'format', 'fields', 'omit')
+    # روابطی که فقط در صورت حضور فیلد مربوطه در پاسخ بارگذاری می‌شوند
+    # تصاویر با ترتیب صریح، همان ترتیب FastProductListSerializer.get_images
+    sparse_select_related = {'category': 'category', 'category_name': 'category'}
+    sparse_prefetch_related = {
+        'images': Prefetch('images', queryset=ProductImage.objects.order_by('id')),
+        'compatible_cars': 'compatible_cars',
+    }
     
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'by_code'):
             return ProductListSerializer
         return ProductDetailSerializer
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        # اطمینان از اینکه تصویر اصلی در کوئری وجود دارد
-        queryset = queryset.prefetch_related('images', 'compatible_cars').select_related('category')
-        return queryset
+        # فقط روابطی که در پاسخ (با توجه به ?fields= و ?omit=) لازم هستند بارگذاری می‌شوند
+        return self.apply_sparse_related(queryset)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        جزئیات محصول با شناسه یا اسلاگ (/products/<slug>/).
+        پاسخ از کش خوانده می‌شود (read-through) و فقط در نبود کش کوئری و سریالایز انجام می‌شود.
+        اسلاگ‌های قدیمی محصولات تغییر نام داده شده با 301 به آدرس جدید هدایت می‌شوند.
+        درخواست‌های دارای ?fields= یا ?omit= کش نمی‌شوند.
+        پیشنهادهای «معمولا با هم خریداری می‌شوند» قیمت و موجودی محصولات دیگر را دارند و با تغییر
+        آن محصولات باطل نمی‌شوند، پس در کش نگه داشته نمی‌شوند و در هر درخواست با یک کوئری اضافه می‌شوند.
+        """
+        lookup = self.get_lookup_value()
+        use_cache = not (FIELDS_PARAM in request.query_params or OMIT_PARAM in request.query_params)
+        if use_cache:
+            product_id = int(lookup) if lookup.isdigit() else get_cached_product_id(lookup)
+            data = get_cached_product_detail(product_id, request) if product_id is not None else None
+            if data is not None:
+                return Response(self.with_recommendations(data, product_id))
+
+        try:
+            instance = self.get_object()
+        except Http404:
+            redirect = self.get_slug_redirect(lookup)
+            if redirect is None:
+                raise
+            return redirect
+
+        data = self.get_serializer(instance).data
+        if use_cache:
+            cached = {key: value for key, value in data.items() if key != RECOMMENDATIONS_FIELD}
+            set_cached_product_detail(instance.pk, request, cached, slug=instance.slug)
+        return Response(data)
+    
+    def with_recommendations(self, data, product_id):
+        products = recommended_products(product_id)
+        return {**data, RECOMMENDATIONS_FIELD: RelatedProductSerializer(products, many=True, context=self.get_serializer_context()).data}
+    
+    def get_lookup_value(self):
+        return str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field, ''))
+    
+    def get_object(self):
+        """ مقدار عددی شناسه است و در غیر این صورت اسلاگ (ستون یکتا و ایندکس شده) """
+        lookup = self.get_lookup_value()
+        if lookup.isdigit():
+            return super().get_object()
+        obj = get_object_or_404(self.filter_queryset(self.get_queryset()), slug=lookup)
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def get_slug_redirect(self, lookup):
+        if lookup.isdigit():
+            return None
+        slug = (
+            ProductSlugRedirect.objects
+            .filter(old_slug=lookup, product__is_active=True)
+            .values_list('product__slug', flat=True)
+            .first()
+        )
+        if slug is None:
+            return None
+        url = reverse('api:v1:product-detail', kwargs={self.lookup_url_kwarg or self.lookup_field: slug}, request=self.request)
+        query = self.request.META.get('QUERY_STRING')
+        return Response(status=status.HTTP_301_MOVED_PERMANENTLY, headers={'Location': f"{url}?{query}" if query else url})
+    
+    @action(detail=False, methods=['get'], url_path=r'by-code/(?P<code>[^/]+)')
+    def by_code(self, request, code=None):
+        """
+        جستجوی سریع با کد قطعه (با یا بدون خط تیره، فاصله و صفرهای ابتدایی).
+        تطابق دقیق و پیشوندی با یک کوئری روی ایندکس part_code_key انجام می‌شود؛
+        اگر تطابق دقیق وجود داشته باشد فقط همان‌ها برگردانده می‌شوند.
+        """
+        key = normalize_part_code(code)
+        if not key:
+            return Response([])
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.by_code_limit)), self.by_code_max_limit)
+        except ValueError:
+            limit = self.by_code_limit
+
+        products = list(
+            self.get_queryset()
+            .filter(part_code_key__startswith=key)
+            .annotate(is_exact=Case(When(part_code_key=key, then=Value(0)), default=Value(1), output_field=IntegerField()))
+            .order_by('is_exact', 'part_code_key', 'id')[:max(limit, 1)]
+        )
+        if products and products[0].is_exact == 0:
+            products = [product for product in products if product.is_exact == 0]
+
+        serializer = ProductListSerializer(products, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """
+        شمارش محصولات برای فیلتر کناری (برند، دسته‌بندی، کشور سازنده، موجودی و بازه قیمت)
+        با همان فیلترها و جستجوی لیست محصولات؛ شمارش هر فیلتر بدون پارامترهای خودش گرفته می‌شود.
+        نتیجه برای مدت کوتاهی با کلید پارامترهای نرمال شده کش می‌شود.
+        """
+        cache_key = self.get_facets_cache_key(request)
+        data = cache.get(cache_key)
+        if data is None:
+            data = compute_facets(lambda excluded: self.get_facet_queryset(request, excluded))
+            cache.set(cache_key, data, self.facets_cache_timeout)
+        return Response(data)
+    
+    def get_facet_queryset(self, request, excluded_params):
+        """ محصولات فعال با فیلترها و جستجوی درخواست، به جز پارامترهای داده شده """
+        params = request.query_params.copy()
+        for param in excluded_params:
+            params.pop(param, None)
+        filterset = self.filterset_class(params, queryset=Product.objects.filter(is_active=True), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return ProductSearchFilter().filter_queryset(request, filterset.qs, self)
+    
+    def get_facets_cache_key(self, request):
+        params = sorted(
+            (key, normalize_text(value))
+            for key, values in request.query_params.lists()
+            if key not in self.facets_ignored_params
+            for value in values
+            if value.strip()
+        )
+        digest = hashlib.md5(urlencode(params).encode('utf-8')).hexdigest()
+        return f"shop:product-facets:{digest}"
     
 # ===== Category ViewSet ===== #
 @extend_schema(tags=["Categories"])
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(catalog_conditional, name='dispatch')
+class CategoryViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     نمایش لیست دسته‌بندی‌ها برای ساخت منو در فرانت
     """
-    queryset = Category.objects.filter(parent=None)
+    # ترتیب صریح تا هر دو مسیر (سریع و ModelSerializer) خروجی یکسان و پایدار داشته باشند
+    queryset = Category.objects.filter(parent=None).order_by('id')
     serializer_class = CategorySerializer
+    fast_serializer_class = FastCategorySerializer
     pagination_class = None
     
+    @action(detail=False, methods=['get'], url_path='tree')
+    def tree(self, request):
+        """
+        کل درخت دسته‌بندی‌ها به همراه تعداد محصولات هر گره در یک درخواست.
+        خروجی کش می‌شود و با تغییر دسته‌بندی یا محصول باطل می‌شود.
+        """
+        return Response(get_category_tree())
+    
 @extend_schema(tags=["Cars"])
-class CarViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(catalog_conditional, name='dispatch')
+class CarViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     نمایش لیست خودروها برای فیلتر کردن محصولات
     """
-    queryset = Car.objects.all()
+    queryset = Car.objects.order_by('id')
     serializer_class = CarSerializer
+    fast_serializer_class = FastCarSerializer
     pagination_class = None
-    
\ No newline at end of file
+    
+
+# ===== Autocomplete View ===== #
+@extend_schema(
+    tags=["Products"],
+    parameters=[
+        OpenApiParameter('q', str, description="عبارت تایپ شده (حداقل ۲ حرف)"),
+        OpenApiParameter('limit', int, description="حداکثر تعداد پیشنهادها (حداکثر ۲۰)"),
+    ],
+)
+class AutocompleteView(APIView):
+    """
+    پیشنهادهای تکمیل خودکار جعبه جستجو (محصول، کد قطعه، برند، خودرو و دسته‌بندی).
+    پاسخ از ایندکس پیشوندی درون حافظه ورکر داده می‌شود و به دیتابیس کوئری نمی‌زند.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        results = autocomplete_index.search(request.query_params.get('q', ''), limit=max(limit, 1))
+        return Response(results)
+
+
+# ===== Catalog Snapshot Manifest View ===== #
+@extend_schema(tags=["Products"])
+class CatalogManifestView(APIView):
+    """
+    اطلاعات آخرین snapshot فشرده کاتالوگ (نسخه، هش و آدرس فایل‌های json/gzip/brotli).
+    خود فایل‌ها به صورت استاتیک از مسیر media سرو می‌شوند و نام آن‌ها تغییرناپذیر است.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        manifest = read_manifest()
+        if manifest is None:
+            raise NotFound("snapshot کاتالوگ هنوز ساخته نشده است.")
+        for info in manifest["files"].values():
+            info["url"] = request.build_absolute_uri(info["url"])
+        return Response(manifest)
@@ -1,10 +1,32 @@
-from django.db import models
+from django.db import models, OperationalError
+from django.db.models import F
 from django.contrib.auth import get_user_model
 
 from apps.shop.models import Product
 
 User = get_user_model()
 
+# SQLSTATE خطای lock_not_available در PostgreSQL (نتیجه NOWAIT روی ردیف قفل شده)
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def _is_lock_not_available(exc):
+    # psycopg2 کد را در pgcode و psycopg 3 در sqlstate نگه می‌دارد
+    cause = exc.__cause__
+    return LOCK_NOT_AVAILABLE in (getattr(cause, 'pgcode', None), getattr(cause, 'sqlstate', None))
+
+
+class CartLocked(Exception):
+    """ سبد خرید در حال حاضر توسط درخواست دیگری (مثلا ثبت سفارش در تب دیگر) قفل شده است """
+
+
+class CartVersionMismatch(Exception):
+    """ سبد خرید پس از آخرین نمایش به کاربر تغییر کرده است """
+
+    def __init__(self, current_version):
+        self.current_version = current_version
+        super().__init__(f"نسخه فعلی سبد خرید: {current_version}")
+
 # ========= Cart Model ========= #
 class Cart(models.Model):
     """
@@ -12,10 +34,36 @@ class Cart(models.Model):
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE, verbose_name="کاربر")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    # با هر تغییر آیتم‌ها یک واحد زیاد می‌شود؛ ثبت سفارش نسخه دیده شده توسط کاربر را بررسی می‌کند
+    version = models.PositiveIntegerField(default=0, verbose_name="نسخه")
 
     def __str__(self):
         return f"سبد خرید {self.user.username}"
 
+    def bump_version(self):
+        """ افزایش اتمی نسخه پس از تغییر آیتم‌های سبد """
+        Cart.objects.filter(pk=self.pk).update(version=F('version') + 1)
+        self.version += 1
+
+    @classmethod
+    def lock_for_checkout(cls, user, expected_version=None):
+        """
+        قفل ردیف سبد کاربر تا پایان تراکنش (SELECT ... FOR UPDATE NOWAIT)؛ باید داخل transaction.atomic صدا زده شود.
+        اگر سبد توسط درخواست دیگری قفل باشد به جای انتظار فورا CartLocked پرتاب می‌شود.
+        قفل فقط روی ردیف سبد همین کاربر است و کاربران دیگر هرگز منتظر هم نمی‌مانند.
+        در SQLite قفل ردیفی وجود ندارد و کل دیتابیس هنگام نوشتن قفل می‌شود.
+        """
+        try:
+            cart = cls.objects.select_for_update(nowait=True).filter(user=user).first()
+        except OperationalError as exc:
+            # سایر خطاها (مثلا قطع اتصال دیتابیس) نباید به شکل «سبد قفل است» گزارش شوند
+            if not _is_lock_not_available(exc):
+                raise
+            raise CartLocked from exc
+        if cart is not None and expected_version is not None and cart.version != expected_version:
+            raise CartVersionMismatch(cart.version)
+        return cart
+
     class Meta:
         verbose_name = "سبد خرید"
         verbose_name_plural = "سبدهای خرید"
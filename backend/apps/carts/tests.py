@@ -1,3 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.api.v1.carts.serializers import CartOperationSerializer
+from apps.shop.models import Category, Product
+from .models import Cart, CartItem
+
+BATCH_URL = "/api/v1/carts/batch/"
+
+
+# ========= Cart Batch Tests ========= #
+class CartBatchTests(TestCase):
+    """ همگام‌سازی سبد با عملیات گروهی: ترتیب عملیات، تعداد کوئری ثابت، سقف تعداد و تکرار با Idempotency-Key """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        category = Category.objects.create(name="ترمز")
+        cls.products = [
+            Product.objects.create(
+                name=f"لنت {i}", part_code=f"B-{i}", brand="برند",
+                country_of_origin="ایران", price=1000, category=category,
+            )
+            for i in range(30)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, operations, **headers):
+        return self.client.post(BATCH_URL, {"operations": operations}, format="json", headers=headers)
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(cart__user=self.user).values_list("product_id", "quantity"))
+
+    def test_operations_are_folded_in_order(self):
+        first, second, third = self.products[:3]
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=first, quantity=2)
+        CartItem.objects.create(cart=cart, product=third, quantity=1)
+
+        response = self.post([
+            {"op": "add", "product_id": first.id, "quantity": 3},
+            {"op": "add", "product_id": second.id},
+            {"op": "set", "product_id": second.id, "quantity": 4},
+            {"op": "add", "product_id": second.id},
+            {"op": "remove", "product_id": third.id},
+            {"op": "set", "product_id": first.id, "quantity": 0},
+            {"op": "add", "product_id": first.id, "quantity": 2},
+        ])
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.quantities(), {first.id: 2, second.id: 5})
+        self.assertEqual(response.data["total_price"], 7000)
+        cart.refresh_from_db()
+        self.assertEqual(cart.version, 1)
+
+    def test_query_count_is_constant(self):
+        Cart.objects.create(user=self.user)
+
+        def sync(products):
+            operations = [{"op": "set", "product_id": product.id, "quantity": 2} for product in products]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(operations)
+            self.assertEqual(response.status_code, 200, response.data)
+            CartItem.objects.all().delete()
+            return len(queries)
+
+        self.assertEqual(sync(self.products[:2]), sync(self.products))
+
+    def test_summed_quantity_is_capped(self):
+        product = self.products[0]
+        limit = CartOperationSerializer.MAX_QUANTITY
+
+        response = self.post([{"op": "add", "product_id": product.id, "quantity": 3000000000}])
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post([
+            {"op": "add", "product_id": product.id, "quantity": limit},
+            {"op": "add", "product_id": product.id, "quantity": 1},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.quantities(), {})
+
+    def test_idempotent_replay_does_not_apply_twice(self):
+        product = self.products[0]
+        operations = [{"op": "add", "product_id": product.id, "quantity": 2}]
+
+        first = self.post(operations, **{"Idempotency-Key": "sync-1"})
+        replay = self.post(operations, **{"Idempotency-Key": "sync-1"})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(self.quantities(), {product.id: 2})
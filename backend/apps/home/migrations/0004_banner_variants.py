@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0003_contact_is_read"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="banner",
+            name="variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="نسخه\u200cهای تصویر",
+            ),
+        ),
+    ]
@@ -29,6 +29,7 @@ class Banner(models.Model):
     
     user = models.ForeignKey(User, verbose_name=("کاربر"), on_delete=models.CASCADE)
     image = models.ImageField(verbose_name=("تصویر"), upload_to="banners/")
+    variants = models.JSONField(verbose_name=("نسخه‌های تصویر"), default=dict, blank=True, editable=False)
     order = models.IntegerField(verbose_name=("سفارش"), default=0)
     created_at = models.DateTimeField(verbose_name=("تاریخ ایجاد"), auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name=("تاریخ بروزرسانی"), auto_now=True)
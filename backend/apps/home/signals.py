@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.shop.catalog_version import bump_catalog_version
+from apps.shop.image_variants import needs_variants, schedule_variants, delete_variants, variants_generated
+from .models import Banner
+
+# ========= Catalog Version Signal ========= #
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def bump_catalog_version_on_banner_change(sender, raw=False, **kwargs):
+    """ بنرها هم با همان نسخه کاتالوگ کش می‌شوند """
+    if not raw:
+        bump_catalog_version()
+
+# ========= Image Variant Signals ========= #
+@receiver(post_save, sender=Banner)
+def generate_banner_variants(sender, instance, raw=False, **kwargs):
+    """ نسخه‌های کوچک‌شده بنر جدید یا تغییر کرده در پس‌زمینه ساخته می‌شوند """
+    if not raw and needs_variants(instance):
+        schedule_variants(instance)
+
+@receiver(post_delete, sender=Banner)
+def delete_banner_variants(sender, instance, **kwargs):
+    delete_variants(instance.variants, storage=instance.image.storage)
+
+@receiver(variants_generated, sender=Banner)
+def bump_catalog_version_on_variants_generated(sender, **kwargs):
+    bump_catalog_version()
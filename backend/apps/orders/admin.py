@@ -3,4 +3,5 @@ from .models import *
 
 # Register your models here.
 admin.site.register(Order)
-admin.site.register(OrderItem)
\ No newline at end of file
+admin.site.register(OrderItem)
+admin.site.register(StockReservation)
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from apps.shop.models import Product
+from apps.shop.catalog_version import bump_catalog_version
+from apps.shop.product_cache import invalidate_product_detail
+from apps.payments.models import Payment, PaymentStatus
+from .models import Order, OrderStatus, StockReservation
+
+
+class InsufficientStock(Exception):
+    """ موجودی یک یا چند محصول برای سفارش کافی نیست """
+
+    def __init__(self, product_ids):
+        self.product_ids = list(product_ids)
+        super().__init__(f"موجودی کافی نیست: {self.product_ids}")
+
+
+def _per_product(quantities):
+    """ عبارت CASE برای مقدار متفاوت هر محصول در یک UPDATE """
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _stock_changed(product_ids):
+    # is_stock در لیست و جزئیات محصول نمایش داده می‌شود؛ هر دو باطل‌سازی پس از commit اجرا می‌شوند
+    invalidate_product_detail(product_ids)
+    bump_catalog_version()
+
+
+# ===== Reserve ===== #
+def reserve_stock(order, order_items):
+    """
+    کسر موجودی به اندازه تعداد آیتم‌های سفارش و ثبت رزرو با زمان انقضا؛ باید داخل transaction.atomic صدا زده شود.
+    محصولاتی که موجودی‌شان شمارش نمی‌شود (stock_quantity=None) نادیده گرفته می‌شوند.
+
+    کسر موجودی همه محصولات با یک UPDATE شرطی انجام می‌شود:
+    UPDATE ... SET stock_quantity = stock_quantity - n WHERE stock_quantity >= n
+    اگر تعداد ردیف‌های تغییر کرده کمتر از محصولات باشد، UPDATE برگردانده و InsufficientStock پرتاب می‌شود
+    و تراکنش بیرونی همه تغییرات را برمی‌گرداند. چون قفل ردیف فقط از این UPDATE تا commit
+    نگه داشته می‌شود، بهتر است این تابع آخرین کار تراکنش باشد.
+    """
+    quantities = {}
+    for item in order_items:
+        if item.product.stock_quantity is None or item.quantity <= 0:
+            continue
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    if not quantities:
+        return []
+
+    delta = _per_product(quantities)
+    savepoint = transaction.savepoint()
+    updated = Product.objects.filter(pk__in=quantities, stock_quantity__gte=delta).update(
+        stock_quantity=F('stock_quantity') - delta,
+        is_stock=Case(When(stock_quantity__gt=delta, then=Value(True)), default=Value(False)),
+    )
+    if updated != len(quantities):
+        # پس از برگرداندن UPDATE، کمبود از روی موجودی فعلی دیتابیس (نه مقدار خوانده شده در ابتدا) گزارش می‌شود
+        transaction.savepoint_rollback(savepoint)
+        short = Product.objects.filter(pk__in=quantities, stock_quantity__lt=delta).values_list('pk', flat=True)
+        raise InsufficientStock(list(short) or quantities.keys())
+    transaction.savepoint_commit(savepoint)
+
+    expires_at = timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+    reservations = StockReservation.objects.bulk_create([
+        StockReservation(order=order, product_id=product_id, quantity=quantity, expires_at=expires_at)
+        for product_id, quantity in quantities.items()
+    ])
+
+    # محصولاتی که پس از همین UPDATE به صفر رسیده‌اند (با در نظر گرفتن کسرهای همزمان دیگر)
+    sold_out = list(Product.objects.filter(pk__in=quantities, stock_quantity=0).values_list('pk', flat=True))
+    if sold_out:
+        _stock_changed(sold_out)
+    return reservations
+
+
+# ===== Confirm / Release ===== #
+def confirm_reservations(order_ids):
+    """ سفارش تایید شده؛ موجودی قبلا کسر شده و فقط رزروها حذف می‌شوند """
+    StockReservation.objects.filter(order_id__in=order_ids).delete()
+
+
+def release_reservations(order_ids):
+    """ برگرداندن موجودی رزرو شده سفارش‌های لغو شده یا منقضی با یک UPDATE """
+    reservations = StockReservation.objects.filter(order_id__in=order_ids)
+    quantities = dict(reservations.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total'))
+    if not quantities:
+        return 0
+
+    delta = _per_product(quantities)
+    Product.objects.filter(pk__in=quantities, stock_quantity__isnull=False).update(
+        stock_quantity=F('stock_quantity') + delta,
+        is_stock=True,
+    )
+    reservations.delete()
+    _stock_changed(quantities.keys())
+    return sum(quantities.values())
+
+
+def release_expired_reservations(now=None):
+    """
+    سفارش‌های در انتظاری که رزروشان منقضی شده لغو می‌شوند و موجودی‌شان برمی‌گردد.
+    ردیف سفارش‌ها با select_for_update(skip_locked) قفل می‌شود تا سفارشی که همزمان تایید می‌شود
+    (و ردیفش در تراکنش دیگری قفل است) رد شود، نه اینکه پس از تایید لغو شود.
+    تعداد سفارش‌های لغو شده را برمی‌گرداند.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        order_ids = list(
+            Order.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=OrderStatus.PENDING,
+                pk__in=StockReservation.objects.filter(expires_at__lte=now).values('order_id'),
+            )
+            .values_list('pk', flat=True)
+        )
+        if not order_ids:
+            return 0
+        release_reservations(order_ids)
+        cancelled = Order.objects.filter(pk__in=order_ids, status=OrderStatus.PENDING).update(status=OrderStatus.CANCELLED)
+        Payment.objects.filter(order_id__in=order_ids, order__status=OrderStatus.CANCELLED).update(status=PaymentStatus.FAILED)
+    return cancelled
+
+
+def sync_reservations(order_ids, status):
+    """ هماهنگ کردن رزروها با وضعیت جدید سفارش‌ها """
+    if status == OrderStatus.CANCELLED:
+        release_reservations(order_ids)
+    elif status != OrderStatus.PENDING:
+        confirm_reservations(order_ids)
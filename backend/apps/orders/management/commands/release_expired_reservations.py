@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.orders.inventory import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "⏳ لغو سفارش‌های در انتظاری که رزرو موجودی‌شان منقضی شده و برگرداندن موجودی به انبار (مناسب اجرا با cron)"
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        cancelled = release_expired_reservations()
+        self.stdout.write(self.style.SUCCESS(f"✅ {cancelled} سفارش منقضی لغو و موجودی آن‌ها آزاد شد"))
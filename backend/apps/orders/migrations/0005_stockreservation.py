@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_alter_order_total_amount"),
+        ("shop", "0015_product_stock_quantity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="تعداد")),
+                (
+                    "expires_at",
+                    models.DateTimeField(db_index=True, verbose_name="زمان انقضا"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد"),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="orders.order",
+                        verbose_name="سفارش",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="shop.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "رزرو موجودی",
+                "verbose_name_plural": "رزروهای موجودی",
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_stockreservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="quantity",
+            field=models.PositiveIntegerField(default=1, verbose_name="تعداد"),
+        ),
+    ]
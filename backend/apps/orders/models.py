@@ -49,6 +49,7 @@ class OrderItem(models.Model):
     """
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', verbose_name="سفارش")
     product = models.ForeignKey(Product, on_delete=models.PROTECT, verbose_name="محصول")
+    quantity = models.PositiveIntegerField(default=1, verbose_name="تعداد")
     price_at_time_of_purchase = models.DecimalField(max_digits=10, decimal_places=0, verbose_name="قیمت هنگام خرید")
 
     def __str__(self):
@@ -58,3 +59,21 @@ class OrderItem(models.Model):
         verbose_name = "آیتم سفارش"
         verbose_name_plural = "آیتم‌های سفارش"
 
+# ========= Stock Reservation Model ========= #
+class StockReservation(models.Model):
+    """
+    موجودی کسر شده برای یک سفارش در انتظار.
+    با تایید سفارش رزرو نهایی (حذف) می‌شود و با لغو یا انقضا موجودی به انبار برمی‌گردد.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations', verbose_name="سفارش")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations', verbose_name="محصول")
+    quantity = models.PositiveIntegerField(verbose_name="تعداد")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="زمان انقضا")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for order {self.order_id}"
+
+    class Meta:
+        verbose_name = "رزرو موجودی"
+        verbose_name_plural = "رزروهای موجودی"
@@ -2,34 +2,37 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import Order, OrderStatus
 from apps.payments.models import Payment, PaymentStatus, PaymentType
+from .inventory import sync_reservations
+
+# وضعیت پرداخت متناظر با هر وضعیت سفارش (سایر وضعیت‌ها: تکمیل شده)
+PAYMENT_STATUS_FOR_ORDER = {
+    OrderStatus.CANCELLED: PaymentStatus.FAILED,
+    OrderStatus.PENDING: PaymentStatus.PENDING,
+    OrderStatus.PROCESSING: PaymentStatus.PENDING,
+    OrderStatus.SHIPPED: PaymentStatus.PENDING,
+    OrderStatus.CONFIRMED: PaymentStatus.PENDING,
+}
 
 # ========= Update Payment On Order Save Signal ========= #
 @receiver(post_save, sender=Order)
 def update_payment_on_order_save(sender, instance, created, **kwargs):
     """
     این سیگنال پس از ذخیره شدن یک سفارش اجرا می‌شود.
-    - اگر سفارش جدید باشد، یک رکورد پرداخت برای آن ایجاد می‌کند.
-    - وضعیت پرداخت را بر اساس وضعیت سفارش به‌روزرسانی می‌کند.
+    - اگر سفارش جدید باشد، یک رکورد پرداخت برای آن ایجاد می‌کند (یک INSERT).
+    - وضعیت پرداخت را بر اساس وضعیت سفارش به‌روزرسانی می‌کند (یک UPDATE).
+    - رزرو موجودی را با وضعیت سفارش هماهنگ می‌کند (لغو: برگشت به انبار، تایید: نهایی شدن).
     """
-    payment, created_payment = Payment.objects.get_or_create(
-        order=instance,
-        defaults={
-            'payment_type': instance.payment_type,
-            'amount': instance.total_amount
-        }
-    )
-    
-    if instance.status == OrderStatus.CANCELLED:
-        payment.status = PaymentStatus.FAILED
-    elif instance.status == OrderStatus.PENDING:
-        payment.status = PaymentStatus.PENDING
-    elif instance.status == OrderStatus.PROCESSING:
-        payment.status = PaymentStatus.PENDING
-    elif instance.status == OrderStatus.SHIPPED:
-        payment.status = PaymentStatus.PENDING
-    elif instance.status == OrderStatus.CONFIRMED:
-        payment.status = PaymentStatus.PENDING
-    else:
-        payment.status = PaymentStatus.COMPLETED
-        
-    payment.save()
+    payment_status = PAYMENT_STATUS_FOR_ORDER.get(instance.status, PaymentStatus.COMPLETED)
+
+    updated = 0 if created else Payment.objects.filter(order=instance).update(status=payment_status)
+    if not updated:
+        # پرداخت ساخته شده روی سفارش کش می‌شود تا order.payment کوئری دوباره نزند
+        instance.payment = Payment.objects.create(
+            order=instance,
+            payment_type=instance.payment_type,
+            amount=instance.total_amount,
+            status=payment_status,
+        )
+
+    if not created:
+        sync_reservations([instance.pk], instance.status)
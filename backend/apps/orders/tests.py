@@ -1,3 +1,286 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import Address
+from apps.api.v1.idempotency import _cache_key
+from apps.carts.models import Cart, CartItem
+from apps.payments.models import Payment, PaymentStatus
+from apps.shop.models import Category, Product
+from . import inventory
+from .inventory import release_expired_reservations
+from .models import Order, OrderStatus, StockReservation
+
+
+# ========= Checkout Tests ========= #
+class CheckoutTests(TestCase):
+    """ ثبت سفارش از سبد خرید: تعداد کوئری ثابت، محاسبه تعداد و رد سبد تغییر کرده """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        cls.address = Address.objects.create(
+            user=cls.user, province="تهران", city="تهران", street="آزادی",
+            postal_code="1234567890", detail="پلاک ۱",
+        )
+        category = Category.objects.create(name="موتور")
+        cls.products = [
+            Product.objects.create(
+                name=f"قطعه {i}", part_code=f"P-{i}", brand="برند",
+                country_of_origin="ایران", price=1000 + i, category=category,
+                stock_quantity=100 if i % 2 else None,
+            )
+            for i in range(20)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def checkout(self, size):
+        CartItem.objects.bulk_create([CartItem(cart=self.cart, product=product, quantity=2) for product in self.products[:size]])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/v1/orders/checkout/",
+                {"address_id": self.address.id, "payment_type": "cash"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response, len(queries)
+
+    def test_query_count_is_constant(self):
+        _, small = self.checkout(2)
+        response, large = self.checkout(20)
+
+        self.assertEqual(small, large)
+        order = Order.objects.get(pk=response.data["order"]["id"])
+        self.assertEqual(order.items.count(), 20)
+        self.assertEqual(len(response.data["order"]["items"]), 20)
+        self.assertEqual(order.total_amount, sum(product.price * 2 for product in self.products))
+        self.assertFalse(self.cart.items.exists())
+        self.assertEqual(Payment.objects.get(order=order).amount, order.total_amount)
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).stock_quantity, 96)
+
+    def test_stale_cart_version_is_rejected(self):
+        CartItem.objects.create(cart=self.cart, product=self.products[0])
+        self.cart.bump_version()
+
+        response = self.client.post(
+            "/api/v1/orders/checkout/",
+            {"address_id": self.address.id, "payment_type": "cash", "cart_version": 0},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["cart_version"], 1)
+        self.assertFalse(Order.objects.exists())
+        self.assertTrue(self.cart.items.exists())
+
+    def test_quantity_is_charged_and_recorded(self):
+        product = self.products[1]
+        CartItem.objects.create(cart=self.cart, product=product, quantity=5)
+
+        cart = self.client.get("/api/v1/carts/").data
+        self.assertEqual(cart["total_price"], product.price * 5)
+        self.assertEqual(cart["items"][0]["total_price"], product.price * 5)
+
+        response = self.client.post(
+            "/api/v1/orders/checkout/",
+            {"address_id": self.address.id, "payment_type": "cash"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.data)
+        order = Order.objects.get(pk=response.data["order"]["id"])
+        self.assertEqual(order.total_amount, product.price * 5)
+        self.assertEqual(list(order.items.values_list("product_id", "quantity")), [(product.pk, 5)])
+        self.assertEqual(response.data["order"]["items"][0]["quantity"], 5)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock_quantity, 95)
+
+
+# ========= Reservation Tests ========= #
+class ReservationTests(TestCase):
+    """ انقضای رزرو همزمان با تایید سفارش و رزرو موجودی در سفارش‌های ساخته شده توسط ادمین """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        cls.admin = get_user_model().objects.create_user(username="admin", password="pass", is_staff=True)
+        cls.address = Address.objects.create(
+            user=cls.user, province="تهران", city="تهران", street="آزادی",
+            postal_code="1234567890", detail="پلاک ۱",
+        )
+        cls.product = Product.objects.create(
+            name="فیلتر روغن", part_code="F-1", brand="برند", country_of_origin="ایران",
+            price=1000, category=Category.objects.create(name="فیلتر"), stock_quantity=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def checkout(self, quantity):
+        self.client.force_authenticate(self.user)
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=quantity)
+        response = self.client.post(
+            "/api/v1/orders/checkout/",
+            {"address_id": self.address.id, "payment_type": "cash"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Order.objects.get(pk=response.data["order"]["id"])
+
+    def stock(self):
+        return Product.objects.get(pk=self.product.pk).stock_quantity
+
+    def test_expired_pending_order_is_cancelled_and_released(self):
+        order = self.checkout(3)
+        self.assertEqual(self.stock(), 7)
+
+        cancelled = release_expired_reservations(timezone.now() + timedelta(days=2))
+
+        self.assertEqual(cancelled, 1)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.CANCELLED)
+        self.assertEqual(Payment.objects.get(order=order).status, PaymentStatus.FAILED)
+        self.assertEqual(self.stock(), 10)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_expiry_racing_with_confirmation_keeps_the_order(self):
+        order = self.checkout(3)
+        release = inventory.release_reservations
+
+        def confirm_then_release(order_ids):
+            # تایید سفارش درست بعد از خواندن سفارش‌های منقضی (رزروها با تایید حذف می‌شوند)
+            confirmed = Order.objects.get(pk=order.pk)
+            confirmed.status = OrderStatus.CONFIRMED
+            confirmed.save()
+            return release(order_ids)
+
+        with mock.patch.object(inventory, "release_reservations", confirm_then_release):
+            cancelled = release_expired_reservations(timezone.now() + timedelta(days=2))
+
+        self.assertEqual(cancelled, 0)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.CONFIRMED)
+        self.assertNotEqual(Payment.objects.get(order=order).status, PaymentStatus.FAILED)
+        self.assertEqual(self.stock(), 7)
+
+    def test_expiry_after_confirmation_keeps_the_order(self):
+        order = self.checkout(3)
+        order.status = OrderStatus.CONFIRMED
+        order.save()
+
+        self.assertEqual(release_expired_reservations(timezone.now() + timedelta(days=2)), 0)
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.CONFIRMED)
+        self.assertEqual(self.stock(), 7)
+
+    def test_admin_created_order_reserves_stock(self):
+        self.client.force_authenticate(self.admin)
+
+        def create(quantity):
+            return self.client.post(
+                "/api/v1/dashboard/admin/orders/",
+                {
+                    "user": self.user.id, "status": "pending", "shipping_address": "تهران",
+                    "items_data": [{"product_id": self.product.id, "quantity": quantity}],
+                },
+                format="json",
+            )
+
+        response = create(4)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.stock(), 6)
+        self.assertTrue(StockReservation.objects.filter(order_id=response.data["id"], quantity=4).exists())
+
+        response = create(7)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(), 6)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+# ========= Idempotency Tests ========= #
+class IdempotencyTests(TestCase):
+    """ هدر Idempotency-Key در ثبت سفارش: تکرار پاسخ، کلید تکراری با بدنه دیگر و درخواست همزمان """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        cls.address = Address.objects.create(
+            user=cls.user, province="تهران", city="تهران", street="آزادی",
+            postal_code="1234567890", detail="پلاک ۱",
+        )
+        cls.product = Product.objects.create(
+            name="فیلتر روغن", part_code="F-1", brand="برند", country_of_origin="ایران",
+            price=1000, category=Category.objects.create(name="فیلتر"), stock_quantity=10,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+    def checkout(self, key, payment_type="cash"):
+        return self.client.post(
+            "/api/v1/orders/checkout/",
+            {"address_id": self.address.id, "payment_type": payment_type},
+            format="json",
+            headers={"Idempotency-Key": key},
+        )
+
+    def test_replay_returns_the_first_response(self):
+        first = self.checkout("order-1")
+        replay = self.checkout("order-1")
+
+        self.assertEqual(first.status_code, 201, first.data)
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock_quantity, 8)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.assertEqual(self.checkout("order-1").status_code, 201)
+        CartItem.objects.create(cart=Cart.objects.get(user=self.user), product=self.product)
+
+        response = self.checkout("order-1", payment_type="check")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_concurrent_duplicate_is_rejected(self):
+        lock_key = f"{_cache_key('checkout', SimpleNamespace(user=self.user), 'order-1')}:lock"
+        cache.add(lock_key, 1)
+
+        response = self.checkout("order-1")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+        # قفل متعلق به درخواست در حال اجراست و توسط درخواست رد شده آزاد نمی‌شود
+        self.assertIsNotNone(cache.get(lock_key))
+
+        cache.delete(lock_key)
+        self.assertEqual(self.checkout("order-1").status_code, 201)
+
+    def test_error_responses_are_not_stored(self):
+        self.cart.items.all().delete()
+        self.assertEqual(self.checkout("order-1").status_code, 400)
+
+        CartItem.objects.create(cart=self.cart, product=self.product)
+        response = self.checkout("order-1")
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
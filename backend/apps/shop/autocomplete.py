@@ -0,0 +1,296 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.apps import apps
+from django.db.models import Count
+
+from apps.shop.models import Product, Car, Category
+from apps.shop.normalization import normalize_text, normalize_part_code
+
+# حداقل طول عبارت و حداکثر تعداد کاندیدهایی که برای رتبه‌بندی بررسی می‌شوند
+MIN_PREFIX_LENGTH = 2
+MAX_CANDIDATES = 500
+# بازسازی کامل دوره‌ای برای دریافت تغییرات ورکرهای دیگر و محبوبیت جدید
+REFRESH_INTERVAL = 60 * 15
+
+
+def _word_suffixes(text):
+    """ «فیلتر روغن پژو» ← [«فیلتر روغن پژو»، «روغن پژو»، «پژو»] """
+    words = text.split()
+    return [" ".join(words[index:]) for index in range(len(words))]
+
+
+# ========= Prefix Index ========= #
+class PrefixIndex:
+    """
+    ایندکس پیشوندی درون حافظه با آرایه مرتب (term, key) و جستجوی دودویی.
+    هر ورودی چند term دارد (مثلاً هر کلمه از نام) تا با شروع هر کلمه پیدا شود.
+    """
+
+    def __init__(self):
+        self._terms = []
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, entry, terms):
+        self.remove(key)
+        terms = sorted({term for term in terms if term})
+        self._entries[key] = (entry, terms)
+        for term in terms:
+            insort(self._terms, (term, key))
+
+    def remove(self, key):
+        existing = self._entries.pop(key, None)
+        if existing is None:
+            return
+        for term in existing[1]:
+            index = bisect_left(self._terms, (term, key))
+            if index < len(self._terms) and self._terms[index] == (term, key):
+                del self._terms[index]
+
+    def bulk_load(self, items):
+        """ بارگذاری یکجا (سریع‌تر از add تکی چون فقط یک بار مرتب می‌شود) """
+        self._entries = {}
+        terms = []
+        for key, entry, entry_terms in items:
+            entry_terms = sorted({term for term in entry_terms if term})
+            self._entries[key] = (entry, entry_terms)
+            terms.extend((term, key) for term in entry_terms)
+        terms.sort()
+        self._terms = terms
+
+    def search(self, prefix, limit):
+        """ ورودی‌هایی که یکی از termهایشان با prefix شروع می‌شود، به ترتیب وزن """
+        index = bisect_left(self._terms, (prefix,))
+        seen = {}
+        while index < len(self._terms) and len(seen) < MAX_CANDIDATES:
+            term, key = self._terms[index]
+            if not term.startswith(prefix):
+                break
+            if key not in seen:
+                # تطابق از ابتدای عنوان بر تطابق از وسط آن مقدم است
+                entry = self._entries[key][0]
+                seen[key] = (entry["_label"].startswith(prefix), entry["_weight"])
+            index += 1
+
+        keys = sorted(seen, key=lambda key: (not seen[key][0], -seen[key][1], len(self._entries[key][0]["label"])))
+        return [self._public(self._entries[key][0]) for key in keys[:limit]]
+
+    @staticmethod
+    def _public(entry):
+        return {name: value for name, value in entry.items() if not name.startswith("_")}
+
+
+# ========= Autocomplete Index ========= #
+class AutocompleteIndex:
+    """
+    ایندکس تکمیل خودکار هر ورکر برای نام و کد محصولات، برندها، خودروها و دسته‌بندی‌ها.
+    در اولین استفاده به صورت تنبل ساخته می‌شود، با سیگنال‌های ذخیره/حذف مدل‌ها به صورت
+    افزایشی به‌روز می‌شود و هر REFRESH_INTERVAL ثانیه یک بار کامل بازسازی می‌شود.
+    وزن محصولات از تعداد دفعات سفارش (OrderItem) می‌آید.
+    """
+
+    def __init__(self):
+        self._index = PrefixIndex()
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._popularity = {}
+
+    @property
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def ensure_loaded(self):
+        if self.is_loaded and time.monotonic() - self._loaded_at < REFRESH_INTERVAL:
+            return
+        with self._lock:
+            if self.is_loaded and time.monotonic() - self._loaded_at < REFRESH_INTERVAL:
+                return
+            self.rebuild()
+
+    def invalidate(self):
+        """ ایندکس در اولین جستجوی بعدی کامل بازسازی می‌شود (مثلا پس از ورود گروهی محصولات) """
+        with self._lock:
+            self._loaded_at = None
+
+    def rebuild(self):
+        popularity = self._load_popularity()
+        items = []
+
+        products = Product.objects.filter(is_active=True).values(
+            "id", "name", "name_normalized", "brand", "brand_normalized",
+            "part_code", "part_code_normalized", "part_code_key",
+        )
+        brands = {}
+        for product in products.iterator(chunk_size=2000):
+            items.append(self._product_item(product, popularity.get(product["id"], 0)))
+            brand = brands.setdefault(product["brand_normalized"], {"label": product["brand"], "weight": 0})
+            brand["weight"] += popularity.get(product["id"], 0) + 1
+
+        for normalized, brand in brands.items():
+            items.append(self._brand_item(normalized, brand["label"], brand["weight"]))
+
+        cars = (
+            Car.objects.values("make", "model", "make_normalized", "model_normalized")
+            .annotate(weight=Count("parts"))
+            .order_by()
+        )
+        for car in cars:
+            items.append(self._car_item(car, car["weight"]))
+
+        for category in Category.objects.values("id", "name", "name_normalized", "slug"):
+            items.append(self._category_item(category))
+
+        with self._lock:
+            self._popularity = popularity
+            self._index.bulk_load(items)
+            self._loaded_at = time.monotonic()
+
+    def search(self, term, limit=10):
+        prefix = normalize_text(term)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+        self.ensure_loaded()
+        with self._lock:
+            results = self._index.search(prefix, limit)
+            # کدهای قطعه بدون جداکننده هم جستجو می‌شوند (مثلاً «12-34» و «1234»)
+            key = normalize_part_code(term)
+            if len(results) < limit and key and key != prefix:
+                seen = {(item["type"], item.get("id")) for item in results}
+                for item in self._index.search(key, limit):
+                    if (item["type"], item.get("id")) not in seen and len(results) < limit:
+                        results.append(item)
+        return results
+
+    # ======== Incremental updates ========
+    def update_product(self, product):
+        if not self.is_loaded:
+            return
+        with self._lock:
+            if not product.is_active:
+                self._index.remove(("product", product.pk))
+                return
+            values = {
+                "id": product.pk,
+                "name": product.name,
+                "name_normalized": product.name_normalized,
+                "brand": product.brand,
+                "part_code": product.part_code,
+                "part_code_normalized": product.part_code_normalized,
+                "part_code_key": product.part_code_key,
+            }
+            self._index.add(*self._product_item(values, self._popularity.get(product.pk, 0)))
+            if ("brand", product.brand_normalized) not in self._index:
+                self._index.add(*self._brand_item(product.brand_normalized, product.brand, 1))
+
+    def remove_product(self, product_id):
+        if not self.is_loaded:
+            return
+        with self._lock:
+            self._index.remove(("product", product_id))
+
+    def update_car(self, car):
+        if not self.is_loaded:
+            return
+        weight = Product.compatible_cars.through.objects.filter(
+            car__make_normalized=car.make_normalized, car__model_normalized=car.model_normalized
+        ).count()
+        values = {
+            "make": car.make,
+            "model": car.model,
+            "make_normalized": car.make_normalized,
+            "model_normalized": car.model_normalized,
+        }
+        with self._lock:
+            self._index.add(*self._car_item(values, weight))
+
+    def remove_car(self, car):
+        """ ورودی خودرو بر اساس برند/مدل است؛ فقط اگر سال دیگری از آن نمانده باشد حذف می‌شود """
+        if not self.is_loaded:
+            return
+        exists = Car.objects.filter(
+            make_normalized=car.make_normalized, model_normalized=car.model_normalized
+        ).exists()
+        if exists:
+            return
+        with self._lock:
+            self._index.remove(("car", f"{car.make_normalized} {car.model_normalized}"))
+
+    def update_category(self, category):
+        if not self.is_loaded:
+            return
+        values = {"id": category.pk, "name": category.name, "name_normalized": category.name_normalized, "slug": category.slug}
+        with self._lock:
+            self._index.add(*self._category_item(values))
+
+    def remove_category(self, category_id):
+        if not self.is_loaded:
+            return
+        with self._lock:
+            self._index.remove(("category", category_id))
+
+    # ======== Entries ========
+    @staticmethod
+    def _load_popularity():
+        OrderItem = apps.get_model("orders", "OrderItem")
+        return dict(
+            OrderItem.objects.order_by()
+            .values("product_id")
+            .annotate(count=Count("id"))
+            .values_list("product_id", "count")
+        )
+
+    @staticmethod
+    def _product_item(product, popularity):
+        entry = {
+            "type": "product",
+            "id": product["id"],
+            "label": product["name"],
+            "brand": product["brand"],
+            "part_code": product["part_code"],
+            "_label": product["name_normalized"],
+            # محصولات پرفروش بالاتر و کمی بالاتر از سایر انواع نمایش داده می‌شوند
+            "_weight": popularity * 10 + 1,
+        }
+        terms = _word_suffixes(product["name_normalized"]) + [product["part_code_normalized"], product["part_code_key"]]
+        return ("product", product["id"]), entry, terms
+
+    @staticmethod
+    def _brand_item(normalized, label, weight):
+        entry = {"type": "brand", "label": label, "_label": normalized, "_weight": weight}
+        return ("brand", normalized), entry, _word_suffixes(normalized)
+
+    @staticmethod
+    def _car_item(car, weight):
+        label = f"{car['make']} {car['model']}"
+        normalized = f"{car['make_normalized']} {car['model_normalized']}"
+        entry = {
+            "type": "car",
+            "label": label,
+            "make": car["make"],
+            "model": car["model"],
+            "_label": normalized,
+            "_weight": weight,
+        }
+        return ("car", normalized), entry, _word_suffixes(normalized)
+
+    @staticmethod
+    def _category_item(category):
+        entry = {
+            "type": "category",
+            "id": category["id"],
+            "label": category["name"],
+            "slug": category["slug"],
+            "_label": category["name_normalized"],
+            "_weight": 1,
+        }
+        return ("category", category["id"]), entry, _word_suffixes(category["name_normalized"])
+
+
+autocomplete_index = AutocompleteIndex()
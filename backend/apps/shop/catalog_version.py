@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import CatalogVersion
+
+CATALOG_VERSION_CACHE_KEY = "shop:catalog-version"
+# هر ورکر نسخه را حداکثر این مدت (ثانیه) از کش می‌خواند؛ تغییر در ورکرهای دیگر با همین تاخیر دیده می‌شود
+CATALOG_VERSION_CACHE_TIMEOUT = 5
+CATALOG_VERSION_ID = 1
+
+# پس از هر افزایش نسخه (بعد از commit) ارسال می‌شود
+catalog_changed = Signal()
+
+
+def get_catalog_version():
+    """
+    (نسخه، زمان آخرین تغییر) کاتالوگ.
+    مقدار کوتاه‌مدت کش می‌شود تا پاسخ 304 بدون هیچ کوئری دیتابیس داده شود.
+    """
+    current = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if current is None:
+        row = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).values_list("version", "updated_at").first()
+        current = row or (0, None)
+        cache.set(CATALOG_VERSION_CACHE_KEY, current, CATALOG_VERSION_CACHE_TIMEOUT)
+    return current
+
+
+def bump_catalog_version():
+    """ افزایش نسخه پس از commit تراکنش جاری (در صورت rollback نسخه تغییر نمی‌کند) """
+    transaction.on_commit(_increment_catalog_version)
+
+
+def _increment_catalog_version():
+    now = timezone.now()
+    updated = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).update(version=F("version") + 1, updated_at=now)
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=CATALOG_VERSION_ID, defaults={"version": 1, "updated_at": now})
+    cache.delete(CATALOG_VERSION_CACHE_KEY)
+    catalog_changed.send(sender=CatalogVersion)
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'W/"catalog-{get_catalog_version()[0]}"'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return get_catalog_version()[1]
+
+
+# دکوریتور شرطی: در صورت تطابق If-None-Match / If-Modified-Since پیش از اجرای ویو 304 برمی‌گرداند
+catalog_conditional = condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.shop.models import Category, Product
+
+CATEGORY_TREE_CACHE_KEY = "shop:category-tree"
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 10
+
+
+# ========= Category Tree ========= #
+def build_category_tree():
+    """
+    ساخت کل درخت دسته‌بندی‌ها با دو کوئری (دسته‌بندی‌ها و شمارش محصولات).
+    برای هر گره تعداد محصولات خودش و تعداد کل محصولات زیرشاخه‌اش برگردانده می‌شود.
+    """
+    categories = list(Category.objects.order_by("depth", "name").values("id", "name", "slug", "parent_id", "depth"))
+    counts = dict(
+        Product.objects.filter(is_active=True)
+        .order_by()
+        .values("category_id")
+        .annotate(count=Count("id"))
+        .values_list("category_id", "count")
+    )
+
+    nodes = {}
+    roots = []
+    for category in categories:
+        node = {
+            "id": category["id"],
+            "name": category["name"],
+            "slug": category["slug"],
+            "depth": category["depth"],
+            "product_count": counts.get(category["id"], 0),
+            "subtree_product_count": counts.get(category["id"], 0),
+            "children": [],
+        }
+        nodes[category["id"]] = node
+        parent = nodes.get(category["parent_id"])
+        (parent["children"] if parent else roots).append(node)
+
+    # جمع زدن تعداد محصولات از عمیق‌ترین سطح به سمت ریشه
+    for category in sorted(categories, key=lambda item: -item["depth"]):
+        parent = nodes.get(category["parent_id"])
+        if parent:
+            parent["subtree_product_count"] += nodes[category["id"]]["subtree_product_count"]
+    return roots
+
+
+def get_category_tree():
+    """ درخت کش شده؛ با تغییر دسته‌بندی یا محصول از کش حذف می‌شود """
+    tree = cache.get(CATEGORY_TREE_CACHE_KEY)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(CATEGORY_TREE_CACHE_KEY, tree, CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_category_tree():
+    """ حذف درخت کش شده پس از commit؛ در غیر این صورت درخواست همزمان درخت قبلی را دوباره کش می‌کند """
+    transaction.on_commit(lambda: cache.delete(CATEGORY_TREE_CACHE_KEY))
@@ -0,0 +1,109 @@
+from django.db.models import Count, Q
+
+# ========= Price Buckets ========= #
+# بازه‌های قیمت (تومان) برای فیلتر کناری؛ None یعنی بدون سقف
+PRICE_BUCKETS = [
+    (0, 500_000),
+    (500_000, 1_000_000),
+    (1_000_000, 2_000_000),
+    (2_000_000, 5_000_000),
+    (5_000_000, None),
+]
+
+# پارامترهای فیلتر لیست محصولات که هر فیلتر کناری را محدود می‌کنند؛ شمارش هر فیلتر بدون
+# پارامترهای خودش گرفته می‌شود تا با انتخاب یک برند، برندهای دیگر از لیست حذف نشوند
+FACET_PARAMS = {
+    "brand": ("brand",),
+    "category": ("category",),
+    "country_of_origin": (),
+    "in_stock": ("in_stock",),
+    "price": ("min_price", "max_price"),
+}
+
+
+def price_bucket_condition(low, high):
+    """ شرط قرار گرفتن قیمت در یک بازه """
+    condition = Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def _sorted_counts(counter):
+    return sorted(counter.values(), key=lambda item: (-item["count"], str(item["value"])))
+
+
+# ========= Facet Counts ========= #
+def brand_facet(queryset):
+    """
+    برندها مثل فیلتر برند بر اساس brand_normalized گروه‌بندی می‌شوند و پرتکرارترین
+    نگارش خام هر گروه به عنوان نام نمایشی برگردانده می‌شود.
+    """
+    rows = queryset.order_by().values("brand_normalized", "brand").annotate(count=Count("id"))
+    brands, variants = {}, {}
+    for row in rows:
+        brand = brands.setdefault(row["brand_normalized"], {"value": row["brand"], "count": 0})
+        brand["count"] += row["count"]
+        variants.setdefault(row["brand_normalized"], {})[row["brand"]] = row["count"]
+    for normalized, counts in variants.items():
+        brands[normalized]["value"] = min(counts, key=lambda value: (-counts[value], value != value.strip(), value))
+    return _sorted_counts(brands)
+
+
+def category_facet(queryset):
+    rows = queryset.order_by().values("category_id", "category__name").annotate(count=Count("id"))
+    return _sorted_counts({
+        row["category_id"]: {"value": row["category_id"], "name": row["category__name"], "count": row["count"]}
+        for row in rows
+    })
+
+
+def country_facet(queryset):
+    rows = queryset.order_by().values("country_of_origin").annotate(count=Count("id"))
+    return _sorted_counts({
+        row["country_of_origin"]: {"value": row["country_of_origin"], "count": row["count"]}
+        for row in rows
+    })
+
+
+def stock_facet(queryset):
+    counts = queryset.order_by().aggregate(
+        in_stock=Count("id", filter=Q(is_stock=True)),
+        out_of_stock=Count("id", filter=Q(is_stock=False)),
+    )
+    return [
+        {"value": True, "count": counts["in_stock"]},
+        {"value": False, "count": counts["out_of_stock"]},
+    ]
+
+
+def price_facet(queryset):
+    counts = queryset.order_by().aggregate(**{
+        f"bucket_{index}": Count("id", filter=price_bucket_condition(low, high))
+        for index, (low, high) in enumerate(PRICE_BUCKETS)
+    })
+    return [
+        {"min": low, "max": high, "count": counts[f"bucket_{index}"]}
+        for index, (low, high) in enumerate(PRICE_BUCKETS)
+    ]
+
+
+FACETS = {
+    "brand": brand_facet,
+    "category": category_facet,
+    "country_of_origin": country_facet,
+    "in_stock": stock_facet,
+    "price": price_facet,
+}
+
+
+def compute_facets(filtered_queryset):
+    """
+    محاسبه تعداد محصولات به تفکیک برند، دسته‌بندی، کشور سازنده، موجودی و بازه قیمت.
+    filtered_queryset(excluded_params) کوئری محصولات با همه فیلترهای درخواست به جز
+    پارامترهای داده شده را برمی‌گرداند. هر فیلتر کناری یک کوئری تجمیعی کوچک جدا دارد
+    که اندازه نتیجه‌اش فقط به تعداد مقادیر متمایز همان فیلتر بستگی دارد.
+    """
+    data = {name: facet(filtered_queryset(FACET_PARAMS[name])) for name, facet in FACETS.items()}
+    # کشور سازنده فیلتری در لیست ندارد، پس مجموع آن همان تعداد کل با همه فیلترهاست
+    return {"total": sum(item["count"] for item in data["country_of_origin"]), **data}
@@ -0,0 +1,78 @@
+from django.db import transaction
+
+from apps.shop.models import Car, Product, ProductFitment
+
+
+# ========= Fitment Index Maintenance ========= #
+def add_fitments(product_ids, car_ids):
+    """ ساخت ردیف‌های ایندکس برای همه جفت‌های محصول/خودروی داده شده """
+    product_ids = list(product_ids)
+    cars = Car.objects.filter(pk__in=car_ids).values_list("pk", "make_normalized", "model_normalized", "year")
+    rows = [
+        ProductFitment(product_id=product_id, car_id=car_id, make=make, model=model, year=year)
+        for car_id, make, model, year in cars
+        for product_id in product_ids
+    ]
+    ProductFitment.objects.bulk_create(rows, ignore_conflicts=True, batch_size=1000)
+
+
+def remove_fitments(product_ids=None, car_ids=None):
+    """ حذف ردیف‌های ایندکس بر اساس محصول، خودرو یا هر دو """
+    queryset = ProductFitment.objects.all()
+    if product_ids is not None:
+        queryset = queryset.filter(product_id__in=product_ids)
+    if car_ids is not None:
+        queryset = queryset.filter(car_id__in=car_ids)
+    queryset.delete()
+
+
+def sync_car_fitments(car):
+    """ به‌روزرسانی برند/مدل/سال در همه ردیف‌های یک خودرو با یک UPDATE """
+    ProductFitment.objects.filter(car=car).update(
+        make=car.make_normalized,
+        model=car.model_normalized,
+        year=car.year,
+    )
+
+
+@transaction.atomic
+def rebuild_fitment_index(batch_size=5000):
+    """
+    بازسازی کامل ایندکس از روی جدول واسط compatible_cars.
+    حذف و درج دوباره در یک تراکنش انجام می‌شود؛ تا پایان کار خواننده‌ها ایندکس قبلی را می‌بینند
+    و خطا در میانه کار ایندکس را نیمه‌کاره باقی نمی‌گذارد.
+    """
+    ProductFitment.objects.all().delete()
+    through = Product.compatible_cars.through
+    rows = (
+        through.objects.order_by("pk")
+        .values_list("product_id", "car_id", "car__make_normalized", "car__model_normalized", "car__year")
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    count = 0
+    for product_id, car_id, make, model, year in rows:
+        batch.append(ProductFitment(product_id=product_id, car_id=car_id, make=make, model=model, year=year))
+        if len(batch) >= batch_size:
+            ProductFitment.objects.bulk_create(batch, ignore_conflicts=True)
+            count += len(batch)
+            batch = []
+    if batch:
+        ProductFitment.objects.bulk_create(batch, ignore_conflicts=True)
+        count += len(batch)
+    return count
+
+
+def fitment_product_ids(make=None, model=None, year=None):
+    """
+    زیرکوئری شناسه محصولات سازگار با (برند، مدل، سال).
+    مقادیر برند و مدل باید نرمال شده باشند.
+    """
+    conditions = {}
+    if make:
+        conditions["make"] = make
+    if model:
+        conditions["model"] = model
+    if year:
+        conditions["year"] = year
+    return ProductFitment.objects.filter(**conditions).values("product_id")
@@ -0,0 +1,203 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps, features
+
+from .storage import is_content_addressed
+
+# عرض حداکثر هر نسخه؛ تصاویر کوچک‌تر بزرگ‌نمایی نمی‌شوند
+VARIANT_SIZES = {"thumb": 160, "card": 480, "zoom": 1600}
+VARIANT_DIR = "variants"
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg", "avif": "avif"}
+_SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 6},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "avif": {"quality": 60},
+}
+
+logger = logging.getLogger(__name__)
+
+# پس از ذخیره نسخه‌های یک تصویر ارسال می‌شود (برای باطل کردن کش‌ها)
+variants_generated = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_formats():
+    """ فرمت‌های فعال از تنظیمات؛ avif فقط اگر Pillow از آن پشتیبانی کند """
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt in _EXTENSIONS and (fmt != "avif" or features.check("avif"))]
+
+
+def variant_path(name, variant, fmt):
+    directory, filename = os.path.split(name)
+    if is_content_addressed(name):
+        # نسخه‌ها کنار پوشه اصلی آپلود قرار می‌گیرند، نه داخل پوشه دو حرفی هش
+        directory = os.path.dirname(directory)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, VARIANT_DIR, f"{stem}-{variant}.{_EXTENSIONS[fmt]}")
+
+
+# ===== Rendering ===== #
+def _prepare(image, fmt):
+    if fmt == "jpeg":
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+    return image
+
+
+def render_variants(name, storage=None):
+    """
+    ساخت نسخه‌های thumb/card/zoom تصویر در فرمت‌های فعال و ذخیره کنار فایل اصلی.
+    خروجی به شکل ذخیره شده در فیلد variants:
+    {"source": name, "width": .., "height": .., "files": {variant: {"width", "height", fmt: path}}}
+    این تابع به دیتابیس دسترسی ندارد تا در process pool هم قابل اجرا باشد.
+    """
+    storage = storage or default_storage
+    with storage.open(name, "rb") as fh:
+        image = Image.open(fh)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    formats = variant_formats()
+    files = {}
+    rendered = {}
+    for variant, max_width in VARIANT_SIZES.items():
+        width = min(max_width, image.width)
+        if width in rendered:
+            # تصویر کوچک‌تر از چند اندازه است؛ فایل‌های همان اندازه دوباره ساخته نمی‌شوند
+            files[variant] = rendered[width]
+            continue
+        if image.width > width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        else:
+            resized = image
+        entry = {"width": resized.width, "height": resized.height}
+        for fmt in formats:
+            buffer = io.BytesIO()
+            _prepare(resized, fmt).save(buffer, format=fmt.upper(), **_SAVE_OPTIONS[fmt])
+            path = variant_path(name, variant, fmt)
+            if storage.exists(path):
+                storage.delete(path)
+            entry[fmt] = storage.save(path, ContentFile(buffer.getvalue()))
+        files[variant] = rendered[width] = entry
+
+    return {"source": name, "width": image.width, "height": image.height, "files": files}
+
+
+def variant_files(variants):
+    return [
+        path
+        for entry in (variants or {}).get("files", {}).values()
+        for fmt, path in entry.items()
+        if fmt in _EXTENSIONS
+    ]
+
+
+def delete_variants(variants, storage=None, keep=()):
+    storage = storage or default_storage
+    if getattr(storage, "content_addressed", False):
+        # فایل‌های آدرس‌دهی شده با محتوا ممکن است بین چند تصویر مشترک باشند
+        return
+    for path in variant_files(variants):
+        if path not in keep:
+            storage.delete(path)
+
+
+def build_srcset(variants, url, source):
+    """
+    srcset هر فرمت از روی variants: {"webp": "url 160w, url 480w, ...", "jpeg": ...}
+    url تابعی است که مسیر فایل را به آدرس تبدیل می‌کند و source مسیر فعلی تصویر اصلی.
+    بدون نسخه‌ها، یا وقتی نسخه‌ها هنوز مربوط به تصویر قبلی هستند (ساخت در پس‌زمینه تمام نشده)، None برمی‌گرداند.
+    """
+    variants = variants or {}
+    files = variants.get("files")
+    if not files or variants.get("source") != source:
+        return None
+    srcset = {}
+    for fmt in _EXTENSIONS:
+        seen, parts = set(), []
+        for entry in sorted(files.values(), key=lambda item: item["width"]):
+            if fmt in entry and entry["width"] not in seen:
+                seen.add(entry["width"])
+                parts.append(f"{url(entry[fmt])} {entry['width']}w")
+        if parts:
+            srcset[fmt] = ", ".join(parts)
+    return srcset
+
+
+# ===== Model Instances ===== #
+def needs_variants(instance):
+    return bool(instance.image) and (instance.variants or {}).get("source") != instance.image.name
+
+
+def generate_variants_for(model_label, pk):
+    """ ساخت نسخه‌های تصویر یک رکورد (ProductImage یا Banner) و ذخیره در فیلد variants """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not instance.image:
+        return None
+
+    storage = instance.image.storage
+    variants = render_variants(instance.image.name, storage=storage)
+    # update بدون سیگنال post_save؛ اگر تصویر در این فاصله عوض شده باشد چیزی نوشته نمی‌شود
+    updated = model.objects.filter(pk=pk, image=instance.image.name).update(variants=variants)
+    if not updated:
+        delete_variants(variants, storage=storage)
+        return None
+    delete_variants(instance.variants, storage=storage, keep=set(variant_files(variants)))
+    instance.variants = variants
+    variants_generated.send(sender=model, instance=instance, variants=variants)
+    return variants
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants")
+        return _executor
+
+
+def _generate_logged(model_label, pk):
+    """
+    خطای ساخت نسخه‌ها فقط ثبت می‌شود؛ تصویر اصلی قبلا commit شده و نسخه‌ها بعدا با
+    generate_image_variants دوباره ساخته می‌شوند. در حالت همزمان هم خطا از on_commit
+    بالا نمی‌رود تا آپلود موفق به خطای 500 تبدیل نشود.
+    """
+    try:
+        generate_variants_for(model_label, pk)
+    except Exception:
+        logger.exception("Failed to generate image variants for %s pk=%s", model_label, pk)
+
+
+def _generate_in_background(model_label, pk):
+    try:
+        _generate_logged(model_label, pk)
+    finally:
+        # اتصال‌های دیتابیس این ترد باید صریحا بسته شوند
+        connections.close_all()
+
+
+def schedule_variants(instance):
+    """ ساخت نسخه‌ها پس از commit تراکنش، در ترد پس‌زمینه (یا همزمان اگر IMAGE_VARIANTS_ASYNC خاموش باشد) """
+    model_label, pk = instance._meta.label, instance.pk
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _get_executor().submit(_generate_in_background, model_label, pk))
+    else:
+        transaction.on_commit(lambda: _generate_logged(model_label, pk))
@@ -0,0 +1,317 @@
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from slugify import slugify
+
+from .models import Product, Category, Car, ProductFitment
+from .models.product_model import unique_slug
+from .normalization import normalize_text
+from .fitment import remove_fitments
+from .search import refresh_search_index
+from .category_tree import invalidate_category_tree
+from .autocomplete import autocomplete_index
+from .catalog_version import bump_catalog_version
+from .product_cache import invalidate_product_detail
+
+IMPORT_FORMATS = ("csv", "xlsx")
+REQUIRED_COLUMNS = ("part_code", "name", "brand", "country_of_origin", "price", "category")
+# ستون‌هایی که در صورت وجود ردیف تکراری (part_code یکسان) بازنویسی می‌شوند
+UPDATE_FIELDS = [
+    "name", "description", "brand", "country_of_origin", "warranty", "price",
+    "is_stock", "allow_individual_sale", "category", "is_active",
+    "name_normalized", "brand_normalized", "part_code_normalized", "part_code_key", "updated_at",
+]
+TRUE_VALUES = {"1", "true", "yes", "y", "بله", "دارد"}
+FALSE_VALUES = {"0", "false", "no", "n", "خیر", "ندارد"}
+_CAR_SEPARATORS = re.compile(r"[|;,\s]+")
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+    def as_dict(self, max_errors=None):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors[:max_errors] if max_errors is not None else self.errors,
+        }
+
+
+class ImportFileError(ValueError):
+    """ خطای کل فایل (فرمت یا ستون‌های ناقص) """
+
+
+# ===== Row Readers ===== #
+def read_csv_rows(stream):
+    """ ردیف‌های CSV را به صورت جریانی (خط به خط) برمی‌گرداند """
+    if isinstance(stream, (io.TextIOBase, io.StringIO)):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield [column.strip() for column in header]
+    yield from reader
+
+
+def read_xlsx_rows(stream):
+    """ ردیف‌های اولین شیت XLSX در حالت read_only (بدون بارگذاری کل فایل در حافظه) """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("برای ورود فایل XLSX کتابخانه openpyxl باید نصب باشد.")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else str(value).strip() for value in row]
+    finally:
+        workbook.close()
+
+
+def iter_records(stream, file_format):
+    """ (شماره ردیف، دیکشنری ستون‌ها) برای هر ردیف داده فایل """
+    if file_format not in IMPORT_FORMATS:
+        raise ImportFileError(f"فرمت فایل باید یکی از {IMPORT_FORMATS} باشد.")
+    rows = read_csv_rows(stream) if file_format == "csv" else read_xlsx_rows(stream)
+
+    header = next(rows, None)
+    if not header:
+        raise ImportFileError("فایل خالی است.")
+    header = [column.strip().lower() for column in header]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ImportFileError(f"ستون‌های الزامی وجود ندارند: {', '.join(missing)}")
+
+    for line, values in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in values):
+            continue
+        yield line, dict(zip(header, (str(value).strip() for value in values)))
+
+
+# ===== Validation ===== #
+class RowValidator:
+    """
+    اعتبارسنجی سبک ردیف‌ها بدون کوئری برای هر ردیف؛
+    دسته‌بندی‌ها و خودروها یک بار در ابتدای کار بارگذاری می‌شوند.
+    """
+
+    def __init__(self):
+        self.categories = {}
+        for pk, name_normalized, slug in Category.objects.values_list("pk", "name_normalized", "slug"):
+            self.categories[str(pk)] = pk
+            self.categories[name_normalized] = pk
+            if slug:
+                self.categories[slug] = pk
+        self.cars = {
+            pk: (make, model, year)
+            for pk, make, model, year in Car.objects.values_list("pk", "make_normalized", "model_normalized", "year")
+        }
+        self.seen_part_codes = set()
+
+    def validate(self, record):
+        """ (داده تمیز شده، خطاها) """
+        errors = {}
+        data = {}
+
+        for column in REQUIRED_COLUMNS:
+            if not record.get(column):
+                errors[column] = "این ستون الزامی است."
+
+        part_code = record.get("part_code", "")
+        if part_code:
+            if part_code in self.seen_part_codes:
+                errors["part_code"] = "کد قطعه در فایل تکراری است."
+            self.seen_part_codes.add(part_code)
+            data["part_code"] = part_code
+
+        for column, max_length in (("name", 200), ("brand", 100), ("country_of_origin", 100), ("warranty", 100)):
+            value = record.get(column, "")
+            if len(value) > max_length:
+                errors[column] = f"حداکثر {max_length} کاراکتر مجاز است."
+            data[column] = value
+        data["warranty"] = data["warranty"] or None
+        data["description"] = record.get("description") or None
+
+        if record.get("price"):
+            try:
+                price = Decimal(record["price"].replace(",", ""))
+                if price < 0 or price != price.to_integral_value() or len(str(int(price))) > 10:
+                    raise InvalidOperation
+                data["price"] = price
+            except InvalidOperation:
+                errors["price"] = "قیمت نامعتبر است."
+
+        if record.get("category"):
+            category_id = self.categories.get(record["category"]) or self.categories.get(normalize_text(record["category"]))
+            if category_id is None:
+                errors["category"] = "دسته‌بندی یافت نشد."
+            data["category_id"] = category_id
+
+        # ستون stock_quantity در صورت وجود: عدد یعنی موجودی شمارش می‌شود، خالی یعنی شمارش نمی‌شود
+        if "stock_quantity" in record:
+            value = record["stock_quantity"].replace(",", "")
+            if not value:
+                data["stock_quantity"] = None
+            elif value.isdigit():
+                data["stock_quantity"] = int(value)
+            else:
+                errors["stock_quantity"] = "تعداد موجودی باید عدد صحیح نامنفی باشد."
+
+        for column, default in (("is_stock", True), ("allow_individual_sale", True), ("is_active", True)):
+            value = record.get(column, "").lower()
+            if not value:
+                data[column] = default
+            elif value in TRUE_VALUES:
+                data[column] = True
+            elif value in FALSE_VALUES:
+                data[column] = False
+            else:
+                errors[column] = "مقدار بولی نامعتبر است."
+
+        # ستون compatible_cars در صورت وجود جایگزین خودروهای فعلی محصول می‌شود
+        if "compatible_cars" in record:
+            car_ids = set()
+            for value in _CAR_SEPARATORS.split(record["compatible_cars"]):
+                if not value:
+                    continue
+                if not value.isdigit() or int(value) not in self.cars:
+                    errors["compatible_cars"] = f"خودرو با شناسه {value} یافت نشد."
+                    break
+                car_ids.add(int(value))
+            data["compatible_cars"] = sorted(car_ids)
+            # همان قالب build_fitment_texts تا نیازی به bulk_update جداگانه نباشد
+            data["fitment_text"] = " ".join("{} {} {}".format(*self.cars[car_id]) for car_id in data["compatible_cars"])
+
+        return data, errors
+
+
+# ===== Import ===== #
+def import_products(stream, file_format, batch_size=2000, dry_run=False):
+    """
+    ورود دسته‌ای محصولات از CSV/XLSX.
+    ردیف‌ها به صورت جریانی خوانده و در دسته‌های batch_size اعتبارسنجی می‌شوند؛
+    هر دسته با یک bulk_create(update_conflicts) روی part_code و یک درج گروهی
+    در جدول واسط خودروها نوشته می‌شود. خطاهای هر ردیف با شماره ردیف گزارش می‌شوند.
+    """
+    result = ImportResult()
+    validator = RowValidator()
+    batch = []
+    for line, record in iter_records(stream, file_format):
+        data, errors = validator.validate(record)
+        if errors:
+            result.errors.append({"row": line, "part_code": record.get("part_code", ""), "errors": errors})
+            continue
+        batch.append(data)
+        if len(batch) >= batch_size:
+            _write_batch(batch, validator.cars, result, dry_run)
+            batch = []
+    if batch:
+        _write_batch(batch, validator.cars, result, dry_run)
+
+    if not dry_run and (result.created or result.updated):
+        invalidate_category_tree()
+        autocomplete_index.invalidate()
+        bump_catalog_version()
+    return result
+
+
+def _write_batch(rows, cars, result, dry_run):
+    codes = [row["part_code"] for row in rows]
+    existing = dict(Product.objects.filter(part_code__in=codes).values_list("part_code", "pk"))
+    result.created += len(rows) - len(existing)
+    result.updated += len(existing)
+    if dry_run:
+        return
+
+    slugs = _build_slugs([row for row in rows if row["part_code"] not in existing])
+    products = []
+    for row in rows:
+        product = Product(
+            **{key: value for key, value in row.items() if key != "compatible_cars"},
+            slug=slugs.get(row["part_code"]),
+        )
+        product.normalize_fields()
+        products.append(product)
+
+    # ستون‌های compatible_cars و stock_quantity در سرتیتر فایل هستند، پس یا همه ردیف‌ها آن‌ها را دارند یا هیچ‌کدام
+    with_cars = "compatible_cars" in rows[0]
+    with_stock = "stock_quantity" in rows[0]
+    with transaction.atomic():
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=["part_code"],
+            update_fields=UPDATE_FIELDS + (["fitment_text"] if with_cars else []) + (["stock_quantity"] if with_stock else []),
+        )
+        ids = dict(Product.objects.filter(part_code__in=codes).values_list("part_code", "pk"))
+        # برای محصولاتی که موجودی‌شان شمارش می‌شود is_stock مثل Product.save از stock_quantity مشتق می‌شود،
+        # نه از ستون is_stock فایل (حتی اگر فایل ستون stock_quantity نداشته باشد)
+        Product.objects.filter(pk__in=ids.values(), stock_quantity__isnull=False).update(
+            is_stock=Case(When(stock_quantity__gt=0, then=Value(True)), default=Value(False)),
+        )
+        if with_cars:
+            _replace_compatible_cars(rows, ids, cars)
+        # متن خودروها همراه خود ردیف نوشته شده؛ فقط بردار جستجو (پستگرس) به‌روز می‌شود
+        refresh_search_index(ids.values(), fitment=False)
+    invalidate_product_detail(existing.values())
+
+
+def _build_slugs(rows):
+    """
+    اسلاگ محصولات جدید با همان قاعده Product.build_slug، ولی با یک کوئری برای کل دسته.
+    اسلاگ محصولات موجود تغییر نمی‌کند.
+    """
+    bases = {row["part_code"]: slugify(row["name"])[:200] for row in rows}
+    taken = set(Product.objects.filter(slug__in=set(bases.values())).values_list("slug", flat=True))
+    slugs = {}
+    for part_code, base in bases.items():
+        if not base or base.isdigit() or base in taken:
+            code = slugify(part_code)
+            base = base[:200 - len(code) - 1]
+            # کدهای متفاوت ممکن است اسلاگ یکسان بدهند (AB-1 و AB_1)
+            slug = unique_slug(f"{base}-{code}" if base else code, 200, taken=taken)
+        else:
+            slug = base
+        taken.add(slug)
+        slugs[part_code] = slug
+    return slugs
+
+
+def _replace_compatible_cars(rows, ids, cars):
+    """
+    خودروهای سازگار و ردیف‌های ایندکس fitment محصولات دسته با یک حذف و یک درج گروهی جایگزین می‌شوند.
+    اطلاعات خودروها از قبل بارگذاری شده، پس add_fitments (که برای هر مجموعه خودرو کوئری می‌زند) لازم نیست.
+    """
+    through = Product.compatible_cars.through
+    product_cars = [(ids[row["part_code"]], row["compatible_cars"]) for row in rows]
+    product_ids = [product_id for product_id, _ in product_cars]
+
+    through.objects.filter(product_id__in=product_ids).delete()
+    remove_fitments(product_ids=product_ids)
+    through.objects.bulk_create(
+        [through(product_id=product_id, car_id=car_id) for product_id, car_ids in product_cars for car_id in car_ids],
+        batch_size=5000,
+    )
+    ProductFitment.objects.bulk_create(
+        [
+            ProductFitment(product_id=product_id, car_id=car_id, make=cars[car_id][0], model=cars[car_id][1], year=cars[car_id][2])
+            for product_id, car_ids in product_cars
+            for car_id in car_ids
+        ],
+        batch_size=5000,
+    )
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from apps.api.v1.shop.views import ProductViewSet, CarViewSet, CategoryViewSet
+
+ENDPOINTS = (
+    ("products", ProductViewSet, "/api/v1/shop/products/"),
+    ("cars", CarViewSet, "/api/v1/shop/cars/"),
+    ("categories", CategoryViewSet, "/api/v1/shop/categories/"),
+)
+
+
+class Command(BaseCommand):
+    help = "⏱️ مقایسه سرعت مسیر سریع (values) و ModelSerializer برای لیست‌های کاتالوگ"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="تعداد درخواست برای هر مسیر (پیش‌فرض: 200)",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=24,
+            help="اندازه صفحه لیست محصولات (پیش‌فرض: 24)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options["iterations"], 1)
+        factory = APIRequestFactory()
+
+        for name, viewset, path in ENDPOINTS:
+            params = {"page_size": options["page_size"]} if viewset is ProductViewSet else {}
+            slow_view = viewset.as_view({"get": "list"}, fast_list=False)
+            fast_view = viewset.as_view({"get": "list"}, fast_list=True)
+
+            slow_body = self.render(slow_view, factory.get(path, params))
+            fast_body = self.render(fast_view, factory.get(path, params))
+            if slow_body != fast_body:
+                raise CommandError(f"❌ خروجی مسیر سریع {name} با ModelSerializer یکسان نیست")
+
+            slow = self.measure(slow_view, factory, path, params, iterations)
+            fast = self.measure(fast_view, factory, path, params, iterations)
+            self.stdout.write(
+                f"{name:<12} serializer: {slow:8.1f} req/s   fast: {fast:8.1f} req/s   x{fast / slow:.2f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("✅ خروجی هر دو مسیر بایت به بایت یکسان است"))
+
+    def render(self, view, request):
+        response = view(request)
+        response.render()
+        return response.content
+
+    def measure(self, view, factory, path, params, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.render(view, factory.get(path, params))
+        return iterations / (time.perf_counter() - start)
@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.shop.image_variants import render_variants, delete_variants, variant_files, variants_generated
+
+MODELS = ("shop.ProductImage", "home.Banner")
+
+
+def _render(name):
+    """ اجرا در پروسس جدا؛ فقط با فایل‌ها کار می‌کند و به دیتابیس دسترسی ندارد """
+    try:
+        return name, render_variants(name), None
+    except Exception as exc:
+        return name, None, str(exc)
+
+
+class Command(BaseCommand):
+    help = "🖼️ ساخت نسخه‌های کوچک‌شده (thumb/card/zoom) تصاویر محصولات و بنرها با process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="تعداد پروسس‌ها (پیش‌فرض: تعداد هسته‌ها)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="تعداد تصاویر در هر دسته ذخیره در دیتابیس (پیش‌فرض: 200)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="ساخت دوباره نسخه‌ها حتی برای تصاویری که نسخه دارند",
+        )
+
+    def handle(self, *args, **options):
+        total = failed = 0
+        for label in MODELS:
+            model = apps.get_model(label)
+            pending = [
+                (pk, name, variants)
+                for pk, name, variants in model.objects.exclude(image="").values_list("pk", "image", "variants").iterator()
+                if options["force"] or (variants or {}).get("source") != name
+            ]
+            for start in range(0, len(pending), options["batch_size"]):
+                batch = pending[start:start + options["batch_size"]]
+                done, errors = self.process_batch(model, batch, options["workers"])
+                total += done
+                failed += len(errors)
+                for name, error in errors:
+                    self.stdout.write(self.style.WARNING(f"⚠️ {name}: {error}"))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ نسخه‌های {total} تصویر ساخته شد ({failed} خطا)"))
+
+    def process_batch(self, model, batch, workers):
+        # اتصال‌های باز نباید به پروسس‌های فرزند (fork) به ارث برسند
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_render, [name for _, name, _ in batch], chunksize=4))
+
+        storage = model._meta.get_field("image").storage
+        objects, errors = [], []
+        for (pk, _, old_variants), (name, variants, error) in zip(batch, results):
+            if error:
+                errors.append((name, error))
+                continue
+            delete_variants(old_variants, storage=storage, keep=set(variant_files(variants)))
+            objects.append(model(pk=pk, variants=variants))
+        model.objects.bulk_update(objects, ["variants"])
+
+        for instance in model.objects.filter(pk__in=[obj.pk for obj in objects]):
+            variants_generated.send(sender=model, instance=instance, variants=instance.variants)
+        return len(objects), errors
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.recommendations import build_recommendations, METRICS
+
+
+class Command(BaseCommand):
+    help = "🛒 ساخت جدول «معمولا با هم خریداری می‌شوند» از هم‌رخدادی محصولات در سفارش‌ها"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=10,
+            help="تعداد همسایه‌های نگهداری شده برای هر محصول (پیش‌فرض: 10)",
+        )
+        parser.add_argument(
+            "--min-support",
+            type=int,
+            default=2,
+            help="حداقل تعداد سفارش مشترک برای یک جفت (پیش‌فرض: 2)",
+        )
+        parser.add_argument(
+            "--metric",
+            choices=METRICS,
+            default="cosine",
+            help="معیار امتیاز جفت‌ها (پیش‌فرض: cosine)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="تعداد جفت‌های شمارش شده در هر دسته خواندن از دیتابیس (پیش‌فرض: 5000)",
+        )
+        parser.add_argument(
+            "--max-basket-size",
+            type=int,
+            default=50,
+            help="سفارش‌های با اقلام بیشتر از این مقدار نادیده گرفته می‌شوند (پیش‌فرض: 50)",
+        )
+
+    def handle(self, *args, **options):
+        count = build_recommendations(
+            top_k=options["top_k"],
+            min_support=options["min_support"],
+            metric=options["metric"],
+            chunk_size=options["chunk_size"],
+            max_basket_size=options["max_basket_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} پیشنهاد خرید همزمان ساخته شد"))
@@ -0,0 +1,57 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.importer import import_products, IMPORT_FORMATS, ImportFileError
+
+
+class Command(BaseCommand):
+    help = "📥 ورود دسته‌ای محصولات از فایل CSV یا XLSX (ایجاد یا بروزرسانی بر اساس کد قطعه)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="مسیر فایل CSV یا XLSX")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="فرمت فایل (پیش‌فرض: از روی پسوند فایل)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="تعداد ردیف‌ها در هر دسته نوشتن (پیش‌فرض: 2000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="فقط اعتبارسنجی و گزارش، بدون نوشتن در دیتابیس",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=50,
+            help="حداکثر تعداد خطاهای نمایش داده شده (پیش‌فرض: 50)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+
+        try:
+            with open(path, "rb") as fh:
+                result = import_products(
+                    fh,
+                    file_format,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors[:options["max_errors"]]:
+            self.stdout.write(self.style.WARNING(f"⚠️ ردیف {error['row']} ({error['part_code']}): {error['errors']}"))
+
+        prefix = "🔍 (اجرای آزمایشی) " if options["dry_run"] else "✅ "
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result.created} محصول جدید، {result.updated} محصول بروزرسانی شده، {result.error_count} ردیف نامعتبر"
+        ))
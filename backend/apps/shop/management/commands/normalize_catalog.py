@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.models import Product, Category, Car
+from apps.shop.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "🔤 پر کردن دوباره ستون‌های نرمال شده محصولات، دسته‌بندی‌ها و خودروها"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="تعداد رکوردها در هر دسته (پیش‌فرض: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        targets = [
+            (Car, ["make_normalized", "model_normalized"]),
+            (Category, ["name_normalized"]),
+            (Product, ["name_normalized", "brand_normalized", "part_code_normalized", "part_code_key"]),
+        ]
+
+        for model, fields in targets:
+            batch = []
+            count = 0
+            for obj in model.objects.order_by("pk").iterator(chunk_size=batch_size):
+                obj.normalize_fields()
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, fields)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, fields)
+                count += len(batch)
+            self.stdout.write(f"• {model._meta.verbose_name_plural}: {count}")
+
+        # متن خودروها و بردار جستجو هم باید با مقادیر جدید ساخته شوند
+        rebuild_search_index(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS("✅ نرمال‌سازی کاتالوگ انجام شد"))
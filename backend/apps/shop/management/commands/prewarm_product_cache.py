@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Prefetch
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.shop.models import Product, ProductImage
+from apps.shop.product_cache import set_cached_product_detail
+from apps.api.v1.fieldsets import OMIT_PARAM
+from apps.api.v1.shop.serializers import ProductDetailSerializer
+from apps.api.v1.shop.views import RECOMMENDATIONS_FIELD
+
+
+class Command(BaseCommand):
+    help = (
+        "🔥 گرم کردن کش جزئیات پرفروش‌ترین محصولات (براساس تعداد آیتم سفارش). "
+        "فقط با یک کش مشترک (مثل Redis/Memcached) برای ورکرهای وب اثر دارد."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=500,
+            help="تعداد محصولات پرفروش (پیش‌فرض: 500)",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="دامنه‌ای که آدرس‌های پاسخ با آن ساخته می‌شوند (باید با دامنه سایت یکی باشد)",
+        )
+        parser.add_argument(
+            "--secure",
+            action="store_true",
+            help="ساخت آدرس‌ها با https",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="تعداد محصولات در هر دسته (پیش‌فرض: 100)",
+        )
+
+    def handle(self, *args, **options):
+        # پیشنهادها مثل retrieve در کش نگه داشته نمی‌شوند؛ با ?omit= از پاسخ حذف و اصلا محاسبه نمی‌شوند
+        request = Request(APIRequestFactory().get(
+            "/", {OMIT_PARAM: RECOMMENDATIONS_FIELD}, HTTP_HOST=options["host"], secure=options["secure"],
+        ))
+        product_ids = list(
+            Product.objects.filter(is_active=True)
+            .annotate(order_count=Count("orderitem"))
+            .order_by("-order_count", "id")
+            .values_list("id", flat=True)[:options["limit"]]
+        )
+
+        batch_size = max(options["batch_size"], 1)
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            products = (
+                Product.objects.filter(pk__in=batch)
+                .select_related("category")
+                .prefetch_related(Prefetch("images", queryset=ProductImage.objects.order_by("id")), "compatible_cars")
+            )
+            for product in products:
+                data = ProductDetailSerializer(product, context={"request": request}).data
+                set_cached_product_detail(product.pk, request, data, slug=product.slug)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ کش جزئیات {len(product_ids)} محصول گرم شد"))
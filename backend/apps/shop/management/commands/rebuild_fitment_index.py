@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.fitment import rebuild_fitment_index
+
+
+class Command(BaseCommand):
+    help = "🚗 بازسازی کامل ایندکس سازگاری قطعه با خودرو از روی compatible_cars"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="تعداد ردیف‌ها در هر دسته (پیش‌فرض: 5000)",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_fitment_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} ردیف سازگاری ساخته شد"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "🔎 بازسازی ایندکس جستجوی محصولات (متن خودروها و بردار جستجو)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="تعداد محصولات در هر دسته (پیش‌فرض: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ ایندکس جستجوی {count} محصول بازسازی شد"))
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shop.catalog_version import bump_catalog_version
+from apps.shop.product_cache import invalidate_product_detail
+from apps.shop.storage import is_content_addressed
+
+# (مدل، فیلد فایل)؛ نسخه‌های کوچک‌شده مدل‌هایی که فیلد variants دارند هم منتقل می‌شوند
+TARGETS = (
+    ("shop.ProductImage", "image"),
+    ("home.Banner", "image"),
+    ("accounts.Profile", "photo"),
+)
+
+
+def rehash(storage, name):
+    """ مسیر آدرس‌دهی شده با محتوای فایل؛ فایل در صورت نیاز با نام هش کپی می‌شود """
+    if is_content_addressed(name):
+        return name
+    with storage.open(name, "rb") as fh:
+        return storage.save(name, File(fh, name))
+
+
+def rehash_row(storage, name, variants):
+    """ (مسیر جدید، variants جدید، فایل‌های قدیمی قابل حذف، خطا) """
+    try:
+        old_files = []
+        new_name = rehash(storage, name)
+        if new_name != name:
+            old_files.append(name)
+
+        if variants and variants.get("source") == name:
+            files = {}
+            for variant, entry in variants.get("files", {}).items():
+                files[variant] = {}
+                for key, value in entry.items():
+                    if isinstance(value, str):
+                        files[variant][key] = rehash(storage, value)
+                        if files[variant][key] != value:
+                            old_files.append(value)
+                    else:
+                        files[variant][key] = value
+            variants = {**variants, "source": new_name, "files": files}
+        return new_name, variants, old_files, None
+    except Exception as exc:
+        return name, variants, [], str(exc)
+
+
+class Command(BaseCommand):
+    help = "#️⃣ انتقال فایل‌های مدیای موجود به مسیرهای آدرس‌دهی شده با هش محتوا (به صورت موازی)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="تعداد تردهای موازی (پیش‌فرض: 8)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="تعداد رکوردها در هر دسته ذخیره در دیتابیس (پیش‌فرض: 500)",
+        )
+        parser.add_argument(
+            "--keep-old",
+            action="store_true",
+            help="فایل‌های قدیمی پس از انتقال حذف نشوند",
+        )
+
+    def handle(self, *args, **options):
+        moved = failed = 0
+        for label, field_name in TARGETS:
+            model = apps.get_model(label)
+            storage = model._meta.get_field(field_name).storage
+            if not getattr(storage, "content_addressed", False):
+                raise CommandError("storage پیش‌فرض باید ContentAddressedStorage باشد (تنظیم STORAGES).")
+
+            has_variants = any(field.name == "variants" for field in model._meta.fields)
+            columns = ["pk", field_name] + (["variants"] if has_variants else [])
+            rows = [
+                (row[0], row[1], row[2] if has_variants else None)
+                for row in model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True}).values_list(*columns)
+                if not is_content_addressed(row[1])
+            ]
+
+            for start in range(0, len(rows), options["batch_size"]):
+                batch = rows[start:start + options["batch_size"]]
+                with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                    results = list(executor.map(lambda row: rehash_row(storage, row[1], row[2]), batch))
+
+                objects, old_files = [], []
+                for (pk, name, _), (new_name, variants, old, error) in zip(batch, results):
+                    if error:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f"⚠️ {name}: {error}"))
+                        continue
+                    obj = model(pk=pk, **{field_name: new_name})
+                    if has_variants:
+                        obj.variants = variants
+                    objects.append(obj)
+                    old_files.extend(old)
+
+                model.objects.bulk_update(objects, [field_name] + (["variants"] if has_variants else []))
+                moved += len(objects)
+                # فایل‌های قدیمی فقط پس از ذخیره مسیرهای جدید در دیتابیس حذف می‌شوند
+                if not options["keep_old"]:
+                    for name in old_files:
+                        storage.delete(name)
+
+            self.stdout.write(f"  {label}: {len(rows)} فایل")
+
+        if moved:
+            # update گروهی سیگنال ندارد؛ آدرس تصاویر در کش جزئیات و کاتالوگ عوض شده است
+            ProductImage = apps.get_model("shop", "ProductImage")
+            apps.get_model("shop", "Product").refresh_main_images(ProductImage.objects.values("product_id"))
+            invalidate_product_detail(ProductImage.objects.values_list("product_id", flat=True).distinct())
+            bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {moved} فایل به مسیر هش محتوا منتقل شد ({failed} خطا)"))
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:46
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+SEARCH_INDEXES = {
+    "shop_product_search_vector_gin": "USING gin (search_vector)",
+    "shop_product_name_trgm": "USING gin (name gin_trgm_ops)",
+    "shop_product_part_code_trgm": "USING gin (part_code gin_trgm_ops)",
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    # ایندکس‌های GIN فقط روی پستگرس معنا دارند
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in SEARCH_INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON shop_product {definition}")
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def backfill_search_index(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    through = Product.compatible_cars.through
+
+    texts = {}
+    rows = through.objects.order_by("product_id", "car_id").values_list(
+        "product_id", "car__make", "car__model", "car__year"
+    )
+    for product_id, make, model, year in rows:
+        texts.setdefault(product_id, []).append(f"{make} {model} {year}")
+    products = [Product(pk=pk, fitment_text=" ".join(parts)) for pk, parts in texts.items()]
+    Product.objects.bulk_update(products, ["fitment_text"], batch_size=500)
+
+    if schema_editor.connection.vendor == "postgresql":
+        Product.objects.update(
+            search_vector=(
+                SearchVector("name", weight="A", config="simple")
+                + SearchVector("part_code", weight="A", config="simple")
+                + SearchVector("brand", weight="B", config="simple")
+                + SearchVector("fitment_text", weight="C", config="simple")
+                + SearchVector("description", weight="D", config="simple")
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0003_remove_product_package_quantity_and_more"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="product",
+            name="fitment_text",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="متن خودروهای سازگار",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True, verbose_name="بردار جستجو"
+            ),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
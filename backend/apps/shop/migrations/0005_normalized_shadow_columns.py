@@ -0,0 +1,129 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:48
+
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+from apps.shop.normalization import normalize_text
+
+NORMALIZED_FIELDS = {
+    "Car": {"make_normalized": "make", "model_normalized": "model"},
+    "Category": {"name_normalized": "name"},
+    "Product": {
+        "name_normalized": "name",
+        "brand_normalized": "brand",
+        "part_code_normalized": "part_code",
+    },
+}
+
+# ایندکس‌های تریگرام از ستون‌های خام به ستون‌های نرمال شده منتقل می‌شوند
+OLD_TRIGRAM_INDEXES = {
+    "shop_product_name_trgm": "USING gin (name gin_trgm_ops)",
+    "shop_product_part_code_trgm": "USING gin (part_code gin_trgm_ops)",
+}
+NEW_TRIGRAM_INDEXES = {
+    "shop_product_name_norm_trgm": "USING gin (name_normalized gin_trgm_ops)",
+    "shop_product_part_code_norm_trgm": "USING gin (part_code_normalized gin_trgm_ops)",
+}
+
+
+def swap_trigram_indexes(apps, schema_editor, create, drop):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in drop:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, definition in create.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON shop_product {definition}")
+
+
+def forwards_indexes(apps, schema_editor):
+    swap_trigram_indexes(apps, schema_editor, NEW_TRIGRAM_INDEXES, OLD_TRIGRAM_INDEXES)
+
+
+def backwards_indexes(apps, schema_editor):
+    swap_trigram_indexes(apps, schema_editor, OLD_TRIGRAM_INDEXES, NEW_TRIGRAM_INDEXES)
+
+
+def backfill_normalized_fields(apps, schema_editor):
+    for model_name, fields in NORMALIZED_FIELDS.items():
+        Model = apps.get_model("shop", model_name)
+        objects = list(Model.objects.only("pk", *fields.values()))
+        for obj in objects:
+            for target, source in fields.items():
+                setattr(obj, target, normalize_text(getattr(obj, source)))
+        Model.objects.bulk_update(objects, list(fields), batch_size=500)
+
+    # متن خودروها و بردار جستجو از روی ستون‌های نرمال شده دوباره ساخته می‌شوند
+    Product = apps.get_model("shop", "Product")
+    texts = {}
+    rows = Product.compatible_cars.through.objects.order_by("product_id", "car_id").values_list(
+        "product_id", "car__make_normalized", "car__model_normalized", "car__year"
+    )
+    for product_id, make, model, year in rows:
+        texts.setdefault(product_id, []).append(f"{make} {model} {year}")
+    products = [Product(pk=pk, fitment_text=" ".join(parts)) for pk, parts in texts.items()]
+    Product.objects.bulk_update(products, ["fitment_text"], batch_size=500)
+
+    if schema_editor.connection.vendor == "postgresql":
+        Product.objects.update(
+            search_vector=(
+                SearchVector("name_normalized", weight="A", config="simple")
+                + SearchVector("part_code_normalized", weight="A", config="simple")
+                + SearchVector("brand_normalized", weight="B", config="simple")
+                + SearchVector("fitment_text", weight="C", config="simple")
+                + SearchVector("description", weight="D", config="simple")
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0004_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="make_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=50
+            ),
+        ),
+        migrations.AddField(
+            model_name="car",
+            name="model_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=50
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="name_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="brand_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="name_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=200
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="part_code_normalized",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_fields, migrations.RunPython.noop),
+        migrations.RunPython(forwards_indexes, backwards_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+from apps.shop.normalization import normalize_part_code
+
+
+def backfill_part_code_key(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    products = list(Product.objects.only("pk", "part_code"))
+    for product in products:
+        product.part_code_key = normalize_part_code(product.part_code)
+    Product.objects.bulk_update(products, ["part_code_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0005_normalized_shadow_columns"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="part_code_key",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.RunPython(backfill_part_code_key, migrations.RunPython.noop),
+    ]
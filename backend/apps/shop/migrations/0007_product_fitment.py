@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_fitments(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    ProductFitment = apps.get_model("shop", "ProductFitment")
+    rows = Product.compatible_cars.through.objects.values_list(
+        "product_id", "car_id", "car__make_normalized", "car__model_normalized", "car__year"
+    )
+    ProductFitment.objects.bulk_create(
+        [
+            ProductFitment(product_id=product_id, car_id=car_id, make=make, model=model, year=year)
+            for product_id, car_id, make, model, year in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0006_product_part_code_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFitment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "make",
+                    models.CharField(
+                        max_length=50, verbose_name="برند خودرو (نرمال شده)"
+                    ),
+                ),
+                (
+                    "model",
+                    models.CharField(
+                        max_length=50, verbose_name="مدل خودرو (نرمال شده)"
+                    ),
+                ),
+                ("year", models.IntegerField(verbose_name="سال ساخت")),
+                (
+                    "car",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fitments",
+                        to="shop.car",
+                        verbose_name="خودرو",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fitments",
+                        to="shop.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "سازگاری قطعه",
+                "verbose_name_plural": "سازگاری قطعات",
+                "indexes": [
+                    models.Index(
+                        fields=["make", "model", "year", "product"],
+                        name="shop_fitment_mmy_idx",
+                    ),
+                    models.Index(
+                        fields=["year", "product"], name="shop_fitment_year_idx"
+                    ),
+                ],
+                "unique_together": {("product", "car")},
+            },
+        ),
+        migrations.RunPython(backfill_fitments, migrations.RunPython.noop),
+    ]
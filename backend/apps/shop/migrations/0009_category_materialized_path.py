@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Category = apps.get_model("shop", "Category")
+    categories = list(Category.objects.only("pk", "parent_id"))
+    by_parent = {}
+    for category in categories:
+        by_parent.setdefault(category.parent_id, []).append(category)
+
+    # پیمایش سطح به سطح از ریشه‌ها
+    queue = [(category, "", 0) for category in by_parent.get(None, [])]
+    updated = []
+    while queue:
+        category, parent_path, depth = queue.pop()
+        category.path = f"{parent_path}{category.pk}/"
+        category.depth = depth
+        updated.append(category)
+        queue.extend((child, category.path, depth + 1) for child in by_parent.get(category.pk, []))
+    Category.objects.bulk_update(updated, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0008_product_timestamps_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, verbose_name="عمق"
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=255,
+                verbose_name="مسیر",
+            ),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
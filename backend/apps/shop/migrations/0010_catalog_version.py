@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0009_category_materialized_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveBigIntegerField(default=0, verbose_name="نسخه"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="زمان آخرین تغییر",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "نسخه کاتالوگ",
+                "verbose_name_plural": "نسخه کاتالوگ",
+            },
+        ),
+    ]
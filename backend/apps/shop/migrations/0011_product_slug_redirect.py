@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from slugify import slugify
+
+
+def fix_ambiguous_slugs(apps, schema_editor):
+    """ اسلاگ‌های خالی یا تمام عددی (قابل اشتباه با شناسه) با کد قطعه یکتا می‌شوند """
+    Product = apps.get_model("shop", "Product")
+    for product in Product.objects.only("pk", "slug", "part_code").iterator():
+        if product.slug and not product.slug.isdigit():
+            continue
+        code = slugify(product.part_code)
+        product.slug = f"{product.slug}-{code}" if product.slug else code
+        product.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0010_catalog_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSlugRedirect",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_slug",
+                    models.SlugField(
+                        max_length=200, unique=True, verbose_name="اسلاگ قدیمی"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slug_redirects",
+                        to="shop.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ریدایرکت اسلاگ محصول",
+                "verbose_name_plural": "ریدایرکت\u200cهای اسلاگ محصول",
+            },
+        ),
+        migrations.RunPython(fix_ambiguous_slugs, migrations.RunPython.noop),
+    ]
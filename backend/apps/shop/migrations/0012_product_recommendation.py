@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0011_product_slug_redirect"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField(verbose_name="رتبه")),
+                ("score", models.FloatField(verbose_name="امتیاز")),
+                (
+                    "co_count",
+                    models.PositiveIntegerField(verbose_name="تعداد سفارش مشترک"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="shop.product",
+                        verbose_name="محصول",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommended_for",
+                        to="shop.product",
+                        verbose_name="محصول پیشنهادی",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "پیشنهاد خرید همزمان",
+                "verbose_name_plural": "پیشنهادهای خرید همزمان",
+                "indexes": [
+                    models.Index(
+                        fields=["product", "rank"], name="shop_recommend_rank_idx"
+                    )
+                ],
+                "unique_together": {("product", "related")},
+            },
+        ),
+    ]
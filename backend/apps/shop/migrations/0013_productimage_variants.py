@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0012_product_recommendation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimage",
+            name="variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="نسخه\u200cهای تصویر",
+            ),
+        ),
+    ]
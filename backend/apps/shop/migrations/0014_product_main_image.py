@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:18
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_main_images(apps, schema_editor):
+    """
+    قبل از قید یکتا: اگر محصولی چند تصویر اصلی دارد فقط جدیدترین اصلی می‌ماند،
+    سپس main_image همه محصولات از روی تصویر اصلی پر می‌شود.
+    """
+    Product = apps.get_model("shop", "Product")
+    ProductImage = apps.get_model("shop", "ProductImage")
+
+    duplicated = (
+        ProductImage.objects.filter(is_main=True)
+        .values("product_id")
+        .annotate(keep=Max("id"))
+        .values_list("product_id", "keep")
+    )
+    for product_id, keep in list(duplicated):
+        ProductImage.objects.filter(product_id=product_id, is_main=True).exclude(pk=keep).update(is_main=False)
+
+    main = ProductImage.objects.filter(product_id=OuterRef("pk"), is_main=True).values("image")[:1]
+    Product.objects.update(main_image=Coalesce(Subquery(main), Value("")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0013_productimage_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="main_image",
+            field=models.ImageField(
+                blank=True,
+                default="",
+                editable=False,
+                upload_to="",
+                verbose_name="تصویر اصلی",
+            ),
+        ),
+        migrations.RunPython(backfill_main_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="productimage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_main", True)),
+                fields=("product",),
+                name="shop_productimage_one_main",
+            ),
+        ),
+    ]
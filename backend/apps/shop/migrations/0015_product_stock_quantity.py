@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0014_product_main_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="stock_quantity",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="تعداد موجودی"
+            ),
+        ),
+    ]
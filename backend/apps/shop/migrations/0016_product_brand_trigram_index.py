@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:05
+
+from django.db import migrations
+
+# فیلتر برند با brand_normalized__contains اجرا می‌شود و بدون ایندکس تریگرام کل جدول را اسکن می‌کند
+TRIGRAM_INDEXES = {
+    "shop_product_brand_norm_trgm": "USING gin (brand_normalized gin_trgm_ops)",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # ایندکس‌های GIN فقط روی پستگرس معنا دارند
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in TRIGRAM_INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON shop_product {definition}")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0015_product_stock_quantity"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
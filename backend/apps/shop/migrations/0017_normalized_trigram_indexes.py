@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+# جستجوی پنل ادمین روی خودروها و دسته‌بندی‌ها با contains روی ستون‌های نرمال شده انجام می‌شود؛
+# ایندکس btree ستون‌های محصول و دسته‌بندی برای LIKE '%x%' بی‌استفاده بود و حذف می‌شود
+TRIGRAM_INDEXES = {
+    "shop_car_make_norm_trgm": "ON shop_car USING gin (make_normalized gin_trgm_ops)",
+    "shop_car_model_norm_trgm": "ON shop_car USING gin (model_normalized gin_trgm_ops)",
+    "shop_category_name_norm_trgm": "ON shop_category USING gin (name_normalized gin_trgm_ops)",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in TRIGRAM_INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} {definition}")
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0016_product_brand_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="category",
+            name="name_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="brand_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="name_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=200
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="part_code_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
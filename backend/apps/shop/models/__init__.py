@@ -1,3 +1,6 @@
 from .car_model import Car
 from .category_model import Category
-from .product_model import Product, ProductImage
\ No newline at end of file
+from .product_model import Product, ProductImage, ProductSlugRedirect
+from .fitment_model import ProductFitment
+from .catalog_model import CatalogVersion
+from .recommendation_model import ProductRecommendation
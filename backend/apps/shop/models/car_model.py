@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from apps.shop.normalization import normalize_text
+
 User = get_user_model()
 
 # ========= Car Model ========= #
@@ -12,12 +14,23 @@ class Car(models.Model):
     make = models.CharField(max_length=50, verbose_name="برند خودرو")
     model = models.CharField(max_length=50, verbose_name="مدل خودرو")
     year = models.IntegerField(verbose_name="سال ساخت")
+    make_normalized = models.CharField(max_length=50, blank=True, default="", editable=False, db_index=True)
+    model_normalized = models.CharField(max_length=50, blank=True, default="", editable=False, db_index=True)
     created_at = models.DateTimeField(verbose_name=("تاریخ ایجاد"), auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name=("تاریخ به روزرسانی"), auto_now=True)
 
     def __str__(self):
         return f"{self.make} {self.model} ({self.year})"
 
+    def normalize_fields(self):
+        """ پر کردن ستون‌های نرمال شده برند و مدل """
+        self.make_normalized = normalize_text(self.make)
+        self.model_normalized = normalize_text(self.model)
+
+    def save(self, *args, **kwargs):
+        self.normalize_fields()
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "خودرو"
         verbose_name_plural = "خودروها"
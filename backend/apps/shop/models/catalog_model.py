@@ -0,0 +1,19 @@
+from django.db import models
+from django.utils import timezone
+
+# ========= Catalog Version Model ========= #
+class CatalogVersion(models.Model):
+    """
+    شمارنده نسخه کاتالوگ (تک ردیفی).
+    با هر تغییر محصول، تصویر، دسته‌بندی، خودرو یا بنر یک واحد افزایش می‌یابد
+    و ETag و Last-Modified پاسخ‌های کاتالوگ از روی آن ساخته می‌شوند.
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="نسخه")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="زمان آخرین تغییر")
+
+    def __str__(self):
+        return f"catalog v{self.version}"
+
+    class Meta:
+        verbose_name = "نسخه کاتالوگ"
+        verbose_name_plural = "نسخه کاتالوگ"
@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from slugify import slugify
 
+from apps.shop.normalization import normalize_text
+
 # ======= Category Model ======= #
 class Category(models.Model):
     """
@@ -8,18 +12,55 @@ class Category(models.Model):
     """
     name = models.CharField(max_length=100, verbose_name="نام دسته‌بندی")
     slug = models.SlugField(max_length=100, unique=True, null=True, blank=True, verbose_name="اسلاگ")
+    name_normalized = models.CharField(max_length=100, blank=True, default="", editable=False)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children', verbose_name="دسته‌بندی والد")
+    # مسیر مادی شده از ریشه، مثل «3/12/40/»؛ زیرشاخه‌ها با یک path__startswith پیدا می‌شوند
+    path = models.CharField(max_length=255, blank=True, default="", editable=False, db_index=True, verbose_name="مسیر")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="عمق")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ بروزرسانی")
     
     def __str__(self):
         return self.name
 
+    def normalize_fields(self):
+        """ پر کردن ستون نرمال شده نام """
+        self.name_normalized = normalize_text(self.name)
+
+    def is_descendant_of(self, other):
+        """ آیا این دسته‌بندی زیرشاخه (یا خود) دسته‌بندی داده شده است؟ """
+        return bool(other.path) and self.path.startswith(other.path)
+
+    @transaction.atomic
     def save(self, *args, **kwargs):
-        """ ذخیره اسلاگ به صورت انگلیسی """
+        """ ذخیره اسلاگ به صورت انگلیسی، نام نرمال شده و نگهداری مسیر درخت """
         
         self.slug = slugify(self.name)
+        self.normalize_fields()
+        if self.parent_id and self.pk and self.parent.is_descendant_of(self):
+            raise ValueError("یک دسته‌بندی نمی‌تواند زیرمجموعه خودش یا زیرشاخه‌هایش باشد.")
         super().save(*args, **kwargs)
+        self.update_path()
+
+    def update_path(self):
+        """
+        محاسبه مسیر و عمق بعد از ذخیره (شناسه برای مسیر لازم است).
+        در صورت جابجایی، مسیر همه زیرشاخه‌ها با یک UPDATE اصلاح می‌شود.
+        """
+        parent_path = self.parent.path if self.parent_id else ""
+        path = f"{parent_path}{self.pk}/"
+        depth = self.parent.depth + 1 if self.parent_id else 0
+        if path == self.path and depth == self.depth:
+            return
+
+        old_path, old_depth = self.path, self.depth
+        Category.objects.filter(pk=self.pk).update(path=path, depth=depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - old_depth),
+            )
+        self.path, self.depth = path, depth
         
     
     class Meta:
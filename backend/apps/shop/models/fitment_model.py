@@ -0,0 +1,31 @@
+from django.db import models
+
+from .car_model import Car
+from .product_model import Product
+
+# ========= Product Fitment Model ========= #
+class ProductFitment(models.Model):
+    """
+    ایندکس غیرنرمال (denormalized) سازگاری قطعه با خودرو.
+    برای هر جفت محصول/خودرو یک ردیف با برند و مدل نرمال شده و سال ساخت نگهداری
+    می‌شود تا فیلتر «قطعات خودروی من» بدون join روی جدول خودروها و بدون DISTINCT
+    با یک زیرکوئری روی ایندکس (make, model, year) انجام شود.
+    این جدول توسط سیگنال‌های تغییر compatible_cars و ذخیره خودرو نگهداری می‌شود.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='fitments', verbose_name="محصول")
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='fitments', verbose_name="خودرو")
+    make = models.CharField(max_length=50, verbose_name="برند خودرو (نرمال شده)")
+    model = models.CharField(max_length=50, verbose_name="مدل خودرو (نرمال شده)")
+    year = models.IntegerField(verbose_name="سال ساخت")
+
+    def __str__(self):
+        return f"{self.product_id} ← {self.make} {self.model} ({self.year})"
+
+    class Meta:
+        verbose_name = "سازگاری قطعه"
+        verbose_name_plural = "سازگاری قطعات"
+        unique_together = ('product', 'car')
+        indexes = [
+            models.Index(fields=['make', 'model', 'year', 'product'], name='shop_fitment_mmy_idx'),
+            models.Index(fields=['year', 'product'], name='shop_fitment_year_idx'),
+        ]
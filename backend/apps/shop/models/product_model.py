@@ -1,21 +1,46 @@
 from slugify import slugify
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DEFERRED
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.search import SearchVectorField
 
+from apps.shop.normalization import normalize_text, normalize_part_code
 from .car_model import Car
 from .category_model import Category
 
+def unique_slug(candidate, max_length, exclude_pk=None, taken=None):
+    """ اولین اسلاگ آزاد از candidate، candidate-2، candidate-3 ... (taken: اسلاگ‌های رزرو شده در همین دسته) """
+    prefix = candidate[:max_length - 8]
+    existing = set(Product.objects.filter(slug__startswith=prefix).exclude(pk=exclude_pk).values_list('slug', flat=True))
+    existing |= set(taken or ())
+    slug, number = candidate, 2
+    while slug in existing:
+        suffix = f"-{number}"
+        slug = candidate[:max_length - len(suffix)] + suffix
+        number += 1
+    return slug
+
+
 # =========== Product Image Model =========== #
 class ProductImage(models.Model):
     """ مدل برای تصاویر محصولات """
     product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='images', verbose_name="محصول")
     image = models.ImageField(upload_to='products/', verbose_name="تصویر")
     is_main = models.BooleanField(default=False, verbose_name="تصویر اصلی")
+    # نسخه‌های کوچک‌شده (thumb/card/zoom) در WebP و JPEG؛ توسط apps.shop.image_variants پر می‌شود
+    variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="نسخه‌های تصویر")
     created_at = models.DateTimeField(verbose_name=("تاریخ ایجاد"), auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name=("تاریخ به روزرسانی"), auto_now=True)
     
     def __str__(self):
         return self.product.name
     
+    class Meta:
+        constraints = [
+            # هر محصول حداکثر یک تصویر اصلی دارد (ایندکس یکتای جزئی)
+            models.UniqueConstraint(fields=['product'], condition=models.Q(is_main=True), name='shop_productimage_one_main'),
+        ]
+    
 
 # =========== Product Model =========== #
 class Product(models.Model):
@@ -34,6 +59,8 @@ class Product(models.Model):
     
     price = models.DecimalField(max_digits=10, decimal_places=0, verbose_name="قیمت")
     is_stock = models.BooleanField(default=True, verbose_name="موجود در انبار")
+    # موجودی انبار؛ null یعنی موجودی شمارش نمی‌شود و is_stock دستی تنظیم می‌شود
+    stock_quantity = models.PositiveIntegerField(null=True, blank=True, verbose_name="تعداد موجودی")
     allow_individual_sale = models.BooleanField(default=True, verbose_name="امکان فروش تکی")
     
     # روابط
@@ -41,15 +68,117 @@ class Product(models.Model):
     compatible_cars = models.ManyToManyField(Car, related_name='parts', verbose_name="خودروهای سازگار")
     
     is_active = models.BooleanField(default=True, verbose_name="فعال")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ به روزرسانی")
+    
+    # ستون‌های نرمال شده برای فیلتر و جستجو
+    name_normalized = models.CharField(max_length=200, blank=True, default="", editable=False)
+    brand_normalized = models.CharField(max_length=100, blank=True, default="", editable=False)
+    part_code_normalized = models.CharField(max_length=100, blank=True, default="", editable=False)
+    # کلید کد قطعه بدون جداکننده و صفرهای ابتدایی، برای جستجوی دقیق/پیشوندی با ایندکس
+    part_code_key = models.CharField(max_length=100, blank=True, default="", editable=False, db_index=True)
+    
+    # ایندکس جستجو (توسط سیگنال‌ها نگهداری می‌شود)
+    fitment_text = models.TextField(blank=True, default="", editable=False, verbose_name="متن خودروهای سازگار")
+    search_vector = SearchVectorField(null=True, blank=True, editable=False, verbose_name="بردار جستجو")
+    
+    # کپی مسیر تصویر اصلی (توسط سیگنال‌های ProductImage نگهداری می‌شود) تا نمایش بندانگشتی کوئری اضافه نداشته باشد
+    main_image = models.ImageField(max_length=100, blank=True, default="", editable=False, verbose_name="تصویر اصلی")
 
     def __str__(self):
         return f"{self.name} - {self.brand}"
     
+    def normalize_fields(self):
+        """ پر کردن ستون‌های نرمال شده از روی مقادیر اصلی """
+        self.name_normalized = normalize_text(self.name)
+        self.brand_normalized = normalize_text(self.brand)
+        self.part_code_normalized = normalize_text(self.part_code)
+        self.part_code_key = normalize_part_code(self.part_code)
+    
+    @classmethod
+    def refresh_main_images(cls, product_ids):
+        """ به‌روزرسانی main_image محصولات داده شده با یک UPDATE """
+        main = ProductImage.objects.filter(product_id=models.OuterRef('pk'), is_main=True).values('image')[:1]
+        cls.objects.filter(pk__in=product_ids).update(main_image=Coalesce(models.Subquery(main), models.Value('')))
+    
+    def release_main_image(self):
+        """
+        برداشتن تصویر اصلی فعلی قبل از انتخاب تصویر اصلی جدید؛ باید داخل transaction.atomic صدا زده شود.
+        ردیف محصول قفل می‌شود تا دو درخواست همزمان با قید یکتای is_main برخورد نکنند.
+        """
+        Product.objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True).get()
+        self.images.filter(is_main=True).update(is_main=False)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # مقادیر خوانده شده از دیتابیس برای تشخیص تغییر نام و اسلاگ قبلی
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in ('name', 'slug') and value is not DEFERRED
+        }
+        return instance
+    
+    def build_slug(self):
+        """
+        اسلاگ یکتا و قطعی از روی نام.
+        در صورت تکراری بودن (یا عددی بودن که با شناسه اشتباه گرفته می‌شود) کد قطعه به انتهای آن اضافه می‌شود.
+        کدهای متفاوت ممکن است اسلاگ یکسان بدهند (AB-1 و AB_1)، پس در صورت تکرار شماره -2، -3 و ... اضافه می‌شود.
+        """
+        max_length = self._meta.get_field('slug').max_length
+        base = slugify(self.name)[:max_length]
+        if base and not base.isdigit() and not Product.objects.filter(slug=base).exclude(pk=self.pk).exists():
+            return base
+        code = slugify(self.part_code)
+        base = base[:max_length - len(code) - 1]
+        return unique_slug(f"{base}-{code}" if base else code, max_length, exclude_pk=self.pk)
+    
     def save(self, *args, **kwargs):
-        """ ذخیره خودکار اسلاگ """
-        self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        """
+        ذخیره خودکار اسلاگ و ستون‌های نرمال شده.
+        اسلاگ فقط با تغییر نام عوض می‌شود و اسلاگ قبلی در جدول ریدایرکت ثبت می‌شود.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        previous_slug = loaded.get('slug')
+        if not self.slug or self.name != loaded.get('name'):
+            self.slug = self.build_slug()
+        self.normalize_fields()
+        if self.stock_quantity is not None:
+            self.is_stock = self.stock_quantity > 0
+
+        # سیگنال post_save داخل super().save اجرا می‌شود و اسلاگ قبلی را برای باطل کردن کش لازم دارد
+        self._previous_slug = previous_slug
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.slug != previous_slug:
+                # اسلاگ فعلی هیچ محصولی نباید در جدول ریدایرکت بماند
+                ProductSlugRedirect.objects.filter(old_slug=self.slug).delete()
+                if previous_slug:
+                    ProductSlugRedirect.objects.update_or_create(old_slug=previous_slug, defaults={'product': self})
+
+        self._loaded_values = {'name': self.name, 'slug': self.slug}
 
     class Meta:
         verbose_name = "محصول"
-        verbose_name_plural = "محصولات"
\ No newline at end of file
+        verbose_name_plural = "محصولات"
+        # ایندکس‌های ترتیب برای صفحه‌بندی keyset روی (فیلد ترتیب، id)
+        indexes = [
+            models.Index(fields=['name', 'id'], name='shop_product_name_id_idx'),
+            models.Index(fields=['price', 'id'], name='shop_product_price_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='shop_product_created_id_idx'),
+        ]
+
+
+# =========== Product Slug Redirect Model =========== #
+class ProductSlugRedirect(models.Model):
+    """ اسلاگ‌های قدیمی محصولات تغییر نام داده شده برای ریدایرکت دائمی (301) به آدرس جدید """
+    old_slug = models.SlugField(max_length=200, unique=True, verbose_name="اسلاگ قدیمی")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='slug_redirects', verbose_name="محصول")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+
+    def __str__(self):
+        return f"{self.old_slug} -> {self.product_id}"
+
+    class Meta:
+        verbose_name = "ریدایرکت اسلاگ محصول"
+        verbose_name_plural = "ریدایرکت‌های اسلاگ محصول"
@@ -0,0 +1,26 @@
+from django.db import models
+
+from .product_model import Product
+
+# ========= Product Recommendation Model ========= #
+class ProductRecommendation(models.Model):
+    """
+    «معمولا با هم خریداری می‌شوند»: K همسایه برتر هر محصول براساس هم‌رخدادی در سفارش‌ها.
+    این جدول توسط دستور build_recommendations به صورت دسته‌ای بازسازی می‌شود.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations', verbose_name="محصول")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommended_for', verbose_name="محصول پیشنهادی")
+    rank = models.PositiveSmallIntegerField(verbose_name="رتبه")
+    score = models.FloatField(verbose_name="امتیاز")
+    co_count = models.PositiveIntegerField(verbose_name="تعداد سفارش مشترک")
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score:.3f})"
+
+    class Meta:
+        verbose_name = "پیشنهاد خرید همزمان"
+        verbose_name_plural = "پیشنهادهای خرید همزمان"
+        unique_together = ('product', 'related')
+        indexes = [
+            models.Index(fields=['product', 'rank'], name='shop_recommend_rank_idx'),
+        ]
@@ -0,0 +1,60 @@
+import re
+
+# ========= Persian Text Normalization ========= #
+# نگاشت حروف عربی به معادل فارسی
+_CHARACTER_MAP = {
+    "ي": "ی",
+    "ى": "ی",
+    "ئ": "ی",
+    "ك": "ک",
+    "ۀ": "ه",
+    "ة": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "ؤ": "و",
+}
+
+# ارقام فارسی و عربی به لاتین
+_DIGITS = "۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩"
+_DIGIT_MAP = {char: str(index % 10) for index, char in enumerate(_DIGITS)}
+
+# نیم‌فاصله و کاراکترهای اتصال به فاصله تبدیل می‌شوند
+_SPACE_MAP = {"\u200c": " ", "\u200d": " ", "\xa0": " "}
+
+# اعراب، تنوین و کشیده حذف می‌شوند
+_REMOVE = {ord(char): None for char in "\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0670\u0640"}
+
+_TRANSLATION = str.maketrans({**_CHARACTER_MAP, **_DIGIT_MAP, **_SPACE_MAP})
+_TRANSLATION.update(_REMOVE)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(value):
+    """
+    نرمال‌سازی متن برای ایندکس و جستجو.
+    - تبدیل ی/ک عربی به فارسی
+    - تبدیل ارقام فارسی/عربی به لاتین
+    - تبدیل نیم‌فاصله به فاصله و حذف اعراب و کشیده
+    - حروف کوچک و حذف فاصله‌های اضافه
+    خروجی برای یک ورودی همیشه یکسان است، پس ستون‌های نرمال شده با یک
+    مقایسه ساده (و قابل ایندکس) قابل جستجو هستند.
+    """
+    if not value:
+        return ""
+    value = str(value).translate(_TRANSLATION).lower()
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+_PART_CODE_SEPARATORS_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_part_code(value):
+    """
+    کلید کد قطعه برای جستجوی دقیق و پیشوندی.
+    علاوه بر normalize_text، خط تیره، فاصله و سایر جداکننده‌ها و صفرهای ابتدایی
+    حذف می‌شوند؛ یعنی «00-12 345»، «۱۲۳۴۵» و «12345» کلید یکسانی دارند.
+    """
+    key = _PART_CODE_SEPARATORS_RE.sub("", normalize_text(value))
+    return key.lstrip("0") or key[:1]
@@ -0,0 +1,70 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+PRODUCT_DETAIL_CACHE_PREFIX = "shop:product-detail"
+PRODUCT_DETAIL_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+def _generation_key(product_id):
+    return f"{PRODUCT_DETAIL_CACHE_PREFIX}:gen:{product_id}"
+
+
+def _slug_key(slug):
+    return f"{PRODUCT_DETAIL_CACHE_PREFIX}:slug:{hashlib.md5(slug.encode('utf-8')).hexdigest()}"
+
+
+def _payload_key(product_id, generation, base_url):
+    # آدرس‌های داخل پاسخ مطلق هستند، پس دامنه و پروتکل درخواست بخشی از کلید است
+    digest = hashlib.md5(base_url.encode("utf-8")).hexdigest()[:12]
+    return f"{PRODUCT_DETAIL_CACHE_PREFIX}:{product_id}:{generation}:{digest}"
+
+
+def _base_url(request):
+    return request.build_absolute_uri("/")
+
+
+def get_cached_product_detail(product_id, request):
+    """ پاسخ کش شده جزئیات محصول (یا None) """
+    generation = cache.get(_generation_key(product_id))
+    if generation is None:
+        return None
+    return cache.get(_payload_key(product_id, generation, _base_url(request)))
+
+
+def set_cached_product_detail(product_id, request, data, slug=None):
+    generation_key = _generation_key(product_id)
+    generation = cache.get(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(generation_key, generation, None)
+    cache.set(_payload_key(product_id, generation, _base_url(request)), data, PRODUCT_DETAIL_CACHE_TIMEOUT)
+    if slug:
+        cache.set(_slug_key(slug), product_id, PRODUCT_DETAIL_CACHE_TIMEOUT)
+
+
+def get_cached_product_id(slug):
+    """ شناسه محصول متناظر با اسلاگ از روی کش (یا None) """
+    return cache.get(_slug_key(slug))
+
+
+def invalidate_product_detail(product_ids, slugs=()):
+    """
+    باطل کردن کش جزئیات محصولات مشخص شده، پس از commit تراکنش جاری (مثل bump_catalog_version).
+    اگر همین حالا باطل شود، درخواست همزمان می‌تواند داده قبل از commit را دوباره کش کند.
+    به جای حذف تک تک کلیدها (که به دامنه درخواست وابسته‌اند) نسل کش هر محصول عوض می‌شود.
+    """
+    # شناسه‌ها همین حالا (داخل تراکنش) خوانده می‌شوند؛ ممکن است queryset باشند
+    product_ids = list(product_ids)
+    slugs = [slug for slug in slugs if slug]
+    if product_ids or slugs:
+        transaction.on_commit(lambda: _delete_product_detail(product_ids, slugs))
+
+
+def _delete_product_detail(product_ids, slugs):
+    if product_ids:
+        cache.delete_many([_generation_key(product_id) for product_id in product_ids])
+    if slugs:
+        cache.delete_many([_slug_key(slug) for slug in slugs])
@@ -0,0 +1,149 @@
+import heapq
+import math
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import Product, ProductRecommendation
+from .catalog_version import bump_catalog_version
+
+METRICS = ("cosine", "lift")
+
+
+# ===== Co-occurrence Counting ===== #
+def eligible_orders(max_basket_size=50):
+    """
+    شناسه سفارش‌هایی که در شمارش شرکت می‌کنند (به صورت زیرکوئری): بدون سفارش‌های لغو شده
+    و بدون سفارش‌های خیلی بزرگ (عمده) که جفت‌های بی‌معنی زیادی می‌سازند.
+    """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    return (
+        OrderItem.objects.exclude(order__status="cancelled")
+        .order_by()
+        .values("order_id")
+        .annotate(basket_size=Count("product_id", distinct=True))
+        .filter(basket_size__lte=max_basket_size)
+        .values("order_id")
+    )
+
+
+def count_items(orders):
+    """ (تعداد سفارش‌ها، {محصول: تعداد سفارش‌های شامل آن}) با GROUP BY در دیتابیس """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    item_counts = dict(
+        OrderItem.objects.filter(order_id__in=orders)
+        .order_by()
+        .values("product_id")
+        .annotate(count=Count("order_id", distinct=True))
+        .values_list("product_id", "count")
+    )
+    return orders.count(), item_counts
+
+
+def iter_pair_counts(orders, min_support=2, chunk_size=5000):
+    """
+    تعداد سفارش مشترک هر جفت محصول (کوچک‌تر، بزرگ‌تر) با self-join آیتم‌های سفارش روی order_id.
+    شمارش و حذف جفت‌های زیر min_support (GROUP BY ... HAVING) در خود دیتابیس انجام می‌شود
+    و نتیجه دسته‌ای خوانده می‌شود؛ پس حافظه پایتون به تعداد جفت‌ها وابسته نیست.
+    """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    rows = (
+        OrderItem.objects.filter(order_id__in=orders, order__items__product_id__gt=F("product_id"))
+        .order_by()
+        .values("product_id", related_id=F("order__items__product_id"))
+        .annotate(co_count=Count("order_id", distinct=True))
+        .filter(co_count__gte=min_support)
+        .values_list("product_id", "related_id", "co_count")
+    )
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def score_pair(co_count, first_count, second_count, order_count, metric):
+    if metric == "lift":
+        return co_count * order_count / (first_count * second_count)
+    return co_count / math.sqrt(first_count * second_count)
+
+
+def top_neighbours(order_count, item_counts, pair_counts, top_k=10, metric="cosine"):
+    """
+    K همسایه برتر هر محصول: {product_id: [(related_id, score, co_count), ...]}
+    برای هر محصول فقط یک heap به اندازه K نگه داشته می‌شود.
+    """
+    heaps = defaultdict(list)
+    for first, second, co_count in pair_counts:
+        score = score_pair(co_count, item_counts[first], item_counts[second], order_count, metric)
+        for product_id, related in ((first, second), (second, first)):
+            heap = heaps[product_id]
+            if len(heap) < top_k:
+                heapq.heappush(heap, (score, co_count, related))
+            else:
+                heapq.heappushpop(heap, (score, co_count, related))
+
+    return {
+        product_id: [(related, score, co_count) for score, co_count, related in sorted(heap, reverse=True)]
+        for product_id, heap in heaps.items()
+    }
+
+
+# ===== Build ===== #
+def build_recommendations(top_k=10, min_support=2, metric="cosine", chunk_size=5000, max_basket_size=50, batch_size=5000):
+    """ بازسازی کامل جدول پیشنهادها؛ تعداد ردیف‌های ساخته شده را برمی‌گرداند """
+    if metric not in METRICS:
+        raise ValueError(f"metric باید یکی از {METRICS} باشد")
+
+    orders = eligible_orders(max_basket_size=max_basket_size)
+    order_count, item_counts = count_items(orders)
+    neighbours = top_neighbours(
+        order_count,
+        item_counts,
+        iter_pair_counts(orders, min_support=min_support, chunk_size=chunk_size),
+        top_k=top_k,
+        metric=metric,
+    )
+
+    existing_ids = set(Product.objects.values_list("pk", flat=True))
+    rows = [
+        ProductRecommendation(product_id=product_id, related_id=related, rank=rank, score=score, co_count=co_count)
+        for product_id, items in neighbours.items()
+        if product_id in existing_ids
+        for rank, (related, score, co_count) in enumerate((item for item in items if item[0] in existing_ids), start=1)
+    ]
+
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductRecommendation.objects.bulk_create(rows, batch_size=batch_size)
+        # پیشنهادها جزو پاسخ جزئیات محصول هستند (خارج از کش جزئیات)، ولی ETag سراسری
+        # کاتالوگ باید عوض شود تا کلاینت‌ها 304 با پیشنهادهای قدیمی نگیرند؛ پس از commit اجرا می‌شود
+        bump_catalog_version()
+    return len(rows)
+
+
+# ===== Lookups ===== #
+def recommended_products(product_id, limit=10):
+    """ محصولات فعال «معمولا با هم خریداری می‌شوند» برای یک محصول به ترتیب رتبه """
+    return list(
+        Product.objects.filter(recommended_for__product_id=product_id, is_active=True)
+        .order_by("recommended_for__rank")[:limit]
+    )
+
+
+def recommended_for_products(product_ids, limit=10):
+    """
+    پیشنهاد برای مجموعه‌ای از محصولات (مثلا سبد خرید): امتیاز همسایه‌ها جمع زده می‌شود
+    و محصولاتی که خودشان در مجموعه هستند حذف می‌شوند.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    ranked = list(
+        ProductRecommendation.objects.filter(product_id__in=product_ids, related__is_active=True)
+        .exclude(related_id__in=product_ids)
+        .values("related_id")
+        .annotate(total_score=Sum("score"))
+        .order_by("-total_score", "related_id")
+        .values_list("related_id", flat=True)[:limit]
+    )
+    products = Product.objects.in_bulk(ranked)
+    return [products[pk] for pk in ranked if pk in products]
@@ -0,0 +1,129 @@
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+
+from apps.shop.models import Product
+from apps.shop.normalization import normalize_text
+
+# پیکربندی متنی پستگرس؛ برای فارسی stemmer نداریم پس از simple استفاده می‌شود
+SEARCH_CONFIG = "simple"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_postgres():
+    """ آیا دیتابیس فعلی پستگرس است؟ (در محیط توسعه از sqlite استفاده می‌شود) """
+    return connection.vendor == "postgresql"
+
+
+# ========= Search Vector ========= #
+def product_search_vector():
+    """
+    عبارت ساخت بردار جستجوی محصول از روی ستون‌های نرمال شده.
+    نام و کد قطعه بیشترین وزن را دارند و متن خودروهای سازگار به صورت
+    غیرنرمال (denormalized) داخل خود محصول نگهداری می‌شود تا نیازی به join نباشد.
+    """
+    return (
+        SearchVector("name_normalized", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("part_code_normalized", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("brand_normalized", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("fitment_text", weight="C", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def build_fitment_texts(product_ids):
+    """ متن (نرمال شده) خودروهای سازگار هر محصول را با یک کوئری روی جدول واسط می‌سازد """
+    through = Product.compatible_cars.through
+    texts = {product_id: [] for product_id in product_ids}
+    rows = (
+        through.objects.filter(product_id__in=product_ids)
+        .order_by("product_id", "car_id")
+        .values_list("product_id", "car__make_normalized", "car__model_normalized", "car__year")
+    )
+    for product_id, make, model, year in rows:
+        texts[product_id].append(f"{make} {model} {year}")
+    return {product_id: " ".join(parts) for product_id, parts in texts.items()}
+
+
+def refresh_search_index(product_ids, fitment=True):
+    """
+    به‌روزرسانی ایندکس جستجوی محصولات داده شده.
+    - متن خودروهای سازگار (در صورت نیاز) با یک bulk_update
+    - بردار جستجو با یک UPDATE روی پستگرس
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+
+    if fitment:
+        texts = build_fitment_texts(product_ids)
+        products = [Product(pk=pk, fitment_text=text) for pk, text in texts.items()]
+        Product.objects.bulk_update(products, ["fitment_text"], batch_size=500)
+
+    if is_postgres():
+        Product.objects.filter(pk__in=product_ids).update(search_vector=product_search_vector())
+
+
+def rebuild_search_index(batch_size=1000):
+    """ بازسازی کامل ایندکس جستجو برای همه محصولات (برای بک‌فیل) """
+    ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), batch_size):
+        refresh_search_index(ids[start:start + batch_size])
+    return len(ids)
+
+
+# ========= Query ========= #
+def tokenize(term):
+    """ نرمال‌سازی عبارت جستجو و شکستن آن به کلمات """
+    return _TOKEN_RE.findall(normalize_text(term))
+
+
+def search_products(queryset, term):
+    """
+    جستجوی رتبه‌بندی شده محصولات.
+    روی پستگرس از full-text (با تطبیق پیشوندی برای تایپ لحظه‌ای) به همراه
+    شباهت تریگرام نام و کد قطعه (نرمال شده) استفاده می‌شود و نتیجه با فیلد search_rank
+    annotate می‌شود. روی سایر دیتابیس‌ها فقط ستون‌های خود جدول محصول
+    بررسی می‌شوند و هیچ join ای روی خودروها انجام نمی‌شود.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return queryset
+
+    if not is_postgres():
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(name_normalized__contains=token)
+                | Q(brand_normalized__contains=token)
+                | Q(part_code_normalized__contains=token)
+                | Q(fitment_text__contains=token)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(1.0, output_field=FloatField()))
+
+    raw_query = " & ".join(f"{token}:*" for token in tokens)
+    query = SearchQuery(raw_query, config=SEARCH_CONFIG, search_type="raw")
+    text = " ".join(tokens)
+    # حاصل ts_rank و word_similarity از نوع real است؛ تبدیل به double precision لازم است تا مقدار
+    # ذخیره شده در cursor صفحه‌بندی دقیقا با همان مقدار در دیتابیس برابر شود (ردیف‌های هم‌امتیاز تکرار نشوند)
+    rank = (
+        SearchRank(F("search_vector"), query)
+        + TrigramWordSimilarity(text, "name_normalized")
+        + TrigramWordSimilarity(text, "part_code_normalized")
+    )
+    return queryset.annotate(
+        search_rank=Cast(rank, FloatField()),
+    ).filter(
+        Q(search_vector=query)
+        | Q(name_normalized__trigram_word_similar=text)
+        | Q(part_code_normalized__trigram_word_similar=text)
+    )
@@ -0,0 +1,201 @@
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Product, ProductImage, Car, Category
+from .search import refresh_search_index
+from .fitment import add_fitments, remove_fitments, sync_car_fitments
+from .category_tree import invalidate_category_tree
+from .autocomplete import autocomplete_index
+from .catalog_version import bump_catalog_version, catalog_changed
+from .snapshot import schedule_snapshot_rebuild
+from .product_cache import invalidate_product_detail
+from .image_variants import needs_variants, schedule_variants, delete_variants, variants_generated
+
+# ========= Product Search Index Signal ========= #
+@receiver(post_save, sender=Product)
+def update_product_search_index(sender, instance, raw=False, **kwargs):
+    """
+    پس از ذخیره محصول، بردار جستجوی آن به‌روزرسانی می‌شود.
+    متن خودروها تنها با تغییر خودروهای سازگار عوض می‌شود.
+    """
+    if raw:
+        return
+    refresh_search_index([instance.pk], fitment=False)
+
+# ========= Compatible Cars Changed Signal ========= #
+@receiver(m2m_changed, sender=Product.compatible_cars.through)
+def update_fitment_on_cars_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    با تغییر خودروهای سازگار، ردیف‌های ایندکس سازگاری به صورت افزایشی
+    اضافه/حذف می‌شوند و متن خودروها و بردار جستجوی محصولات مربوطه دوباره ساخته می‌شود.
+    """
+    if action == "pre_clear" and reverse:
+        # در حالت car.parts.clear() شناسه محصولات قبل از حذف نگه داشته می‌شود
+        instance._cleared_product_ids = list(instance.parts.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        product_ids = [instance.pk]
+        car_ids = pk_set or []
+    elif action == "post_clear":
+        product_ids = getattr(instance, "_cleared_product_ids", [])
+    else:
+        product_ids = pk_set or []
+        car_ids = [instance.pk]
+
+    if action == "post_add":
+        add_fitments(product_ids, car_ids)
+    elif action == "post_remove":
+        remove_fitments(product_ids=product_ids, car_ids=car_ids)
+    elif reverse:
+        remove_fitments(car_ids=[instance.pk])
+    else:
+        remove_fitments(product_ids=[instance.pk])
+
+    refresh_search_index(product_ids)
+
+# ========= Car Signals ========= #
+@receiver(post_save, sender=Car)
+def update_fitment_on_car_save(sender, instance, created, raw=False, **kwargs):
+    """ تغییر برند/مدل/سال خودرو روی ایندکس سازگاری و متن جستجوی همه قطعات سازگار آن اثر می‌گذارد """
+    if raw or created:
+        return
+    sync_car_fitments(instance)
+    refresh_search_index(instance.parts.values_list("pk", flat=True))
+
+@receiver(pre_delete, sender=Car)
+def remember_products_before_car_delete(sender, instance, **kwargs):
+    instance._affected_product_ids = list(instance.parts.values_list("pk", flat=True))
+
+@receiver(post_delete, sender=Car)
+def update_fitment_on_car_delete(sender, instance, **kwargs):
+    refresh_search_index(getattr(instance, "_affected_product_ids", []))
+
+# ========= Category Tree Cache Signal ========= #
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_category_tree_cache(sender, **kwargs):
+    """ تغییر دسته‌بندی‌ها یا محصولات (تعداد هر گره) درخت کش شده را باطل می‌کند """
+    invalidate_category_tree()
+
+# ========= Autocomplete Index Signals ========= #
+@receiver(post_save, sender=Product)
+def update_autocomplete_product(sender, instance, raw=False, **kwargs):
+    """ به‌روزرسانی افزایشی ایندکس تکمیل خودکار همین ورکر (فقط اگر قبلاً ساخته شده باشد) """
+    if not raw:
+        autocomplete_index.update_product(instance)
+
+@receiver(post_delete, sender=Product)
+def remove_autocomplete_product(sender, instance, **kwargs):
+    autocomplete_index.remove_product(instance.pk)
+
+@receiver(post_save, sender=Car)
+def update_autocomplete_car(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.update_car(instance)
+
+@receiver(post_delete, sender=Car)
+def remove_autocomplete_car(sender, instance, **kwargs):
+    autocomplete_index.remove_car(instance)
+
+@receiver(post_save, sender=Category)
+def update_autocomplete_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete_index.update_category(instance)
+
+@receiver(post_delete, sender=Category)
+def remove_autocomplete_category(sender, instance, **kwargs):
+    autocomplete_index.remove_category(instance.pk)
+
+# ========= Catalog Version Signals ========= #
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def bump_catalog_version_on_change(sender, raw=False, **kwargs):
+    """ هر تغییر در داده‌های کاتالوگ ETag پاسخ‌های فروشگاه را باطل می‌کند """
+    if not raw:
+        bump_catalog_version()
+
+@receiver(m2m_changed, sender=Product.compatible_cars.through)
+def bump_catalog_version_on_cars_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalog_version()
+
+# ========= Catalog Snapshot Signal ========= #
+@receiver(catalog_changed)
+def rebuild_snapshot_on_catalog_change(sender, **kwargs):
+    """ snapshot فشرده کاتالوگ با تاخیر در پس‌زمینه دوباره ساخته می‌شود """
+    schedule_snapshot_rebuild()
+
+# ========= Product Detail Cache Signals ========= #
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_detail_on_product_change(sender, instance, **kwargs):
+    invalidate_product_detail([instance.pk], slugs=[instance.slug, getattr(instance, "_previous_slug", None)])
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_product_detail_on_image_change(sender, instance, **kwargs):
+    invalidate_product_detail([instance.product_id])
+
+@receiver(post_save, sender=Category)
+def invalidate_product_detail_on_category_change(sender, instance, created, raw=False, **kwargs):
+    """ نام دسته‌بندی در جزئیات محصولات همان دسته‌بندی نمایش داده می‌شود """
+    if raw or created:
+        return
+    invalidate_product_detail(Product.objects.filter(category_id=instance.pk).values_list("pk", flat=True))
+
+@receiver(post_save, sender=Car)
+def invalidate_product_detail_on_car_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    invalidate_product_detail(instance.parts.values_list("pk", flat=True))
+
+@receiver(post_delete, sender=Car)
+def invalidate_product_detail_on_car_delete(sender, instance, **kwargs):
+    invalidate_product_detail(getattr(instance, "_affected_product_ids", []))
+
+@receiver(m2m_changed, sender=Product.compatible_cars.through)
+def invalidate_product_detail_on_cars_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_product_detail([instance.pk])
+    elif action == "post_clear":
+        invalidate_product_detail(getattr(instance, "_cleared_product_ids", []))
+    else:
+        invalidate_product_detail(pk_set or [])
+
+# ========= Image Variant Signals ========= #
+@receiver(post_save, sender=ProductImage)
+def generate_product_image_variants(sender, instance, raw=False, **kwargs):
+    """ نسخه‌های کوچک‌شده تصویر جدید یا تغییر کرده در پس‌زمینه ساخته می‌شوند """
+    if not raw and needs_variants(instance):
+        schedule_variants(instance)
+
+@receiver(post_delete, sender=ProductImage)
+def delete_product_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.variants, storage=instance.image.storage)
+
+@receiver(variants_generated, sender=ProductImage)
+def invalidate_caches_on_variants_generated(sender, instance, **kwargs):
+    # نسخه‌ها با update() ذخیره می‌شوند و سیگنال‌های post_save اجرا نمی‌شوند
+    invalidate_product_detail([instance.product_id])
+    bump_catalog_version()
+
+# ========= Main Image Signals ========= #
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def refresh_product_main_image(sender, instance, raw=False, **kwargs):
+    """ مسیر تصویر اصلی روی خود محصول کپی می‌شود """
+    if not raw:
+        Product.refresh_main_images([instance.product_id])
@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .models import Product, ProductImage, Category, Car, CatalogVersion
+from .catalog_version import CATALOG_VERSION_ID
+
+try:
+    import brotli
+except ImportError:  # بدون کتابخانه brotli فقط نسخه gzip ساخته می‌شود
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+# تعداد نسخه‌های قبلی که برای کلاینت‌های در حال دانلود نگه داشته می‌شوند
+KEEP_SNAPSHOTS = 3
+
+_rebuild_lock = threading.Lock()
+_rebuild_timer = None
+
+
+def snapshot_dir():
+    return os.path.join(settings.MEDIA_ROOT, settings.CATALOG_SNAPSHOT_DIR)
+
+
+def snapshot_url(filename):
+    return f"{settings.MEDIA_URL.rstrip('/')}/{settings.CATALOG_SNAPSHOT_DIR}/{filename}"
+
+
+# ===== Snapshot Data ===== #
+@contextmanager
+def consistent_read():
+    """
+    همه کوئری‌های داخل بلوک در یک تراکنش خوانده می‌شوند؛ روی پستگرس با سطح REPEATABLE READ
+    تا محصولات، تصاویر و خودروهای سازگار همه از یک snapshot دیتابیس باشند.
+    سطح ایزولاسیون فقط در ابتدای تراکنش بیرونی قابل تنظیم است.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        yield
+
+
+def build_catalog_data(chunk_size=2000):
+    """
+    کل کاتالوگ فعال (محصولات، دسته‌بندی‌ها، خودروها و آدرس تصاویر) به صورت دیکشنری.
+    برای خروجی سازگار باید داخل consistent_read صدا زده شود.
+    """
+    storage = ProductImage._meta.get_field("image").storage
+
+    images = defaultdict(list)
+    image_rows = (
+        ProductImage.objects.filter(product__is_active=True)
+        .order_by("product_id", "-is_main", "id")
+        .values_list("product_id", "image", "is_main")
+    )
+    for product_id, name, is_main in image_rows.iterator(chunk_size=chunk_size):
+        if name:
+            images[product_id].append({"url": storage.url(name), "is_main": is_main})
+
+    cars = defaultdict(list)
+    fitment_rows = Product.compatible_cars.through.objects.filter(product__is_active=True).values_list("product_id", "car_id")
+    for product_id, car_id in fitment_rows.iterator(chunk_size=chunk_size):
+        cars[product_id].append(car_id)
+
+    products = []
+    product_rows = Product.objects.filter(is_active=True).order_by("id").values(
+        "id", "name", "slug", "part_code", "brand", "country_of_origin", "warranty",
+        "price", "is_stock", "allow_individual_sale", "category_id",
+    )
+    for row in product_rows.iterator(chunk_size=chunk_size):
+        row["compatible_cars"] = sorted(cars.get(row["id"], []))
+        row["images"] = images.get(row["id"], [])
+        products.append(row)
+
+    return {
+        "products": products,
+        "categories": list(Category.objects.order_by("path").values("id", "name", "slug", "parent_id", "depth")),
+        "cars": list(Car.objects.order_by("id").values("id", "make", "model", "year")),
+    }
+
+
+# ===== Snapshot Files ===== #
+def _write_atomic(path, content):
+    # فایل موقت یکتا برای هر نوشتن؛ بازسازی همزمان در چند worker یا دستور مدیریتی روی هم نمی‌نویسند
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(content)
+        # mkstemp فایل را فقط برای مالک قابل خواندن می‌سازد؛ فایل‌ها توسط وب‌سرور سرو می‌شوند
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def build_catalog_snapshot(chunk_size=2000):
+    """
+    فایل JSON نسخه‌دار کاتالوگ را به همراه نسخه‌های فشرده gzip و brotli می‌سازد
+    و manifest.json را به نسخه جدید اشاره می‌دهد. خروجی manifest را برمی‌گرداند.
+    """
+    with consistent_read():
+        # نسخه از همان snapshot دیتابیس خوانده می‌شود، نه از کش، تا با داده‌ها یکی باشد
+        version = CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).values_list("version", flat=True).first() or 0
+        generated_at = timezone.now()
+        data = build_catalog_data(chunk_size=chunk_size)
+    data = {"version": version, "generated_at": generated_at, **data}
+    content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    digest = hashlib.sha256(content).hexdigest()
+    # نام فایل شامل نسخه و هش محتوا است تا بتوان آن را برای همیشه (immutable) کش کرد
+    basename = f"catalog-v{version}-{digest[:12]}.json"
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    files = {"json": (basename, content)}
+    files["gzip"] = (f"{basename}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        files["br"] = (f"{basename}.br", brotli.compress(content, quality=11))
+
+    manifest = {
+        "version": version,
+        "generated_at": generated_at.isoformat(),
+        "sha256": digest,
+        "counts": {key: len(data[key]) for key in ("products", "categories", "cars")},
+        "files": {},
+    }
+    for encoding, (filename, payload) in files.items():
+        _write_atomic(os.path.join(directory, filename), payload)
+        manifest["files"][encoding] = {"name": filename, "url": snapshot_url(filename), "size": len(payload)}
+
+    _write_atomic(os.path.join(directory, MANIFEST_NAME), json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+    _remove_old_snapshots(directory, keep=basename)
+    return manifest
+
+
+def _remove_old_snapshots(directory, keep):
+    snapshots = sorted(
+        (name for name in os.listdir(directory) if name.startswith("catalog-v") and name.endswith(".json")),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+        reverse=True,
+    )
+    for name in snapshots[KEEP_SNAPSHOTS:]:
+        if name == keep:
+            continue
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def read_manifest():
+    try:
+        with open(os.path.join(snapshot_dir(), MANIFEST_NAME), "rb") as fh:
+            return json.loads(fh.read())
+    except FileNotFoundError:
+        return None
+
+
+# ===== Background Rebuild ===== #
+def schedule_snapshot_rebuild():
+    """
+    بازسازی snapshot را با تاخیر در یک ترد پس‌زمینه زمان‌بندی می‌کند.
+    تغییرات پشت سر هم (مثلا ویرایش گروهی) در یک بازسازی جمع می‌شوند.
+    """
+    global _rebuild_timer
+    if not settings.CATALOG_SNAPSHOT_AUTO_REBUILD:
+        return
+    with _rebuild_lock:
+        if _rebuild_timer is not None:
+            _rebuild_timer.cancel()
+        _rebuild_timer = threading.Timer(settings.CATALOG_SNAPSHOT_REBUILD_DELAY, _rebuild_in_background)
+        _rebuild_timer.daemon = True
+        _rebuild_timer.start()
+
+
+def _rebuild_in_background():
+    global _rebuild_timer
+    with _rebuild_lock:
+        _rebuild_timer = None
+    try:
+        build_catalog_snapshot()
+    finally:
+        # اتصال‌های دیتابیس این ترد باید صریحا بسته شوند
+        connections.close_all()
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.views.static import serve
+
+# مسیر فایل‌های آدرس‌دهی شده با محتوا: <پوشه>/<دو کاراکتر اول هش>/<sha256>.<پسوند>
+CONTENT_ADDRESSED_RE = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[0-9a-z]+)?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def is_content_addressed(name):
+    return bool(name) and CONTENT_ADDRESSED_RE.search(name) is not None
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _AlreadyStored(Exception):
+    pass
+
+
+# ===== Content Addressed Storage ===== #
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    فایل‌ها با هش sha256 محتوایشان ذخیره می‌شوند (نام فایل کاربر نادیده گرفته می‌شود).
+    - آپلود تکراری دوباره نوشته نمی‌شود و همان مسیر قبلی برمی‌گردد
+    - محتوای هر آدرس هرگز تغییر نمی‌کند، پس می‌توان آن را برای همیشه (immutable) کش کرد
+    چون یک فایل ممکن است بین چند رکورد مشترک باشد، کدی که فایل‌ها را پاک می‌کند
+    باید content_addressed را بررسی کند.
+    """
+    content_addressed = True
+
+    def hashed_name(self, name, content):
+        directory = os.path.dirname(name)
+        if is_content_addressed(name):
+            # نام از قبل هش شده (مثلا کپی فایل یک رکورد دیگر)؛ پوشه دو حرفی تکرار نمی‌شود
+            directory = os.path.dirname(directory)
+        extension = os.path.splitext(name)[1].lower()
+        digest = content_hash(content)
+        return os.path.join(directory, digest[:2], f"{digest}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        # هش همیشه از روی محتوا محاسبه می‌شود، نه از نام ارسالی
+        hashed = self.hashed_name(name, content)
+        try:
+            return super().save(hashed, content, max_length=max_length)
+        except _AlreadyStored:
+            return hashed
+
+    def get_available_name(self, name, max_length=None):
+        # محتوای یکسان یعنی فایل یکسان؛ به جای ساختن نام جایگزین همان فایل موجود برمی‌گردد.
+        # (در ذخیره همزمان دو آپلود یکسان هم _save در صورت وجود فایل به اینجا می‌رسد)
+        if is_content_addressed(name) and self.exists(name):
+            raise _AlreadyStored
+        return super().get_available_name(name, max_length=max_length)
+
+
+# ===== Media Serving ===== #
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    سرو فایل‌های مدیا در محیط توسعه؛ فایل‌های آدرس‌دهی شده با محتوا هدر کش یک‌ساله immutable می‌گیرند.
+    در production همین قاعده باید در nginx تنظیم شود.
+    """
+    response = serve(request, path, document_root=document_root or settings.MEDIA_ROOT, show_indexes=show_indexes)
+    if is_content_addressed(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -1,3 +1,578 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.orders.models import Order, OrderItem, OrderStatus
+from apps.api.v1.shop.views import CarViewSet, CategoryViewSet, ProductViewSet
+from . import image_variants
+from .product_cache import get_cached_product_detail
+from .importer import ImportFileError, import_products
+from .models import Car, Category, Product, ProductFitment, ProductImage, ProductRecommendation, ProductSlugRedirect
+from .recommendations import build_recommendations
+
+PRODUCTS_URL = "/api/v1/shop/products/"
+
+
+def create_product(category, index, **fields):
+    values = {
+        "name": f"قطعه {index}", "part_code": f"P-{index}", "brand": "برند",
+        "country_of_origin": "ایران", "price": 1000 + index, "category": category,
+    }
+    values.update(fields)
+    return Product.objects.create(**values)
+
+
+def image_file(name="part.png", size=(640, 480)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class MediaRootMixin:
+    """ فایل‌های آپلود شده در یک پوشه موقت نوشته و در پایان پاک می‌شوند """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+
+# ========= Product Slug Tests ========= #
+class ProductSlugTests(TestCase):
+    """ اسلاگ یکتا و قطعی از نام و ریدایرکت 301 از اسلاگ قدیمی پس از تغییر نام """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="ترمز")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_collisions(self):
+        first = create_product(self.category, 1, name="Brake Pad", part_code="AB-1")
+        second = create_product(self.category, 2, name="Brake Pad", part_code="AB-1x")
+        third = create_product(self.category, 3, name="Brake Pad", part_code="AB_1")
+        fourth = create_product(self.category, 4, name="Brake Pad!", part_code="AB 1")
+        numeric = create_product(self.category, 5, name="206", part_code="N-5")
+
+        self.assertEqual(first.slug, "brake-pad")
+        self.assertEqual(second.slug, "brake-pad-ab-1x")
+        # AB-1 و AB_1 اسلاگ کد یکسان دارند؛ شماره به انتها اضافه می‌شود
+        self.assertEqual(third.slug, "brake-pad-ab-1")
+        self.assertEqual(fourth.slug, "brake-pad-ab-1-2")
+        self.assertEqual(numeric.slug, "206-n-5")
+
+    def test_slug_is_stable_until_renamed(self):
+        product = create_product(self.category, 1, name="Brake Pad")
+        product.price = 2000
+        product.save()
+        self.assertEqual(product.slug, "brake-pad")
+
+        product.name = "Brake Disc"
+        product.save()
+        self.assertEqual(product.slug, "brake-disc")
+        self.assertEqual(list(ProductSlugRedirect.objects.values_list("old_slug", "product_id")), [("brake-pad", product.pk)])
+
+    def test_old_slug_redirects(self):
+        product = create_product(self.category, 1, name="Brake Pad")
+        product.name = "Brake Disc"
+        product.save()
+
+        response = self.client.get(f"{PRODUCTS_URL}brake-pad/?fields=id,name")
+
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], f"http://testserver{PRODUCTS_URL}brake-disc/?fields=id,name")
+        self.assertEqual(self.client.get(response["Location"]).data, {"id": product.pk, "name": "Brake Disc"})
+
+    def test_reused_slug_is_not_redirected(self):
+        renamed = create_product(self.category, 1, name="Brake Pad")
+        renamed.name = "Brake Disc"
+        renamed.save()
+        # محصول جدید اسلاگ آزاد شده را می‌گیرد و ریدایرکت قدیمی حذف می‌شود
+        product = create_product(self.category, 2, name="Brake Pad")
+
+        self.assertEqual(product.slug, "brake-pad")
+        self.assertFalse(ProductSlugRedirect.objects.filter(old_slug="brake-pad").exists())
+        self.assertEqual(self.client.get(f"{PRODUCTS_URL}brake-pad/").data["id"], product.pk)
+
+
+# ========= Search Pagination Tests ========= #
+class SearchPaginationTests(TestCase):
+    """ صفحه‌بندی cursor روی نتایج جستجو با امتیاز برابر: هیچ ردیفی تکرار یا جا انداخته نمی‌شود """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="ترمز")
+        cls.matches = [create_product(category, i, name=f"لنت ترمز {i}") for i in range(7)]
+        create_product(category, 99, name="فیلتر هوا")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+            pages += 1
+            self.assertLess(pages, 10)
+        return ids, response.data
+
+    def test_pages_through_tied_ranks(self):
+        ids, last = self.walk(f"{PRODUCTS_URL}?{urlencode({'q': 'لنت', 'page_size': 3})}")
+
+        self.assertEqual(ids, sorted(product.id for product in self.matches))
+
+        # برگشت از صفحه آخر با previous همان ردیف‌ها را به ترتیب نشان می‌دهد
+        back = []
+        url = last["previous"]
+        while url:
+            response = self.client.get(url)
+            back[:0] = [item["id"] for item in response.data["results"]]
+            url = response.data["previous"]
+        self.assertEqual(back + [item["id"] for item in last["results"]], ids)
+
+
+# ========= Recommendation Tests ========= #
+class RecommendationTests(TestCase):
+    """ امتیاز و K همسایه برتر از هم‌رخدادی محصولات در سفارش‌ها """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="buyer", password="pass")
+        category = Category.objects.create(name="موتور")
+        a, b, c, d = cls.products = [create_product(category, i) for i in range(4)]
+
+        def order(*products, status=OrderStatus.PENDING):
+            order = Order.objects.create(user=user, shipping_address="تهران", total_amount=0, status=status)
+            OrderItem.objects.bulk_create([OrderItem(order=order, product=p, price_at_time_of_purchase=p.price) for p in products])
+
+        for _ in range(2):
+            order(a, b)
+        order(a, b, c)
+        order(a, c)
+        for _ in range(3):
+            order(c, d)
+        # سفارش‌های لغو شده و سفارش‌های بزرگ‌تر از max_basket_size شمرده نمی‌شوند
+        for _ in range(2):
+            order(a, d, status=OrderStatus.CANCELLED)
+        order(a, b, c, d)
+
+    def neighbours(self):
+        rows = ProductRecommendation.objects.order_by("product_id", "rank").values_list("product_id", "related_id", "rank", "co_count")
+        return list(rows)
+
+    def test_cosine_scores_and_top_k(self):
+        a, b, c, d = self.products
+        # 7 سفارش معتبر؛ تعداد: a=4, b=3, c=5, d=3؛ جفت‌ها: ab=3, ac=2, bc=1 (زیر حداقل), cd=3
+        created = build_recommendations(top_k=2, min_support=2, max_basket_size=3)
+
+        self.assertEqual(created, 6)
+        self.assertEqual(self.neighbours(), [
+            (a.id, b.id, 1, 3), (a.id, c.id, 2, 2),
+            (b.id, a.id, 1, 3),
+            (c.id, d.id, 1, 3), (c.id, a.id, 2, 2),
+            (d.id, c.id, 1, 3),
+        ])
+        scores = dict(
+            ((product_id, related_id), score)
+            for product_id, related_id, score in ProductRecommendation.objects.values_list("product_id", "related_id", "score")
+        )
+        self.assertAlmostEqual(scores[a.id, b.id], 3 / (4 * 3) ** 0.5)
+        self.assertAlmostEqual(scores[a.id, c.id], 2 / (4 * 5) ** 0.5)
+        self.assertAlmostEqual(scores[c.id, d.id], 3 / (5 * 3) ** 0.5)
+
+    def test_top_k_and_lift(self):
+        a, b, c, d = self.products
+        build_recommendations(top_k=1, min_support=2, metric="lift", max_basket_size=3)
+
+        self.assertEqual(self.neighbours(), [
+            (a.id, b.id, 1, 3), (b.id, a.id, 1, 3), (c.id, d.id, 1, 3), (d.id, c.id, 1, 3),
+        ])
+        score = ProductRecommendation.objects.get(product=a, related=b).score
+        self.assertAlmostEqual(score, 3 * 7 / (4 * 3))
+
+
+# ========= Facet Tests ========= #
+class FacetTests(TestCase):
+    """ شمارش فیلترهای کناری: گروه‌بندی برند نرمال شده و حذف فیلتر هر بُعد از شمارش خودش """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brakes = Category.objects.create(name="ترمز")
+        cls.filters = Category.objects.create(name="فیلتر")
+        rows = [
+            ("Bosch", cls.brakes, 300_000, True),
+            ("bosch", cls.brakes, 700_000, True),
+            ("  BOSCH ", cls.filters, 700_000, False),
+            ("Denso", cls.brakes, 1_500_000, True),
+            ("Denso", cls.filters, 6_000_000, False),
+        ]
+        for index, (brand, category, price, is_stock) in enumerate(rows):
+            create_product(category, index, brand=brand, price=price, is_stock=is_stock)
+        create_product(cls.brakes, 99, brand="Denso", is_active=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def facets(self, **params):
+        response = self.client.get(f"{PRODUCTS_URL}facets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counts_without_filters(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.facets()
+
+        # یک کوئری تجمیعی برای هر فیلتر کناری (به جز خواندن نسخه کاتالوگ برای ETag)
+        self.assertEqual(sum('FROM "shop_product"' in query["sql"] for query in queries), 5)
+        self.assertEqual(data["total"], 5)
+        self.assertEqual(data["brand"], [{"value": "Bosch", "count": 3}, {"value": "Denso", "count": 2}])
+        self.assertEqual(
+            [(item["value"], item["count"]) for item in data["category"]],
+            [(self.brakes.id, 3), (self.filters.id, 2)],
+        )
+        self.assertEqual(data["in_stock"], [{"value": True, "count": 3}, {"value": False, "count": 2}])
+        self.assertEqual([bucket["count"] for bucket in data["price"]], [1, 2, 1, 0, 1])
+
+    def test_own_filter_is_excluded(self):
+        data = self.facets(brand="bosch", in_stock="true")
+
+        self.assertEqual(data["total"], 2)
+        # برند انتخاب شده برندهای دیگر را حذف نمی‌کند ولی فیلتر موجودی روی آن اعمال می‌شود
+        self.assertEqual(data["brand"], [{"value": "Bosch", "count": 2}, {"value": "Denso", "count": 1}])
+        # موجودی بدون فیلتر موجودی ولی با فیلتر برند شمرده می‌شود
+        self.assertEqual(data["in_stock"], [{"value": True, "count": 2}, {"value": False, "count": 1}])
+        self.assertEqual([(item["value"], item["count"]) for item in data["category"]], [(self.brakes.id, 2)])
+        self.assertEqual([bucket["count"] for bucket in data["price"]], [1, 1, 0, 0, 0])
+
+    def test_price_filter_does_not_narrow_price_buckets(self):
+        data = self.facets(min_price=1_000_000)
+
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([bucket["count"] for bucket in data["price"]], [1, 2, 1, 0, 1])
+        self.assertEqual(data["brand"], [{"value": "Denso", "count": 2}])
+
+
+# ========= Fast List Tests ========= #
+class FastListTests(MediaRootMixin, TestCase):
+    """ مسیر سریع values() باید بایت به بایت همان خروجی ModelSerializer را بدهد """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="owner", password="pass")
+        parent = Category.objects.create(name="بدنه")
+        Category.objects.create(name="آینه", parent=parent)
+        Category.objects.create(name="موتور")
+        cars = [Car.objects.create(user=user, make="پژو", model="۲۰۶", year=1390 + i) for i in range(3)]
+        for index in range(5):
+            product = create_product(parent, index, price=1000 * (5 - index), is_stock=index % 2 == 0)
+            product.compatible_cars.set(cars[:index])
+        first, second = Product.objects.order_by("id")[:2]
+        # تصویر با نسخه‌ها، تصویر بدون نسخه و چند تصویر برای یک محصول
+        for product, is_main in ((first, True), (first, False), (second, False)):
+            image = ProductImage.objects.create(product=product, image=image_file(), is_main=is_main)
+            if is_main:
+                image_variants.generate_variants_for("shop.ProductImage", image.pk)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def pages(self, url):
+        contents = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            contents.append(response.content)
+            url = response.data["next"] if isinstance(response.data, dict) else None
+        return contents
+
+    def assertSameOutput(self, viewset, url):
+        fast = self.pages(url)
+        with mock.patch.object(viewset, "fast_list", False):
+            slow = self.pages(url)
+        self.assertEqual(fast, slow)
+        return fast
+
+    def test_products(self):
+        urls = [
+            PRODUCTS_URL,
+            f"{PRODUCTS_URL}?page_size=2",
+            f"{PRODUCTS_URL}?page_size=2&ordering=-price",
+            f"{PRODUCTS_URL}?fields=id,name,images&page_size=3",
+            f"{PRODUCTS_URL}?omit=images,url_detail",
+            f"{PRODUCTS_URL}?in_stock=true&ordering=created_at",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                pages = self.assertSameOutput(ProductViewSet, url)
+                if "page_size=2" in url:
+                    self.assertEqual(len(pages), 3)
+        self.assertIn(b"srcset", self.assertSameOutput(ProductViewSet, PRODUCTS_URL)[0])
+
+    def test_cars_and_categories(self):
+        self.assertSameOutput(CarViewSet, "/api/v1/shop/cars/")
+        self.assertSameOutput(CategoryViewSet, "/api/v1/shop/categories/")
+        self.assertSameOutput(CategoryViewSet, "/api/v1/shop/categories/?fields=id,name")
+
+
+# ========= Product Detail Cache Tests ========= #
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class ProductCacheTests(MediaRootMixin, TestCase):
+    """ کش read-through جزئیات محصول و باطل شدن آن با تغییر محصول و روابطش """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="owner", password="pass")
+        cls.category = Category.objects.create(name="ترمز")
+        cls.car = Car.objects.create(user=user, make="پژو", model="۲۰۶", year=1395)
+        cls.product = create_product(cls.category, 1, name="لنت جلو")
+        cls.product.compatible_cars.add(cls.car)
+        cls.related = create_product(cls.category, 2, name="دیسک ترمز")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def detail(self, lookup=None):
+        response = self.client.get(f"{PRODUCTS_URL}{lookup or self.product.pk}/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def change_behind_cache(self, **fields):
+        # update() سیگنالی ندارد، پس پاسخ کش شده قدیمی می‌ماند تا باطل شود
+        Product.objects.filter(pk=self.product.pk).update(**fields)
+
+    def test_read_through_and_product_save(self):
+        self.assertEqual(self.detail()["name"], "لنت جلو")
+        self.change_behind_cache(name="لنت عقب")
+        self.assertEqual(self.detail()["name"], "لنت جلو")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.get(pk=self.product.pk).save()
+        self.assertEqual(self.detail()["name"], "لنت عقب")
+
+    def test_recommendations_are_not_cached(self):
+        self.assertEqual(self.detail()["frequently_bought_together"], [])
+        ProductRecommendation.objects.create(product=self.product, related=self.related, rank=1, score=1, co_count=3)
+
+        data = self.detail()
+        self.assertEqual([item["id"] for item in data["frequently_bought_together"]], [self.related.pk])
+
+    def test_related_changes_invalidate(self):
+        def save_category():
+            Category.objects.get(pk=self.category.pk).save()
+
+        def save_car():
+            Car.objects.get(pk=self.car.pk).save()
+
+        def change_cars():
+            Product.objects.get(pk=self.product.pk).compatible_cars.remove(self.car)
+
+        def add_image():
+            ProductImage.objects.create(product_id=self.product.pk, image=image_file())
+
+        for index, change in enumerate((save_category, save_car, change_cars, add_image)):
+            with self.subTest(change=change.__name__):
+                self.detail()
+                self.change_behind_cache(price=5000 + index)
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+                self.assertEqual(self.detail()["price"], str(5000 + index))
+
+    def test_slug_change(self):
+        old_slug = self.product.slug
+        self.assertEqual(self.detail(old_slug)["id"], self.product.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(pk=self.product.pk)
+            product.name = "لنت سرامیکی"
+            product.save()
+
+        self.assertEqual(self.client.get(f"{PRODUCTS_URL}{old_slug}/").status_code, 301)
+        self.assertEqual(self.detail(product.slug)["name"], "لنت سرامیکی")
+
+    def test_prewarm_skips_recommendations(self):
+        ProductRecommendation.objects.create(product=self.product, related=self.related, rank=1, score=1, co_count=3)
+        call_command("prewarm_product_cache", host="testserver", stdout=io.StringIO())
+
+        request = Request(APIRequestFactory().get("/"))
+        cached = get_cached_product_detail(self.product.pk, request)
+        self.assertNotIn("frequently_bought_together", cached)
+        self.assertEqual(cached["name"], "لنت جلو")
+
+        self.change_behind_cache(name="لنت عقب")
+        data = self.detail()
+        self.assertEqual(data["name"], "لنت جلو")
+        self.assertEqual([item["id"] for item in data["frequently_bought_together"]], [self.related.pk])
+
+
+# ========= Product Import Tests ========= #
+class ImportProductsTests(TestCase):
+    """ ورود دسته‌ای محصولات از CSV: upsert روی part_code، اسلاگ، موجودی، خودروها و گزارش خطای هر ردیف """
+    header = ["part_code", "name", "brand", "country_of_origin", "price", "category"]
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="owner", password="pass")
+        cls.category = Category.objects.create(name="ترمز")
+        cls.cars = [Car.objects.create(user=user, make="Peugeot", model="206", year=1390 + i) for i in range(3)]
+
+    def run_import(self, header, *rows, **kwargs):
+        lines = [",".join(header)] + [",".join(str(value) for value in row) for row in rows]
+        return import_products(io.StringIO("\n".join(lines)), "csv", **kwargs)
+
+    def row(self, part_code, name="Brake Pad", price=1000, **extra):
+        return [part_code, name, "Bosch", "Germany", price, self.category.pk, *extra.values()]
+
+    def test_upsert_by_part_code(self):
+        existing = create_product(self.category, 1, name="Old Name", price=500)
+        old_slug = existing.slug
+
+        result = self.run_import(self.header, self.row("P-1", name="New Name", price=700), self.row("NEW-1"))
+
+        self.assertEqual(result.as_dict(), {"created": 1, "updated": 1, "error_count": 0, "errors": []})
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.price, existing.brand_normalized), ("New Name", 700, "bosch"))
+        # اسلاگ محصولات موجود در ورود دسته‌ای تغییر نمی‌کند
+        self.assertEqual(existing.slug, old_slug)
+        self.assertEqual(Product.objects.get(part_code="NEW-1").slug, "brake-pad")
+
+    def test_slug_collisions(self):
+        create_product(self.category, 1, name="Brake Pad")
+
+        self.run_import(
+            self.header,
+            self.row("AB-1"),
+            self.row("AB_1"),
+            self.row("X-9", name="Oil Filter"),
+            self.row("X-10", name="Oil Filter"),
+            self.row("Y-1", name="206"),
+        )
+
+        slugs = dict(Product.objects.values_list("part_code", "slug"))
+        self.assertEqual(slugs["AB-1"], "brake-pad-ab-1")
+        self.assertEqual(slugs["AB_1"], "brake-pad-ab-1-2")
+        self.assertEqual((slugs["X-9"], slugs["X-10"]), ("oil-filter", "oil-filter-x-10"))
+        # اسلاگ عددی با شناسه اشتباه گرفته می‌شود
+        self.assertEqual(slugs["Y-1"], "206-y-1")
+
+    def test_stock_quantity_derives_is_stock(self):
+        header = self.header + ["stock_quantity", "is_stock"]
+        self.run_import(
+            header,
+            self.row("S-0", stock="0", is_stock="yes"),
+            self.row("S-5", stock="5", is_stock="no"),
+            self.row("S-N", stock="", is_stock="no"),
+        )
+        stock = {code: (quantity, is_stock) for code, quantity, is_stock in Product.objects.values_list("part_code", "stock_quantity", "is_stock")}
+        self.assertEqual(stock, {"S-0": (0, False), "S-5": (5, True), "S-N": (None, False)})
+
+        # بدون ستون stock_quantity، موجودی شمارش شده حفظ می‌شود و is_stock فایل نادیده گرفته می‌شود
+        self.run_import(self.header + ["is_stock"], self.row("S-0", is_stock="yes"))
+        self.assertEqual(Product.objects.filter(part_code="S-0").values_list("stock_quantity", "is_stock").get(), (0, False))
+
+    def test_compatible_cars_replace_fitment(self):
+        first, second, third = self.cars
+        product = create_product(self.category, 1)
+        product.compatible_cars.set([first])
+        header = self.header + ["compatible_cars"]
+
+        self.run_import(header, self.row("P-1", cars=f"{second.pk}|{third.pk}"), self.row("NEW-1", cars=""))
+
+        self.assertEqual(set(product.compatible_cars.values_list("pk", flat=True)), {second.pk, third.pk})
+        self.assertEqual(
+            set(ProductFitment.objects.filter(product=product).values_list("car_id", "make", "model", "year")),
+            {(car.pk, "peugeot", "206", car.year) for car in (second, third)},
+        )
+        self.assertFalse(ProductFitment.objects.filter(product__part_code="NEW-1").exists())
+        product.refresh_from_db()
+        self.assertEqual(product.fitment_text, f"peugeot 206 {second.year} peugeot 206 {third.year}")
+
+    def test_row_errors_are_reported(self):
+        header = self.header + ["compatible_cars"]
+        result = self.run_import(
+            header,
+            self.row("OK-1", cars=""),
+            self.row("BAD-1", price="12.5", cars=""),
+            ["BAD-2", "", "Bosch", "Germany", 1000, "ناموجود", ""],
+            self.row("OK-1", cars=""),
+            self.row("BAD-3", cars="9999"),
+        )
+
+        self.assertEqual((result.created, result.updated), (1, 0))
+        errors = {error["row"]: (error["part_code"], sorted(error["errors"])) for error in result.errors}
+        self.assertEqual(errors, {
+            3: ("BAD-1", ["price"]),
+            4: ("BAD-2", ["category", "name"]),
+            5: ("OK-1", ["part_code"]),
+            6: ("BAD-3", ["compatible_cars"]),
+        })
+        self.assertEqual(list(Product.objects.values_list("part_code", flat=True)), ["OK-1"])
+
+    def test_dry_run_writes_nothing(self):
+        create_product(self.category, 1, name="Old Name")
+
+        result = self.run_import(self.header, self.row("P-1", name="New Name"), self.row("NEW-1"), dry_run=True)
+
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual(list(Product.objects.values_list("name", flat=True)), ["Old Name"])
+
+    def test_missing_columns(self):
+        with self.assertRaises(ImportFileError):
+            self.run_import(["part_code", "name"], ["P-1", "Brake Pad"])
+
+
+# ========= Image Variant Tests ========= #
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class ImageVariantTests(MediaRootMixin, TestCase):
+    """ ساخت نسخه‌های تصویر پس از commit؛ خطای ساخت ثبت می‌شود و آپلود را خراب نمی‌کند """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = create_product(Category.objects.create(name="چراغ"), 1)
+
+    def test_variants_are_generated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self.product, image=image_file())
+
+        image.refresh_from_db()
+        self.assertEqual(image.variants["source"], image.image.name)
+        self.assertEqual(image.variants["files"]["thumb"]["width"], 160)
+
+    def test_failure_is_logged_not_raised(self):
+        with mock.patch.object(image_variants, "render_variants", side_effect=OSError("disk full")):
+            with self.assertLogs(image_variants.logger, "ERROR") as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    image = ProductImage.objects.create(product=self.product, image=image_file())
+
+        self.assertIn(f"pk={image.pk}", logs.output[0])
+        image.refresh_from_db()
+        self.assertEqual(image.variants, {})
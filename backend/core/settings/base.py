@@ -15,6 +15,7 @@ from pathlib import Path
 from environ import environ
 from datetime import timedelta
 import sys
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -59,6 +60,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     
     "corsheaders",
     "rest_framework",
@@ -155,6 +157,32 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media/"
 
+# Uploaded media is stored under its sha256 content hash (immutable URLs)
+STORAGES = {
+    "default": {"BACKEND": "apps.shop.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Catalog snapshot (pre-compressed JSON served by nginx from MEDIA_ROOT)
+CATALOG_SNAPSHOT_DIR = "catalog"
+CATALOG_SNAPSHOT_AUTO_REBUILD = True
+CATALOG_SNAPSHOT_REBUILD_DELAY = 60
+
+# Image variants (thumb/card/zoom derivatives of product and banner images)
+IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+IMAGE_VARIANTS_ASYNC = True
+IMAGE_VARIANT_WORKERS = 2
+
+# Stock reserved by a pending order is released after this many seconds
+STOCK_RESERVATION_TTL = 60 * 60 * 24
+
+# Idempotency-Key: stored responses are replayed for this many seconds;
+# the in-flight lock expires on its own if a worker dies mid-request.
+# Both live in the default cache, which must be shared by all workers
+# (production uses Redis, see CACHES in production.py)
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -214,6 +242,7 @@ SIMPLE_JWT = {
 
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 # Add whitenoise to serve static files
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
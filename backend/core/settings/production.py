@@ -23,6 +23,17 @@ DATABASES = {
     }
 }
 
+# Cache
+# کش باید بین همه ورکرهای gunicorn و دستورات مدیریتی (import_products، rehash_media،
+# release_expired_reservations و ...) مشترک باشد؛ LocMemCache مخصوص هر پروسه است و
+# باطل‌سازی‌های یک پروسه به بقیه نمی‌رسد. قفل‌های Idempotency-Key هم به همین کش وابسته‌اند.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get('REDIS_URL', 'redis://redis:6379/1'),
+    }
+}
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')